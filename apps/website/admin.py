@@ -1,3 +1,89 @@
-from django.contrib import admin
+from django.contrib import admin, messages
+from django.db import router, transaction
 
-# Register your models here.
+from .models import FooterLink, Hero, MenuItem, Partners, SeoPage
+from .signals import coalesce_invalidations, invalidate_content
+from .utils.ordering import move_to_edge, next_order, rebalance
+
+
+class OrderedModelAdmin(admin.ModelAdmin):
+    """Admin for models with an ``order`` column
+
+    ``order`` is editable from the change list. All rows edited in one
+    submit are written with a single ``bulk_update`` and the cache is
+    invalidated once per submit or action, not once per row.
+    """
+
+    ordering = ("order", "id")
+    list_editable = ("order",)
+    actions = ["move_to_top", "move_to_bottom", "rebalance_order"]
+
+    def changelist_view(self, request, extra_context=None):
+        request._bulk_edited = []
+        with transaction.atomic(using=router.db_for_write(self.model)):
+            with coalesce_invalidations():
+                response = super().changelist_view(request, extra_context)
+                if request._bulk_edited:
+                    self.model.objects.bulk_update(
+                        request._bulk_edited, self.list_editable
+                    )
+                    invalidate_content(self.model)
+        return response
+
+    def save_model(self, request, obj, form, change):
+        bulk_edited = getattr(request, "_bulk_edited", None)
+        if change and bulk_edited is not None:
+            # Change list edit: written together by changelist_view
+            bulk_edited.append(obj)
+            return
+        if not change and not obj.order:
+            # New rows go last, leaving a gap to insert between later
+            obj.order = next_order(self.model)
+        super().save_model(request, obj, form, change)
+
+    @admin.action(description="Move selected items to the top")
+    def move_to_top(self, request, queryset):
+        move_to_edge(queryset, top=True)
+        invalidate_content(self.model)
+
+    @admin.action(description="Move selected items to the bottom")
+    def move_to_bottom(self, request, queryset):
+        move_to_edge(queryset, top=False)
+        invalidate_content(self.model)
+
+    @admin.action(description="Renumber the order of all items")
+    def rebalance_order(self, request, queryset):
+        rebalance(self.model)
+        invalidate_content(self.model)
+        self.message_user(request, "Order renumbered.", messages.SUCCESS)
+
+
+@admin.register(MenuItem)
+class MenuItemAdmin(OrderedModelAdmin):
+    list_display = ("label_en", "label_ar", "route", "order")
+
+
+@admin.register(Partners)
+class PartnersAdmin(OrderedModelAdmin):
+    list_display = ("name_en", "name_ar", "image", "order")
+
+
+@admin.register(FooterLink)
+class FooterLinkAdmin(OrderedModelAdmin):
+    list_display = ("label_en", "key", "route", "is_external", "order")
+    list_filter = ("is_external",)
+
+
+@admin.register(Hero)
+class HeroAdmin(admin.ModelAdmin):
+    list_display = ("title_en", "title_ar", "background_image")
+
+    def changelist_view(self, request, extra_context=None):
+        with coalesce_invalidations():
+            return super().changelist_view(request, extra_context)
+
+
+@admin.register(SeoPage)
+class SeoPageAdmin(admin.ModelAdmin):
+    list_display = ("page", "title")
+    search_fields = ("page", "title")
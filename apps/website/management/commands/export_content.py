@@ -0,0 +1,68 @@
+from django.core.management.base import BaseCommand
+from django.core.serializers.json import DjangoJSONEncoder
+
+from ...utils.content_io import CONTENT_MODELS, content_fields, export_record
+
+
+class Command(BaseCommand):
+    help = "Export MenuItem, Hero, Partners and FooterLink rows as NDJSON or JSON"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "path", nargs="?", default="-", help="Output file (default: stdout)"
+        )
+        parser.add_argument(
+            "--format",
+            choices=["ndjson", "json"],
+            default="ndjson",
+            help="Output format (default: ndjson)",
+        )
+        parser.add_argument(
+            "--model",
+            action="append",
+            choices=list(CONTENT_MODELS),
+            help="Only export these models (repeatable)",
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=2000,
+            help="Rows fetched per server-side cursor round trip",
+        )
+
+    def handle(self, *args, **options):
+        path = options["path"]
+        if path == "-":
+            handle = None
+
+            def write(text):
+                self.stdout.write(text, ending="")
+
+        else:
+            handle = open(path, "w", encoding="utf-8")
+            write = handle.write
+        labels = options["model"] or list(CONTENT_MODELS)
+        as_array = options["format"] == "json"
+        encoder = DjangoJSONEncoder(ensure_ascii=False)
+        total = 0
+        try:
+            if as_array:
+                write("[")
+            for label in labels:
+                model = CONTENT_MODELS[label]
+                rows = model.objects.order_by("pk").values("id", *content_fields(model))
+                for row in rows.iterator(chunk_size=options["chunk_size"]):
+                    line = encoder.encode(export_record(model, row))
+                    if as_array:
+                        line = ("," if total else "") + "\n" + line
+                    else:
+                        line += "\n"
+                    write(line)
+                    total += 1
+            if as_array:
+                write("\n]\n")
+        finally:
+            if handle is not None:
+                handle.close()
+
+        self.stderr.write(f"Exported {total} rows")
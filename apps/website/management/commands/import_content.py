@@ -0,0 +1,155 @@
+import json
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+from django.core.management.color import no_style
+from django.db import connection, transaction
+
+from ...signals import (
+    IMAGE_FIELDS,
+    coalesce_invalidations,
+    invalidate_content,
+    refresh_image_variants,
+)
+from ...utils.content_io import (
+    ContentFormatError,
+    build_instance,
+    content_fields,
+    iter_home_data,
+    iter_json_array,
+    iter_ndjson,
+    match_existing,
+)
+from ...utils.search import index_model
+
+
+class Command(BaseCommand):
+    help = (
+        "Import MenuItem, Hero, Partners and FooterLink rows from an NDJSON file, "
+        "a JSON array of records, or a home_data-shaped JSON object"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="File to import, or '-' for stdin")
+        parser.add_argument(
+            "--format",
+            choices=["auto", "ndjson", "json", "home-data"],
+            default="auto",
+            help="Input format (default: guessed from the extension and content)",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Rows per bulk upsert and transaction (default: 1000)",
+        )
+        parser.add_argument(
+            "--skip-variants",
+            action="store_true",
+            help="Do not regenerate image variants after the import",
+        )
+
+    def handle(self, *args, **options):
+        path = options["path"]
+        handle = sys.stdin if path == "-" else open(path, encoding="utf-8")
+        try:
+            records = self.iter_records(handle, path, options["format"])
+            with coalesce_invalidations():
+                counts = self.import_records(records, options["batch_size"])
+                # bulk_create sends no signals: rebuild derived data once
+                if not options["skip_variants"]:
+                    self.refresh_variants(counts)
+                self.reset_sequences(counts)
+                for model in counts:
+                    index_model(model)
+                invalidate_content(*counts)
+        except ContentFormatError as e:
+            raise CommandError(str(e))
+        finally:
+            if handle is not sys.stdin:
+                handle.close()
+
+        for model, count in counts.items():
+            self.stdout.write(f"{model.__name__}: {count} rows imported")
+        self.stdout.write(self.style.SUCCESS("Import completed"))
+
+    def iter_records(self, handle, path, fmt):
+        if fmt == "auto" and path.endswith((".ndjson", ".jsonl")):
+            fmt = "ndjson"
+        if fmt == "ndjson":
+            return iter_ndjson(handle)
+        if fmt == "auto":
+            # A top-level array is a list of records, an object is home_data
+            first = handle.read(1)
+            while first.isspace():
+                first = handle.read(1)
+            handle = _Prefixed(first, handle)
+            fmt = "json" if first == "[" else "home-data"
+        if fmt == "json":
+            return iter_json_array(handle)
+        try:
+            data = json.loads(handle.read())
+        except json.JSONDecodeError as e:
+            raise ContentFormatError(f"Invalid JSON: {e}")
+        return match_existing(iter_home_data(data))
+
+    def import_records(self, records, batch_size):
+        batches = {}
+        counts = {}
+        for record in records:
+            instance = build_instance(record)
+            model = type(instance)
+            batch = batches.setdefault(model, [])
+            batch.append(instance)
+            if len(batch) >= batch_size:
+                self.flush(model, batch)
+                counts[model] = counts.get(model, 0) + len(batch)
+                batches[model] = []
+        for model, batch in batches.items():
+            if batch:
+                self.flush(model, batch)
+                counts[model] = counts.get(model, 0) + len(batch)
+        return counts
+
+    def flush(self, model, batch):
+        """Upsert one batch on the primary key in its own transaction"""
+        # A row may only be upserted once per statement: the last one wins
+        by_pk = {obj.pk: obj for obj in batch if obj.pk is not None}
+        rows = list(by_pk.values()) + [obj for obj in batch if obj.pk is None]
+        with transaction.atomic():
+            model.objects.bulk_create(
+                rows,
+                update_conflicts=True,
+                unique_fields=["id"],
+                update_fields=content_fields(model),
+            )
+
+    def reset_sequences(self, counts):
+        """Move primary key sequences past ids that were imported explicitly"""
+        statements = connection.ops.sequence_reset_sql(no_style(), list(counts))
+        if statements:
+            with connection.cursor() as cursor:
+                for sql in statements:
+                    cursor.execute(sql)
+
+    def refresh_variants(self, counts):
+        for model in counts:
+            if model not in IMAGE_FIELDS:
+                continue
+            image_field, variants_field = IMAGE_FIELDS[model]
+            rows = model.objects.values_list("pk", image_field, variants_field)
+            for pk, image, variants in rows.iterator(chunk_size=1000):
+                if (variants or {}).get("source") != image:
+                    refresh_image_variants(model, pk)
+
+
+class _Prefixed:
+    """File-like wrapper that replays characters already read for sniffing"""
+
+    def __init__(self, prefix, handle):
+        self.prefix = prefix
+        self.handle = handle
+
+    def read(self, size=-1):
+        prefix, self.prefix = self.prefix, ""
+        return prefix + self.handle.read(size)
@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+
+from ...utils.profiling import make_token
+
+
+class Command(BaseCommand):
+    help = (
+        "Print a signed X-Profile header value that profiles the requests "
+        "carrying it (valid for PROFILING_TOKEN_MAX_AGE seconds)"
+    )
+
+    def handle(self, *args, **options):
+        self.stdout.write(make_token())
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from ...utils.search import MODEL_SOURCES, index_home_data, index_model
+
+
+class Command(BaseCommand):
+    help = "Rebuild every search document from the content models and home_data"
+
+    def handle(self, *args, **options):
+        from ...utils.redis_test_json import home_data
+
+        for model in MODEL_SOURCES:
+            index_model(model)
+            self.stdout.write(f"Indexed {model.__name__}")
+        index_home_data(home_data)
+        self.stdout.write(self.style.SUCCESS("Search index rebuilt"))
@@ -0,0 +1,77 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from ...utils.keyspace import keyspace_problems, keyspace_usage
+from ...utils.redis_client import RedisClient
+
+
+def _size(count: int) -> str:
+    for unit in ("B", "KB", "MB"):
+        if count < 1024:
+            return f"{count:.0f}{unit}" if unit == "B" else f"{count:.1f}{unit}"
+        count /= 1024
+    return f"{count:.1f}GB"
+
+
+class Command(BaseCommand):
+    help = (
+        "Report keys and memory per Redis namespace declared in the keyspace "
+        "registry (SCAN plus sampled MEMORY USAGE; runs on the replica when "
+        "there is one)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--sample",
+            type=int,
+            default=100,
+            help="Keys per namespace whose memory and TTL are read (default: 100)",
+        )
+        parser.add_argument(
+            "--count",
+            type=int,
+            default=1000,
+            help="SCAN COUNT hint, keys examined per call (default: 1000)",
+        )
+        parser.add_argument(
+            "--strict",
+            action="store_true",
+            help="Fail on undeclared keys or keys without their declared TTL",
+        )
+
+    def handle(self, *args, **options):
+        if options["sample"] < 1:
+            raise CommandError("--sample must be at least 1")
+        client = RedisClient().replica
+        rows, undeclared = keyspace_usage(
+            client, sample=options["sample"], count=options["count"]
+        )
+
+        info = client.info("memory")
+        self.stdout.write(
+            f"used_memory {_size(info.get('used_memory', 0))}, "
+            f"maxmemory {_size(info.get('maxmemory', 0))}, "
+            f"policy {info.get('maxmemory_policy', 'unknown')}"
+        )
+        header = ("namespace", "keys", "sampled", "est. memory", "ttl", "owner")
+        lines = [header] + [
+            (
+                row["namespace"],
+                str(row["keys"]),
+                str(row["sampled"]),
+                _size(row["estimated_bytes"]),
+                row["ttl"],
+                row["owner"],
+            )
+            for row in rows
+        ]
+        widths = [max(len(line[i]) for line in lines) for i in range(len(header))]
+        for line in lines:
+            self.stdout.write(
+                "  ".join(cell.ljust(width) for cell, width in zip(line, widths))
+            )
+
+        problems = keyspace_problems(rows, undeclared)
+        for problem in problems:
+            self.stderr.write(problem)
+        if problems and options["strict"]:
+            raise CommandError(f"{len(problems)} keyspace problems")
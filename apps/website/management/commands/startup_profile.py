@@ -0,0 +1,162 @@
+import json
+import re
+import statistics
+import subprocess  # nosec B404
+import sys
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+# Run in a fresh interpreter: this process has already imported everything
+STARTUP_SCRIPT = """
+import json
+import time
+
+start = time.perf_counter()
+import django
+
+django.setup()
+setup = time.perf_counter() - start
+
+from django.urls import get_resolver
+
+start = time.perf_counter()
+get_resolver().url_patterns
+urls = time.perf_counter() - start
+print(json.dumps({"django.setup()": setup, "URLconf and views": urls}))
+"""
+
+# "import time:   self [us] | cumulative | imported package"
+IMPORT_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \| (\s*)(\S+)$")
+
+
+def parse_import_times(stderr: str) -> dict:
+    """Top-level module -> cumulative import seconds from ``-X importtime``"""
+    modules = {}
+    for line in stderr.splitlines():
+        match = IMPORT_LINE.match(line)
+        # Indented lines are nested imports, already counted by their parent
+        if match and not match.group(3):
+            modules[match.group(4)] = int(match.group(2)) / 1_000_000
+    return modules
+
+
+def measure_startup() -> dict:
+    """Return ``{"phases": {...}, "modules": {...}}`` in seconds"""
+    result = subprocess.run(  # nosec B603
+        [sys.executable, "-X", "importtime", "-c", STARTUP_SCRIPT],
+        capture_output=True,
+        text=True,
+        cwd=settings.BASE_DIR,
+    )
+    if result.returncode:
+        raise CommandError(f"Startup failed:\n{result.stderr[-2000:]}")
+    return {
+        "phases": json.loads(result.stdout.strip().splitlines()[-1]),
+        "modules": parse_import_times(result.stderr),
+    }
+
+
+def median_runs(runs: list) -> dict:
+    """Per-key median over several ``measure_startup()`` results"""
+    merged = {}
+    for section in ("phases", "modules"):
+        keys = dict.fromkeys(key for run in runs for key in run[section])
+        merged[section] = {
+            key: statistics.median(run[section].get(key, 0.0) for run in runs)
+            for key in keys
+        }
+    return merged
+
+
+def _ms(seconds) -> str:
+    return f"{seconds * 1000:8.1f} ms"
+
+
+def _delta(current, baseline) -> str:
+    if baseline is None:
+        return ""
+    return f"  ({(current - baseline) * 1000:+.1f} ms)"
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure django.setup() and per-module import time in a fresh "
+        "interpreter and compare them with a stored baseline"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--runs", type=int, default=3, help="Startups to take the median of"
+        )
+        parser.add_argument(
+            "--top", type=int, default=15, help="Number of modules to list"
+        )
+        parser.add_argument(
+            "--baseline",
+            required=True,
+            help="Baseline file to compare with (or write, with --save); "
+            "record it on the image that runs in production",
+        )
+        parser.add_argument(
+            "--save", action="store_true", help="Store this run as the new baseline"
+        )
+        parser.add_argument(
+            "--max-regression",
+            type=float,
+            help="Fail if total startup is this many percent slower than baseline",
+        )
+
+    def handle(self, *args, **options):
+        baseline_path = Path(options["baseline"])
+        baseline = None
+        if baseline_path.exists():
+            baseline = json.loads(baseline_path.read_text(encoding="utf-8"))
+        elif options["max_regression"] is not None and not options["save"]:
+            raise CommandError(
+                f"No baseline at {baseline_path}; record one with --save first"
+            )
+
+        runs = [measure_startup() for _ in range(max(1, options["runs"]))]
+        current = median_runs(runs)
+        current["total"] = sum(current["phases"].values())
+
+        def base(section, key):
+            return baseline[section].get(key) if baseline else None
+
+        self.stdout.write("Startup phases:")
+        for phase, seconds in current["phases"].items():
+            self.stdout.write(
+                f"  {phase:<40}{_ms(seconds)}{_delta(seconds, base('phases', phase))}"
+            )
+        total_base = baseline["total"] if baseline else None
+        self.stdout.write(
+            f"  {'total':<40}{_ms(current['total'])}"
+            f"{_delta(current['total'], total_base)}"
+        )
+
+        self.stdout.write(f"Slowest top-level imports (median of {len(runs)}):")
+        modules = sorted(current["modules"].items(), key=lambda item: -item[1])
+        for module, seconds in modules[: options["top"]]:
+            self.stdout.write(
+                f"  {module:<40}{_ms(seconds)}{_delta(seconds, base('modules', module))}"
+            )
+
+        if options["save"]:
+            baseline_path.write_text(
+                json.dumps(current, indent=2, sort_keys=True) + "\n", encoding="utf-8"
+            )
+            self.stdout.write(self.style.SUCCESS(f"Baseline saved to {baseline_path}"))
+        elif total_base is None:
+            self.stdout.write(
+                f"No baseline at {baseline_path}; run with --save to record one"
+            )
+
+        limit = options["max_regression"]
+        if limit is not None and total_base:
+            regression = (current["total"] / total_base - 1) * 100
+            if regression > limit:
+                raise CommandError(
+                    f"Startup is {regression:.0f}% slower than the baseline"
+                )
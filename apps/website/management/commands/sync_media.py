@@ -0,0 +1,83 @@
+import os
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand, CommandError
+
+from ...utils.media_sync import (
+    DEFAULT_MULTIPART_THRESHOLD,
+    DEFAULT_WORKERS,
+    configure_multipart,
+    sync_media,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Upload new and changed files from the local media directory to the "
+        "configured storage (e.g. S3 with USE_S3_MEDIA), resuming where a "
+        "previous run stopped"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "source",
+            nargs="?",
+            default=str(
+                getattr(settings, "MEDIA_ROOT", "") or settings.BASE_DIR / "media"
+            ),
+            help="Local media directory (default: MEDIA_ROOT or ./media)",
+        )
+        parser.add_argument(
+            "--manifest",
+            help="Manifest of synced files (default: .media_sync_manifest.json "
+            "in the source directory)",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=DEFAULT_WORKERS,
+            help=f"Concurrent uploads (default: {DEFAULT_WORKERS})",
+        )
+        parser.add_argument(
+            "--multipart-threshold",
+            type=int,
+            default=DEFAULT_MULTIPART_THRESHOLD,
+            help="Bytes above which S3 uploads are split into parts",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="List the files that would be uploaded without uploading",
+        )
+
+    def handle(self, *args, **options):
+        if not os.path.isdir(options["source"]):
+            raise CommandError(f"{options['source']} is not a directory")
+        configure_multipart(default_storage, options["multipart_threshold"])
+        verbosity = options["verbosity"]
+        dry_run = options["dry_run"]
+
+        def report(name, status, error):
+            if error is not None:
+                self.stderr.write(f"Failed {name}: {error}")
+            elif verbosity > 1 or dry_run:
+                self.stdout.write(f"{'Would upload' if dry_run else 'Uploaded'} {name}")
+
+        counts = sync_media(
+            options["source"],
+            default_storage,
+            manifest_path=options["manifest"],
+            workers=options["workers"],
+            dry_run=dry_run,
+            on_result=report,
+        )
+
+        self.stdout.write(
+            f"{counts['uploaded']} {'to upload' if dry_run else 'uploaded'} "
+            f"({counts['bytes']} bytes), {counts['unchanged']} unchanged, "
+            f"{counts['failed']} failed"
+        )
+        if counts["failed"]:
+            raise CommandError("Some files failed; run the command again to retry them")
+        self.stdout.write(self.style.SUCCESS("Media sync completed"))
@@ -0,0 +1,132 @@
+import logging
+import time
+
+from django.conf import settings
+from django.http import JsonResponse
+
+from . import routers
+from .utils import admission
+from .utils.profiling import UNPROFILED_PREFIXES, RequestProfile, profile_trigger
+
+logger = logging.getLogger(__name__)
+
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+
+
+class AdmissionControlMiddleware:
+    """Shed requests with 503 while this worker is overloaded
+
+    Low-priority requests (``ADMISSION_LOW_PRIORITY_PREFIXES``) are refused
+    first, the rest only at the hard limits; probes and cacheable reads are
+    always admitted. See ``utils.admission`` for the signals used. Shed
+    responses carry ``Retry-After`` and ``X-Shed-Reason``.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not settings.ADMISSION_CONTROL_ENABLED:
+            return self.get_response(request)
+        waited = admission.queue_wait(request)
+        priority = admission.request_priority(request)
+        reason = admission.controller.admit(priority, waited)
+        if reason:
+            response = JsonResponse(
+                {"error": "Server is busy, please retry later"}, status=503
+            )
+            response["Retry-After"] = str(settings.ADMISSION_RETRY_AFTER)
+            response["X-Shed-Reason"] = f"{priority}:{reason}"
+            return response
+        start = time.perf_counter()
+        try:
+            return self.get_response(request)
+        finally:
+            admission.controller.finish(waited + time.perf_counter() - start)
+
+
+def _stream_in_scope(content, primary):
+    # Streamed bodies run their queries after the view has returned
+    with routers.read_scope(primary):
+        yield from content
+
+
+class ReplicaReadMiddleware:
+    """Route the request's content reads through ``ReplicaRouter``
+
+    Writes (and reads from a client that wrote within the last
+    ``DB_PRIMARY_PIN_SECONDS``) stay on the primary.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        writing = request.method not in SAFE_METHODS
+        primary = writing or routers.PRIMARY_COOKIE in request.COOKIES
+        with routers.read_scope(primary):
+            response = self.get_response(request)
+        # Async streams (server-sent events) do not touch the database
+        if response.streaming and not response.is_async:
+            response.streaming_content = _stream_in_scope(
+                response.streaming_content, primary
+            )
+        if writing and routers.replica_configured():
+            response.set_cookie(
+                routers.PRIMARY_COOKIE,
+                "1",
+                max_age=settings.DB_PRIMARY_PIN_SECONDS,
+                httponly=True,
+                samesite="Lax",
+            )
+        return response
+
+
+def _profile_stream(profile, content, finish):
+    iterator = iter(content)
+    try:
+        while True:
+            chunk = profile.run(next, iterator, None)
+            if chunk is None:
+                break
+            yield chunk
+    finally:
+        finish()
+
+
+class ProfilingMiddleware:
+    """Profile the view of requests that ask for it
+
+    See ``utils.profiling.profile_trigger`` for what turns it on. The
+    profile id is returned in ``X-Profile-Id``; streamed bodies are
+    profiled as they are sent and stored when the stream ends.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        trigger = profile_trigger(request)
+        if trigger is None or request.path.startswith(UNPROFILED_PREFIXES):
+            return self.get_response(request)
+
+        profile = RequestProfile(request, trigger)
+        response = profile.run(self.get_response, request)
+        response["X-Profile-Id"] = profile.id
+        if response.streaming and not response.is_async:
+            response.streaming_content = _profile_stream(
+                profile,
+                response.streaming_content,
+                lambda: self.save(profile, response),
+            )
+        else:
+            self.save(profile, response)
+        return response
+
+    def save(self, profile, response):
+        from .views import redis_client
+
+        try:
+            profile.save(redis_client, response.status_code)
+        except Exception:
+            logger.exception("Could not store profile %s", profile.id)
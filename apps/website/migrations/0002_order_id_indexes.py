@@ -0,0 +1,25 @@
+# Generated by Django 4.2.24 on 2026-10-19 17:47
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("website", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="footerlink",
+            index=models.Index(fields=["order", "id"], name="footerlink_order_id_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="menuitem",
+            index=models.Index(fields=["order", "id"], name="menuitem_order_id_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="partners",
+            index=models.Index(fields=["order", "id"], name="partners_order_id_idx"),
+        ),
+    ]
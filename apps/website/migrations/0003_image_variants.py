@@ -0,0 +1,23 @@
+# Generated by Django 4.2.24 on 2026-10-19 17:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("website", "0002_order_id_indexes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="hero",
+            name="background_image_variants",
+            field=models.JSONField(blank=True, default=dict, editable=False),
+        ),
+        migrations.AddField(
+            model_name="partners",
+            name="image_variants",
+            field=models.JSONField(blank=True, default=dict, editable=False),
+        ),
+    ]
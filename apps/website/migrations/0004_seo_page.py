@@ -0,0 +1,35 @@
+# Generated by Django 4.2.24 on 2026-10-19 17:53
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("website", "0003_image_variants"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="SeoPage",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "page",
+                    models.SlugField(
+                        help_text="e.g. home, about", max_length=64, unique=True
+                    ),
+                ),
+                ("title", models.CharField(max_length=255)),
+                ("description", models.TextField(blank=True, default="")),
+            ],
+        ),
+    ]
@@ -0,0 +1,64 @@
+# Generated by Django 4.2.24 on 2026-10-19 17:54
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("website", "0004_seo_page"),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.CreateModel(
+            name="SearchDocument",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("source", models.CharField(max_length=32)),
+                ("source_id", models.CharField(max_length=64)),
+                ("title_en", models.TextField(blank=True, default="")),
+                ("title_ar", models.TextField(blank=True, default="")),
+                ("body_en", models.TextField(blank=True, default="")),
+                ("body_ar", models.TextField(blank=True, default="")),
+                ("url", models.CharField(blank=True, default="", max_length=512)),
+                ("search_title", models.TextField(blank=True, default="")),
+                ("search_body", models.TextField(blank=True, default="")),
+                (
+                    "search_vector",
+                    django.contrib.postgres.search.SearchVectorField(
+                        editable=False, null=True
+                    ),
+                ),
+            ],
+            options={
+                "indexes": [
+                    django.contrib.postgres.indexes.GinIndex(
+                        fields=["search_vector"], name="searchdocument_vector_gin"
+                    ),
+                    django.contrib.postgres.indexes.GinIndex(
+                        fields=["search_title"],
+                        name="searchdocument_title_trgm",
+                        opclasses=["gin_trgm_ops"],
+                    ),
+                ],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="searchdocument",
+            constraint=models.UniqueConstraint(
+                fields=("source", "source_id"), name="searchdocument_source_uniq"
+            ),
+        ),
+    ]
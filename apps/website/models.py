@@ -1,3 +1,5 @@
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
 
 
@@ -8,6 +10,9 @@ class MenuItem(models.Model):
     route = models.CharField(max_length=255, help_text="URL path or route name")
     order = models.PositiveIntegerField(default=0)
 
+    class Meta:
+        indexes = [models.Index(fields=["order", "id"], name="menuitem_order_id_idx")]
+
     def __str__(self):
         return self.label_en
 
@@ -21,6 +26,9 @@ class Hero(models.Model):
     button_en = models.CharField(max_length=255, null=True, blank=True)
     button_ar = models.CharField(max_length=255, null=True, blank=True)
     background_image = models.CharField(max_length=512, null=True, blank=True)
+    background_image_variants = models.JSONField(
+        default=dict, blank=True, editable=False
+    )
 
     def __str__(self):
         return self.title_en
@@ -31,8 +39,12 @@ class Partners(models.Model):
     name_en = models.CharField(max_length=100)
     name_ar = models.CharField(max_length=100, null=True, blank=True)
     image = models.CharField(max_length=512)
+    image_variants = models.JSONField(default=dict, blank=True, editable=False)
     order = models.PositiveIntegerField(default=0)
 
+    class Meta:
+        indexes = [models.Index(fields=["order", "id"], name="partners_order_id_idx")]
+
     def __str__(self):
         return f"Partners #{self.pk}"
 
@@ -46,5 +58,57 @@ class FooterLink(models.Model):
     is_external = models.BooleanField(default=False)
     order = models.PositiveIntegerField(default=0)
 
+    class Meta:
+        indexes = [models.Index(fields=["order", "id"], name="footerlink_order_id_idx")]
+
     def __str__(self):
         return self.label_en
+
+
+# ---------- SEO ----------
+class SeoPage(models.Model):
+    page = models.SlugField(max_length=64, unique=True, help_text="e.g. home, about")
+    title = models.CharField(max_length=255)
+    description = models.TextField(blank=True, default="")
+
+    def __str__(self):
+        return self.page
+
+
+# ---------- Search ----------
+class SearchDocument(models.Model):
+    """Denormalized, searchable copy of one piece of content
+
+    Rows are maintained by ``apps.website.utils.search``; ``search_title``
+    and ``search_body`` hold normalized English + Arabic text and
+    ``search_vector`` is computed from them by the database.
+    """
+
+    source = models.CharField(max_length=32)
+    source_id = models.CharField(max_length=64)
+    title_en = models.TextField(blank=True, default="")
+    title_ar = models.TextField(blank=True, default="")
+    body_en = models.TextField(blank=True, default="")
+    body_ar = models.TextField(blank=True, default="")
+    url = models.CharField(max_length=512, blank=True, default="")
+    search_title = models.TextField(blank=True, default="")
+    search_body = models.TextField(blank=True, default="")
+    search_vector = SearchVectorField(null=True, editable=False)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["source", "source_id"], name="searchdocument_source_uniq"
+            )
+        ]
+        indexes = [
+            GinIndex(fields=["search_vector"], name="searchdocument_vector_gin"),
+            GinIndex(
+                fields=["search_title"],
+                name="searchdocument_title_trgm",
+                opclasses=["gin_trgm_ops"],
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.source}:{self.source_id}"
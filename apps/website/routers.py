@@ -0,0 +1,68 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+REPLICA_DB = "replica"
+
+# Apps whose read queries may be served by the replica
+REPLICA_APPS = {"website"}
+
+# Cookie sent back after a write so the same client keeps reading from the
+# primary until the replica has caught up (see DB_PRIMARY_PIN_SECONDS)
+PRIMARY_COOKIE = "use_primary"
+
+# {"primary": bool} for the request being served, None outside requests
+_read_scope = ContextVar("read_scope", default=None)
+
+
+def replica_configured() -> bool:
+    return REPLICA_DB in settings.DATABASES
+
+
+@contextmanager
+def read_scope(primary: bool = False):
+    """Allow replica reads inside the block unless ``primary`` is set
+
+    A write inside the block pins the rest of it to the primary.
+    """
+    token = _read_scope.set({"primary": primary})
+    try:
+        yield
+    finally:
+        _read_scope.reset(token)
+
+
+class ReplicaRouter:
+    """Send content reads made while serving a request to the read replica
+
+    Reads go to the primary outside a request (management commands, shell),
+    inside a transaction, after a write in the same request, and for
+    clients holding the ``PRIMARY_COOKIE`` from a recent write.
+    """
+
+    def db_for_read(self, model, **hints):
+        scope = _read_scope.get()
+        if (
+            scope is None
+            or scope["primary"]
+            or model._meta.app_label not in REPLICA_APPS
+            or not replica_configured()
+            or connections[DEFAULT_DB_ALIAS].in_atomic_block
+        ):
+            return DEFAULT_DB_ALIAS
+        return REPLICA_DB
+
+    def db_for_write(self, model, **hints):
+        scope = _read_scope.get()
+        if scope is not None:
+            scope["primary"] = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # The replica holds the same rows as the primary
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == DEFAULT_DB_ALIAS
@@ -0,0 +1,227 @@
+import logging
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.core.signals import request_finished
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import FooterLink, Hero, MenuItem, Partners, SeoPage
+from .utils.admission import controller as admission_controller
+from .utils.cache_purge import purge_urls
+from .utils.events import notify_content_changed
+from .utils.images import generate_variants, source_hash
+from .utils.memory import maybe_record_sample
+from .utils.packing import PACKED_FORMATS, packed_key
+from .utils.search import index_instance, remove_instance
+from .utils.seo import publish_seo_page, seo_url
+
+logger = logging.getLogger(__name__)
+
+# model -> (image field, variants field)
+IMAGE_FIELDS = {
+    Hero: ("background_image", "background_image_variants"),
+    Partners: ("image", "image_variants"),
+}
+
+# model -> cached public URLs that include its rows
+CONTENT_URLS = {
+    MenuItem: ["/api/website-data/", "/api/menu-items/"],
+    Hero: ["/api/website-data/", "/api/heroes/"],
+    Partners: ["/api/website-data/", "/api/partners/"],
+    FooterLink: ["/api/website-data/", "/api/footer-links/"],
+}
+
+# Models changed inside ``coalesce_invalidations()``; None when not coalescing
+_pending_invalidations = ContextVar("pending_invalidations", default=None)
+
+
+def invalidate_content(*models):
+    """Purge the cached URLs of ``models`` once the transaction commits"""
+    pending = _pending_invalidations.get()
+    if pending is not None:
+        pending.update(models)
+        return
+    urls = [url for model in models for url in CONTENT_URLS[model]]
+    transaction.on_commit(lambda: _drop_packed_content(urls))
+    transaction.on_commit(lambda: purge_urls(urls))
+    transaction.on_commit(lambda: notify_clients(urls))
+
+
+def notify_clients(urls):
+    """Tell connected /api/events/ clients that ``urls`` changed"""
+    from .views import redis_client
+
+    try:
+        notify_content_changed(redis_client, urls)
+    except Exception:
+        logger.exception("Could not publish a content event")
+
+
+def _drop_packed_content(urls):
+    """Delete the cached msgpack encodings of website data"""
+    if "/api/website-data/" not in urls:
+        return
+    from .views import WEBSITE_DATA_KEY, redis_client
+
+    try:
+        redis_client.client.delete(
+            *(packed_key(WEBSITE_DATA_KEY, fmt) for fmt in PACKED_FORMATS)
+        )
+    except Exception:
+        # The TTL still bounds how long the stale copy is served
+        logger.exception("Could not drop packed website data")
+
+
+@contextmanager
+def coalesce_invalidations():
+    """Collect content invalidations and run them once on exit
+
+    Used around bulk operations (admin changelist saves and actions) so that
+    changing N rows purges each affected URL once instead of N times.
+    """
+    if _pending_invalidations.get() is not None:
+        # Already coalescing further up the stack
+        yield
+        return
+    pending = set()
+    token = _pending_invalidations.set(pending)
+    try:
+        yield
+    finally:
+        _pending_invalidations.reset(token)
+    if pending:
+        invalidate_content(*pending)
+
+
+def refresh_image_variants(model, pk):
+    """Regenerate the image variants of one row if its image changed
+
+    The image is compared by content hash, so a file replaced under the
+    same path is picked up too.
+    """
+    image_field, variants_field = IMAGE_FIELDS[model]
+    row = model.objects.filter(pk=pk).values(image_field, variants_field).first()
+    if row is None:
+        return
+    image, variants = row[image_field], row[variants_field] or {}
+    try:
+        if not image:
+            new_variants = {}
+        else:
+            current = variants.get("source") == image
+            if current and variants.get("hash") == source_hash(image):
+                return
+            new_variants = generate_variants(image)
+    except Exception:
+        # The row keeps its previous variants; the next save retries
+        logger.exception(
+            "Could not generate image variants of %s %s", model.__name__, pk
+        )
+        return
+    # update() does not send post_save, so this cannot recurse
+    model.objects.filter(pk=pk).update(**{variants_field: new_variants})
+
+
+@receiver(post_save, sender=Hero)
+@receiver(post_save, sender=Partners)
+def schedule_image_variants(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    transaction.on_commit(lambda: refresh_image_variants(sender, instance.pk))
+
+
+@receiver(post_save, sender=MenuItem)
+@receiver(post_save, sender=Hero)
+@receiver(post_save, sender=Partners)
+@receiver(post_save, sender=FooterLink)
+@receiver(post_delete, sender=MenuItem)
+@receiver(post_delete, sender=Hero)
+@receiver(post_delete, sender=Partners)
+@receiver(post_delete, sender=FooterLink)
+def schedule_cache_purge(sender, raw=False, **kwargs):
+    if raw:
+        return
+    invalidate_content(sender)
+
+
+@receiver(post_save, sender=MenuItem)
+@receiver(post_save, sender=Hero)
+@receiver(post_save, sender=Partners)
+@receiver(post_save, sender=FooterLink)
+def schedule_search_index(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    transaction.on_commit(lambda: update_search_index(instance))
+
+
+def update_search_index(instance):
+    """Rebuild the search document of ``instance``"""
+    try:
+        index_instance(instance)
+    except Exception:
+        logger.exception("Could not index %s %s", type(instance).__name__, instance.pk)
+
+
+@receiver(post_delete, sender=MenuItem)
+@receiver(post_delete, sender=Hero)
+@receiver(post_delete, sender=Partners)
+@receiver(post_delete, sender=FooterLink)
+def schedule_search_removal(sender, instance, **kwargs):
+    pk = instance.pk
+    transaction.on_commit(lambda: remove_from_search_index(sender, pk))
+
+
+def remove_from_search_index(model, pk):
+    """Drop the search document of a deleted row"""
+    try:
+        remove_instance(model, pk)
+    except Exception:
+        logger.exception("Could not remove %s %s from search", model.__name__, pk)
+
+
+def refresh_seo_page(page):
+    """Republish one page's SEO entry and purge its cached response"""
+    from .views import redis_client
+
+    try:
+        publish_seo_page(redis_client, page)
+    except Exception:
+        # The cached response stays until its TTL; a purge would only
+        # re-cache the old entry
+        logger.exception("Could not publish the SEO entry of %s", page)
+        return
+    redis_client.wait_for_replicas()
+    purge_urls([seo_url(page)])
+    notify_clients([seo_url(page)])
+
+
+@receiver(post_save, sender=SeoPage)
+@receiver(post_delete, sender=SeoPage)
+def schedule_seo_refresh(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    transaction.on_commit(lambda: refresh_seo_page(instance.page))
+
+
+@receiver(request_finished)
+def sample_memory(sender, **kwargs):
+    """Record this worker's memory use every MEMORY_SAMPLE_INTERVAL seconds"""
+    from .views import redis_client
+
+    try:
+        maybe_record_sample(redis_client)
+    except Exception:
+        logger.exception("Could not record a memory sample")
+
+
+@receiver(request_finished)
+def report_admission(sender, **kwargs):
+    """Publish this worker's admission counts every ADMISSION_STATS_INTERVAL"""
+    from .views import redis_client
+
+    try:
+        admission_controller.maybe_flush(redis_client)
+    except Exception:
+        logger.exception("Could not report admission counts")
@@ -0,0 +1,131 @@
+"""
+Test cases for the content model admin.
+"""
+
+import pytest
+
+from .models import MenuItem, Partners
+from .utils.ordering import ORDER_GAP, move_to_edge, rebalance
+
+
+@pytest.fixture
+def purged(monkeypatch):
+    """Record purge calls made by the content signals."""
+    calls = []
+    monkeypatch.setattr(
+        "apps.website.signals.purge_urls", lambda paths: calls.append(sorted(paths))
+    )
+    return calls
+
+
+@pytest.mark.django_db
+class TestOrdering:
+    """Test the gap-based ordering helpers."""
+
+    def test_rebalance_spaces_rows_evenly(self):
+        """Test that rebalance keeps the existing order."""
+        first = MenuItem.objects.create(label_en="A", route="/a", order=5)
+        second = MenuItem.objects.create(label_en="B", route="/b", order=5)
+        third = MenuItem.objects.create(label_en="C", route="/c", order=1)
+
+        rebalance(MenuItem)
+
+        assert list(MenuItem.objects.order_by("order").values_list("pk", "order")) == [
+            (third.pk, ORDER_GAP),
+            (first.pk, 2 * ORDER_GAP),
+            (second.pk, 3 * ORDER_GAP),
+        ]
+
+    def test_move_to_top_makes_room_when_needed(self):
+        """Test that moving to the top never produces a negative order."""
+        MenuItem.objects.create(label_en="A", route="/a", order=0)
+        last = MenuItem.objects.create(label_en="B", route="/b", order=10)
+
+        move_to_edge(MenuItem.objects.filter(pk=last.pk), top=True)
+
+        assert MenuItem.objects.order_by("order").first().pk == last.pk
+
+
+@pytest.mark.django_db
+class TestOrderedModelAdmin:
+    """Test bulk reordering from the admin change list."""
+
+    def test_list_edit_saves_in_bulk_and_purges_once(
+        self, client, admin_user, purged, django_capture_on_commit_callbacks
+    ):
+        """Test that editing N rows purges the cache once."""
+        partners = [
+            Partners.objects.create(name_en=f"P{i}", image="p.jpg", order=i)
+            for i in range(3)
+        ]
+        client.force_login(admin_user)
+        data = {
+            "form-TOTAL_FORMS": "3",
+            "form-INITIAL_FORMS": "3",
+            "_save": "Save",
+        }
+        for index, partner in enumerate(reversed(partners)):
+            data[f"form-{index}-id"] = str(partner.pk)
+            data[f"form-{index}-order"] = str((index + 1) * ORDER_GAP)
+
+        with django_capture_on_commit_callbacks(execute=True):
+            response = client.post("/admin/website/partners/", data)
+
+        assert response.status_code == 302
+        assert list(
+            Partners.objects.order_by("order").values_list("pk", flat=True)
+        ) == [partner.pk for partner in reversed(partners)]
+        assert purged == [["/api/partners/", "/api/website-data/"]]
+
+    def test_new_rows_are_placed_last_with_a_gap(self, client, admin_user, purged):
+        """Test that rows added in the admin get a gap-based order."""
+        MenuItem.objects.create(label_en="Home", route="/", order=ORDER_GAP)
+        client.force_login(admin_user)
+
+        client.post(
+            "/admin/website/menuitem/add/",
+            {"label_en": "Contact", "route": "/contact", "order": "0"},
+        )
+
+        assert MenuItem.objects.get(label_en="Contact").order == 2 * ORDER_GAP
+
+    def test_move_to_bottom_action(
+        self, client, admin_user, purged, django_capture_on_commit_callbacks
+    ):
+        """Test the move to bottom action."""
+        first = MenuItem.objects.create(label_en="A", route="/a", order=1)
+        MenuItem.objects.create(label_en="B", route="/b", order=2)
+        client.force_login(admin_user)
+
+        with django_capture_on_commit_callbacks(execute=True):
+            client.post(
+                "/admin/website/menuitem/",
+                {"action": "move_to_bottom", "_selected_action": [str(first.pk)]},
+            )
+
+        assert MenuItem.objects.order_by("order").last().pk == first.pk
+        assert purged == [["/api/menu-items/", "/api/website-data/"]]
+
+    def test_move_every_row_to_the_top(
+        self, client, admin_user, purged, django_capture_on_commit_callbacks
+    ):
+        """Test that moving all rows keeps their order instead of failing."""
+        items = [
+            MenuItem.objects.create(label_en=label, route=f"/{label}", order=order)
+            for label, order in (("a", 0), ("b", 0), ("c", 7))
+        ]
+        client.force_login(admin_user)
+
+        with django_capture_on_commit_callbacks(execute=True):
+            response = client.post(
+                "/admin/website/menuitem/",
+                {
+                    "action": "move_to_top",
+                    "_selected_action": [str(item.pk) for item in items],
+                },
+            )
+
+        assert response.status_code == 302
+        assert list(MenuItem.objects.order_by("order").values_list("pk", "order")) == [
+            (item.pk, (index + 1) * ORDER_GAP) for index, item in enumerate(items)
+        ]
@@ -0,0 +1,130 @@
+"""
+Test cases for admission control.
+"""
+
+import time
+
+from django.test import RequestFactory
+
+import pytest
+
+from .utils import admission
+from .utils.admission import ALWAYS, LOW, NORMAL, AdmissionController
+from .views import redis_client
+
+
+@pytest.fixture
+def controller(monkeypatch, settings):
+    """A fresh controller with small limits."""
+    settings.ADMISSION_LOW_PRIORITY_MAX_IN_FLIGHT = 1
+    settings.ADMISSION_MAX_IN_FLIGHT = 2
+    settings.ADMISSION_LOW_PRIORITY_LATENCY_MS = 100
+    settings.ADMISSION_MAX_LATENCY_MS = 1000
+    fresh = AdmissionController()
+    monkeypatch.setattr(admission, "controller", fresh)
+    return fresh
+
+
+class TestPriority:
+    """Test request classification."""
+
+    @pytest.mark.parametrize(
+        "method, path, expected",
+        [
+            ("GET", "/", ALWAYS),
+            ("GET", "/api/home/", ALWAYS),
+            ("GET", "/api/seo/about/", ALWAYS),
+            ("POST", "/api/menu-items/", NORMAL),
+            ("GET", "/api/batch/", LOW),
+            ("POST", "/api/health/set/", LOW),
+            ("GET", "/admin/", NORMAL),
+        ],
+    )
+    def test_request_priority(self, method, path, expected):
+        """Test that probes and cached reads are never low priority."""
+        request = RequestFactory().generic(method, path)
+        assert admission.request_priority(request) == expected
+
+    def test_queue_wait(self):
+        """Test that the nginx timestamp is turned into a wait."""
+        factory = RequestFactory()
+        start = f"t={time.time() - 2:.3f}"
+        assert 1.5 < admission.queue_wait(factory.get("/", HTTP_X_REQUEST_START=start))
+        assert admission.queue_wait(factory.get("/")) == 0.0
+
+    def test_queue_wait_is_capped(self, settings):
+        """Test that a bogus timestamp cannot push the latency up for long."""
+        settings.ADMISSION_MAX_LATENCY_MS = 1000
+        request = RequestFactory().get("/", HTTP_X_REQUEST_START="t=0")
+        assert admission.queue_wait(request) == admission.MAX_QUEUE_WAIT_FACTOR
+
+
+class TestController:
+    """Test the shedding decisions."""
+
+    def test_in_flight_limits(self, controller):
+        """Test that low priority is shed first and probes never."""
+        assert controller.admit(NORMAL) is None
+        assert controller.admit(LOW) == "in_flight"
+        assert controller.admit(NORMAL) is None
+        assert controller.admit(NORMAL) == "in_flight"
+        assert controller.admit(ALWAYS) is None
+        assert controller.state()["in_flight"] == 3
+
+        for _ in range(3):
+            controller.finish(0.01)
+        assert controller.admit(LOW) is None
+
+    def test_latency_recovers(self, controller):
+        """Test that shed requests bring a high average back down."""
+        controller.latency = 0.5
+        assert controller.admit(LOW) == "latency"
+        assert controller.admit(NORMAL) is None
+        controller.finish(0.0)
+        while controller.admit(LOW):
+            pass
+        assert controller.latency < 0.1
+        assert controller.counts["shed:low:latency"] > 1
+
+    def test_flush(self, controller):
+        """Test that counts are added to the shared totals."""
+        redis_client.client.delete(admission.ADMISSION_TOTALS)
+        controller.admit(NORMAL)
+        controller.admit(LOW)
+        controller.flush(redis_client)
+        controller.admit(LOW)
+        controller.flush(redis_client)
+
+        stats = admission.admission_stats(redis_client)
+        assert stats["totals"] == {"admitted:normal": 1, "shed:low:in_flight": 2}
+        assert stats["workers"][admission.worker_id()]["in_flight"] == 1
+        assert controller.counts == {}
+
+
+@pytest.mark.django_db
+class TestMiddleware:
+    """Test the 503 responses."""
+
+    def test_shed_response(self, client, controller, settings):
+        """Test that a shed request gets 503 with Retry-After."""
+        settings.ADMISSION_RETRY_AFTER = 7
+        controller.in_flight = 5
+
+        response = client.get("/api/batch/", {"path": "/api/home/"})
+        assert response.status_code == 503
+        assert response["Retry-After"] == "7"
+        assert response["X-Shed-Reason"] == "low:in_flight"
+        assert client.get("/").status_code == 200
+        assert controller.in_flight == 5
+
+    def test_admitted_requests_are_counted_out(self, client, controller):
+        """Test that in-flight returns to zero after a response."""
+        client.get("/api/search/", {"q": "club"})
+        assert controller.state()["in_flight"] == 0
+        assert controller.counts["admitted:low"] == 1
+
+    def test_disabled(self, client, controller, settings):
+        """Test that nothing is shed when admission control is off."""
+        settings.ADMISSION_CONTROL_ENABLED = False
+        controller.in_flight = 5
+        assert client.get("/api/batch/", {"path": "/"}).status_code == 200
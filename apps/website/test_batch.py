@@ -0,0 +1,109 @@
+"""
+Test cases for the batch endpoint.
+"""
+
+from contextlib import contextmanager
+
+import pytest
+
+from .models import MenuItem
+from .utils.batch import BATCH_MAX_REQUESTS
+from .utils.redis_seo import SEO_DATA
+from .utils.redis_test_json import home_data
+from .views import redis_client
+
+
+@pytest.fixture
+def prefetched(monkeypatch):
+    """Record the reads each batch prefetches."""
+    calls = []
+    prefetch = redis_client.prefetch
+
+    @contextmanager
+    def recording_prefetch(reads):
+        calls.append(list(reads))
+        with prefetch(reads):
+            yield
+
+    monkeypatch.setattr(redis_client, "prefetch", recording_prefetch)
+    return calls
+
+
+class TestPrefetch:
+    """Test RedisClient.prefetch."""
+
+    def test_reads_are_answered_from_the_pipeline(self):
+        """Test that prefetched reads do not go back to Redis."""
+        redis_client.set("test:prefetch", "before")
+        with redis_client.prefetch([("get", "test:prefetch"), ("get", "missing")]):
+            redis_client.set("test:prefetch", "after")
+            assert redis_client.get("test:prefetch") == "before"
+            assert redis_client.get("missing") is None
+        assert redis_client.get("test:prefetch") == "after"
+
+
+@pytest.mark.django_db
+class TestBatch:
+    """Test the batch endpoint."""
+
+    def test_combined_response(self, client, prefetched):
+        """Test that items come back in order with their own status."""
+        client.get("/api/update-redis/")
+        response = client.get(
+            "/api/batch/",
+            {
+                "path": [
+                    "/api/home/",
+                    "/api/seo/about/",
+                    "/api/seo/missing-page/",
+                    "/api/nope/",
+                    "/api/update-redis/",
+                ]
+            },
+        )
+        assert response.status_code == 200
+        items = response.json()["responses"]
+        assert [(item["path"], item["status"]) for item in items] == [
+            ("/api/home/", 200),
+            ("/api/seo/about/", 200),
+            ("/api/seo/missing-page/", 404),
+            ("/api/nope/", 404),
+            ("/api/update-redis/", 400),
+        ]
+        assert items[0]["body"] == home_data
+        assert items[1]["body"] == SEO_DATA["about"]
+        assert prefetched[-1][0] == ("get", "home_page")
+        assert len(prefetched[-1]) == 3
+
+    def test_query_strings_are_passed_on(self, client, prefetched):
+        """Test that sub-requests get their own query parameters."""
+        response = client.get(
+            "/api/batch/", {"path": "/api/health/status/?pr_number=12345"}
+        )
+        body = response.json()["responses"][0]["body"]
+        assert body["status"] == "UNKNOWN"
+        assert "#12345" in body["message"]
+        assert prefetched[-1] == [("get", "health_status_pr_12345")]
+
+    def test_limits(self, client):
+        """Test that empty and oversized batches are rejected."""
+        assert client.get("/api/batch/").status_code == 400
+        paths = ["/api/home/"] * (BATCH_MAX_REQUESTS + 1)
+        assert client.get("/api/batch/", {"path": paths}).status_code == 400
+
+
+@pytest.mark.django_db(transaction=True)
+class TestBatchDatabase:
+    """Test database-backed sub-requests running on pool threads."""
+
+    def test_database_views_run_concurrently(self, client):
+        """Test that streamed and paginated views work in the pool."""
+        MenuItem.objects.create(label_en="Home", route="/", order=1)
+        response = client.get(
+            "/api/batch/",
+            {"path": ["/api/website-data/", "/api/menu-items/?fields=label_en"]},
+        )
+        website_data, menu_items = response.json()["responses"]
+        assert website_data["status"] == 200
+        assert website_data["body"]["menu_items"][0]["label_en"] == "Home"
+        assert menu_items["body"]["results"] == [{"label_en": "Home"}]
@@ -0,0 +1,111 @@
+"""
+Test cases for purging nginx's cached API responses.
+"""
+
+from pathlib import Path
+
+from django.conf import settings as django_settings
+from django.test import RequestFactory
+
+import pytest
+
+from .models import MenuItem
+from .utils import cache_purge
+from .utils.packing import negotiate
+
+NGINX_CONF = Path(django_settings.BASE_DIR) / "compose" / "prod" / "nginx.conf"
+
+
+@pytest.fixture
+def refreshed(monkeypatch):
+    """Record purge requests instead of sending them."""
+    calls = []
+
+    class FakeResponse:
+        def __enter__(self):
+            return self
+
+        def __exit__(self, *exc):
+            return False
+
+        def read(self):
+            return b""
+
+    def fake_urlopen(request, timeout):
+        calls.append((request.full_url, dict(request.header_items())))
+        return FakeResponse()
+
+    monkeypatch.setattr(cache_purge, "urlopen", fake_urlopen)
+    return calls
+
+
+class TestPurgeUrls:
+    """Test the purge helper."""
+
+    def test_disabled_without_purge_url(self, settings, refreshed):
+        """Test that nothing is sent when purging is not configured."""
+        settings.NGINX_CACHE_PURGE_URL = ""
+        cache_purge.purge_urls(["/api/home/"], background=False)
+        assert refreshed == []
+
+    def test_every_cache_variant_is_refreshed(self, settings, refreshed):
+        """Test that each language/encoding variant is requested."""
+        settings.NGINX_CACHE_PURGE_URL = "http://nginx:8081/"
+        settings.NGINX_CACHE_PURGE_HOST = "example.com"
+        cache_purge.purge_urls(["/api/home/", "/api/home/"], background=False)
+
+        formats = 1 + len(cache_purge.PACKED_VARIANTS)
+        assert len(refreshed) == len(cache_purge.CACHE_VARIANTS) * formats
+        assert {url for url, _ in refreshed} == {"http://nginx:8081/api/home/"}
+        assert {headers["Accept-language"] for _, headers in refreshed} == {
+            "en",
+            "ar",
+        }
+        assert {headers.get("Accept") for _, headers in refreshed} == {
+            None,
+            "application/msgpack",
+            "application/msgpack; strings=table",
+        }
+        assert all(headers["Host"] == "example.com" for _, headers in refreshed)
+
+    @pytest.mark.parametrize(
+        "accept",
+        ["*/*", "application/json, text/plain, */*", "text/html,*/*;q=0.8"],
+    )
+    def test_browser_accept_shares_a_refreshed_entry(self, accept):
+        """Test that a browser's Accept reads an entry the purge replaces."""
+        factory = RequestFactory()
+        refreshed_formats = {
+            negotiate(factory.get("/", HTTP_ACCEPT=headers.get("Accept", "")))
+            for headers in cache_purge._variants("/api/home/")
+        }
+        assert negotiate(factory.get("/", HTTP_ACCEPT=accept)) in refreshed_formats
+        # nginx keys entries on the format, not on each raw Accept value
+        assert NGINX_CONF.read_text().count("proxy_ignore_headers Vary;") == 2
+
+    def test_json_only_urls_skip_packed_variants(self, settings, refreshed):
+        """Test that msgpack variants are only refreshed where they exist."""
+        settings.NGINX_CACHE_PURGE_URL = "http://nginx:8081/"
+        cache_purge.purge_urls(["/api/menu-items/"], background=False)
+
+        assert len(refreshed) == len(cache_purge.CACHE_VARIANTS)
+        assert all("Accept" not in headers for _, headers in refreshed)
+
+
+@pytest.mark.django_db
+class TestPurgeSignals:
+    """Test that content changes purge exactly the affected URLs."""
+
+    def test_menu_item_save_purges_menu_urls(
+        self, monkeypatch, django_capture_on_commit_callbacks
+    ):
+        """Test that saving a menu item purges its URLs after commit."""
+        purged = []
+        monkeypatch.setattr(
+            "apps.website.signals.purge_urls", lambda paths: purged.append(paths)
+        )
+
+        with django_capture_on_commit_callbacks(execute=True):
+            MenuItem.objects.create(label_en="Home", route="/", order=1)
+
+        assert purged == [["/api/website-data/", "/api/menu-items/"]]
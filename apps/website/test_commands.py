@@ -0,0 +1,325 @@
+"""
+Test cases for the content import/export, startup, media and Redis management
+commands.
+"""
+
+import io
+import json
+import os
+
+from django.core.files.storage import FileSystemStorage
+from django.core.management import call_command
+from django.core.management.base import CommandError
+
+import pytest
+
+from .management.commands.startup_profile import parse_import_times
+from .models import FooterLink, Hero, MenuItem, Partners
+from .utils.content_io import iter_json_array
+from .utils.media_sync import sync_media
+from .utils.redis_test_json import home_data
+from .views import redis_client
+
+
+@pytest.fixture
+def purged(monkeypatch):
+    """Record purge calls made by the content signals."""
+    calls = []
+    monkeypatch.setattr(
+        "apps.website.signals.purge_urls", lambda paths: calls.append(sorted(paths))
+    )
+    return calls
+
+
+def test_iter_json_array_across_buffer_boundaries(monkeypatch):
+    """Test that elements split across reads are decoded."""
+    monkeypatch.setattr("apps.website.utils.content_io.READ_SIZE", 7)
+    records = [{"model": "hero", "fields": {"title_en": f"Hero {i}"}} for i in range(5)]
+    handle = io.StringIO(json.dumps(records, indent=2))
+    assert list(iter_json_array(handle)) == records
+
+
+@pytest.mark.django_db(transaction=True)
+class TestImportContent:
+    """Test the import_content command."""
+
+    def test_home_data_import_is_idempotent(self, tmp_path, purged):
+        """Test that importing home_data twice updates rows in place."""
+        path = tmp_path / "home.json"
+        path.write_text(json.dumps(home_data), encoding="utf-8")
+
+        call_command(
+            "import_content", str(path), "--skip-variants", stdout=io.StringIO()
+        )
+        call_command(
+            "import_content", str(path), "--skip-variants", stdout=io.StringIO()
+        )
+
+        assert MenuItem.objects.count() == len(home_data["header"]["menu"])
+        assert Partners.objects.count() == len(home_data["partners"])
+        assert Hero.objects.get().background_image == "/images/others/hero.png"
+        assert FooterLink.objects.filter(key="about-us").exists()
+        # One purge per import, not one per row
+        assert len(purged) == 2
+
+    def test_home_data_keeps_unrelated_rows(self, tmp_path, purged):
+        """Test that home_data rows are matched by natural key, not position."""
+        own = MenuItem.objects.create(label_en="Own", route="/own", order=1)
+        home = MenuItem.objects.create(label_en="Old home", route="/", order=2)
+        path = tmp_path / "home.json"
+        path.write_text(json.dumps(home_data), encoding="utf-8")
+
+        call_command(
+            "import_content", str(path), "--skip-variants", stdout=io.StringIO()
+        )
+
+        assert MenuItem.objects.get(pk=own.pk).label_en == "Own"
+        home.refresh_from_db()
+        assert home.label_en != "Old home"
+        menu = home_data["header"]["menu"]
+        assert MenuItem.objects.count() == len(menu) + 1
+
+    def test_empty_file_is_a_command_error(self, tmp_path):
+        """Test that undecodable home_data is reported, not raised."""
+        path = tmp_path / "empty.json"
+        path.write_text("")
+        with pytest.raises(CommandError, match="Invalid JSON"):
+            call_command("import_content", str(path), stdout=io.StringIO())
+
+    def test_new_rows_do_not_collide_with_imported_ids(self, tmp_path, purged):
+        """Test that primary key sequences are moved past imported ids."""
+        path = tmp_path / "menu.ndjson"
+        path.write_text(
+            json.dumps(
+                {
+                    "model": "menu_item",
+                    "id": 50,
+                    "fields": {"label_en": "A", "route": "/"},
+                }
+            )
+            + "\n",
+            encoding="utf-8",
+        )
+        call_command("import_content", str(path), stdout=io.StringIO())
+
+        assert MenuItem.objects.create(label_en="B", route="/b").pk > 50
+
+    def test_unknown_model_is_rejected(self, tmp_path):
+        """Test that invalid records abort the import."""
+        path = tmp_path / "bad.ndjson"
+        path.write_text(json.dumps({"model": "user", "fields": {}}) + "\n")
+        with pytest.raises(CommandError):
+            call_command("import_content", str(path), stdout=io.StringIO())
+
+
+@pytest.mark.django_db(transaction=True)
+class TestExportContent:
+    """Test the export_content command."""
+
+    @pytest.mark.parametrize("fmt,suffix", [("ndjson", "ndjson"), ("json", "json")])
+    def test_round_trip(self, tmp_path, purged, fmt, suffix):
+        """Test that an export can be imported back unchanged."""
+        MenuItem.objects.create(
+            label_en="Home", label_ar="الرئيسية", route="/", order=2
+        )
+        FooterLink.objects.create(key="about", label_en="About", route="/about")
+        before = list(MenuItem.objects.values()) + list(FooterLink.objects.values())
+        path = tmp_path / f"content.{suffix}"
+
+        call_command("export_content", str(path), "--format", fmt, stderr=io.StringIO())
+        MenuItem.objects.all().delete()
+        FooterLink.objects.all().delete()
+        call_command("import_content", str(path), stdout=io.StringIO())
+
+        after = list(MenuItem.objects.values()) + list(FooterLink.objects.values())
+        assert after == before
+
+
+class TestStartupProfile:
+    """Test the startup_profile command."""
+
+    def test_parse_import_times(self):
+        """Test that only top-level imports are reported."""
+        stderr = (
+            "import time: self [us] | cumulative | imported package\n"
+            "import time:       120 |        120 |   json.decoder\n"
+            "import time:       300 |       2500 | json\n"
+        )
+        assert parse_import_times(stderr) == {"json": 0.0025}
+
+    def test_baseline_round_trip(self, tmp_path):
+        """Test saving a baseline and comparing the next run against it."""
+        baseline = tmp_path / "baseline.json"
+        call_command(
+            "startup_profile",
+            runs=1,
+            baseline=str(baseline),
+            save=True,
+            stdout=io.StringIO(),
+        )
+        stored = json.loads(baseline.read_text())
+        assert stored["phases"]["django.setup()"] > 0
+        assert "apps.website.views" in stored["modules"]
+
+        out = io.StringIO()
+        call_command(
+            "startup_profile",
+            runs=1,
+            baseline=str(baseline),
+            max_regression=1000,
+            stdout=out,
+        )
+        assert "ms)" in out.getvalue()
+
+    def test_regression_check_needs_a_baseline(self, tmp_path):
+        """Test that a missing baseline fails instead of passing."""
+        with pytest.raises(CommandError, match="No baseline"):
+            call_command(
+                "startup_profile",
+                runs=1,
+                baseline=str(tmp_path / "missing.json"),
+                max_regression=20,
+                stdout=io.StringIO(),
+            )
+
+
+@pytest.fixture
+def media(tmp_path):
+    """A small media tree and an empty filesystem storage to sync it to."""
+    source = tmp_path / "media"
+    (source / "img").mkdir(parents=True)
+    (source / "a.txt").write_text("alpha")
+    (source / "img" / "b.png").write_bytes(b"\x89PNG" + b"0" * 1000)
+    return source, FileSystemStorage(location=tmp_path / "dest")
+
+
+class FlakyStorage(FileSystemStorage):
+    """Fails the first upload of ``img/b.png``."""
+
+    failed = False
+
+    def _save(self, name, content):
+        if name == "img/b.png" and not FlakyStorage.failed:
+            FlakyStorage.failed = True
+            raise OSError("connection reset")
+        return super()._save(name, content)
+
+
+class OverwritingStorage(FileSystemStorage):
+    """Overwrites in place like S3Boto3Storage and records its calls."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.calls = []
+
+    def get_available_name(self, name, max_length=None):
+        return name
+
+    def exists(self, name):
+        self.calls.append("exists")
+        return super().exists(name)
+
+    def delete(self, name):
+        self.calls.append("delete")
+        super().delete(name)
+
+    def _save(self, name, content):
+        if os.path.exists(self.path(name)):
+            os.remove(self.path(name))
+        return super()._save(name, content)
+
+
+class TestSyncMedia:
+    """Test the sync_media command."""
+
+    def test_unchanged_files_are_skipped(self, media):
+        """Test that a second sync uploads nothing."""
+        source, storage = media
+        assert sync_media(str(source), storage)["uploaded"] == 2
+        assert storage.open("img/b.png").read().startswith(b"\x89PNG")
+
+        counts = sync_media(str(source), storage)
+        assert (counts["uploaded"], counts["unchanged"]) == (0, 2)
+
+    def test_content_hash_decides(self, media):
+        """Test that touched files are skipped and edited ones replaced."""
+        source, storage = media
+        sync_media(str(source), storage)
+        os.utime(source / "a.txt", ns=(0, 0))
+        (source / "img" / "b.png").write_bytes(b"changed")
+
+        counts = sync_media(str(source), storage)
+        assert (counts["uploaded"], counts["unchanged"]) == (1, 1)
+        assert storage.listdir("img")[1] == ["b.png"]
+        assert storage.open("img/b.png").read() == b"changed"
+
+    def test_overwriting_storage_is_written_in_place(self, media, tmp_path):
+        """Test that no existence check or delete precedes the upload."""
+        source, _ = media
+        storage = OverwritingStorage(location=tmp_path / "dest")
+        sync_media(str(source), storage)
+        (source / "a.txt").write_text("changed")
+
+        assert sync_media(str(source), storage)["uploaded"] == 1
+        assert storage.open("a.txt").read() == b"changed"
+        assert "delete" not in storage.calls
+        assert "exists" not in storage.calls
+
+    def test_resumes_after_failure(self, media, tmp_path):
+        """Test that a rerun only uploads what did not make it."""
+        source, _ = media
+        storage = FlakyStorage(location=tmp_path / "dest")
+        failures = []
+        counts = sync_media(
+            str(source), storage, on_result=lambda *result: failures.append(result)
+        )
+        assert (counts["uploaded"], counts["failed"]) == (1, 1)
+        # Uploads finish in any order
+        assert ("img/b.png", "failed") in [result[:2] for result in failures]
+
+        counts = sync_media(str(source), storage)
+        assert (counts["uploaded"], counts["unchanged"]) == (1, 1)
+
+    def test_command(self, media, monkeypatch):
+        """Test the command output and dry run."""
+        source, storage = media
+        monkeypatch.setattr(
+            "apps.website.management.commands.sync_media.default_storage", storage
+        )
+        out = io.StringIO()
+        call_command("sync_media", str(source), dry_run=True, stdout=out)
+        assert "Would upload img/b.png" in out.getvalue()
+        assert not storage.exists("a.txt")
+
+        out = io.StringIO()
+        call_command("sync_media", str(source), stdout=out)
+        assert "2 uploaded" in out.getvalue()
+        assert storage.exists("a.txt")
+
+
+@pytest.mark.django_db
+class TestRedisUsage:
+    """Test the redis_usage command."""
+
+    def test_report(self, client):
+        """Test the per-namespace table."""
+        client.get("/api/update-redis/")
+        out = io.StringIO()
+        call_command("redis_usage", sample=3, stdout=out, stderr=io.StringIO())
+        lines = out.getvalue().splitlines()
+        assert lines[0].startswith("used_memory")
+        assert lines[1].split()[:3] == ["namespace", "keys", "sampled"]
+        assert any(line.startswith("seo_pages ") for line in lines)
+
+    def test_strict(self):
+        """Test that --strict fails on undeclared keys."""
+        redis_client.client.set("stray", "x")
+        err = io.StringIO()
+        try:
+            with pytest.raises(CommandError):
+                call_command(
+                    "redis_usage", strict=True, stdout=io.StringIO(), stderr=err
+                )
+        finally:
+            redis_client.client.delete("stray")
+        assert "undeclared key: stray" in err.getvalue()
@@ -0,0 +1,270 @@
+"""
+Test cases for server-sent content events.
+"""
+
+import asyncio
+import json
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+
+from django.test import RequestFactory
+
+import pytest
+
+from config.asgi import application
+
+from .utils import events
+from .utils.events import (
+    Broadcaster,
+    event_stream,
+    events_since,
+    notify_content_changed,
+)
+from .views import events_api, redis_client
+
+
+@pytest.fixture(autouse=True)
+def empty_event_log():
+    redis_client.client.delete(events.CONTENT_VERSION_KEY, events.CONTENT_EVENTS_LOG)
+
+
+def parse(message):
+    """Return the fields of one SSE message as a dict."""
+    fields = dict(line.split(": ", 1) for line in message.strip().splitlines())
+    if "data" in fields:
+        fields["data"] = json.loads(fields["data"])
+    return fields
+
+
+async def read(stream, count):
+    return [parse(await asyncio.wait_for(anext(stream), 2)) for _ in range(count)]
+
+
+async def connected(last_id=None, heartbeat=30):
+    """Open a stream past its retry line and wait for the subscription."""
+    broadcaster = Broadcaster(redis_client)
+    stream = event_stream(broadcaster, redis_client, last_id, heartbeat)
+    await anext(stream)  # retry interval
+    await asyncio.to_thread(broadcaster.ready.wait, 2)
+    return stream
+
+
+class TestEventLog:
+    """Test publishing and replaying events."""
+
+    def test_events_since(self):
+        """Test that missed events are replayed in order."""
+        for n in range(3):
+            notify_content_changed(redis_client, [f"/api/seo/page-{n}/"])
+        assert [event["id"] for event in events_since(redis_client, 1)] == [2, 3]
+        assert events_since(redis_client, 3) == []
+
+    def test_trimmed_or_unknown_ids_need_a_reset(self, monkeypatch):
+        """Test that gaps the log cannot fill are reported."""
+        monkeypatch.setattr(events, "CONTENT_EVENTS_LOG_SIZE", 2)
+        for _ in range(4):
+            notify_content_changed(redis_client, ["/api/home/"])
+        assert events_since(redis_client, 0) is None
+        assert [event["id"] for event in events_since(redis_client, 2)] == [3, 4]
+        assert events_since(redis_client, 99) is None
+
+    def test_concurrent_events_are_published_in_order(self, monkeypatch):
+        """Test that ids reach subscribers in the order they were issued."""
+
+        def slow_clock():
+            # Widens any gap between issuing an id and publishing it
+            time.sleep(random.random() / 100)
+            return time.time()
+
+        monkeypatch.setattr(
+            events, "time", SimpleNamespace(time=slow_clock, sleep=time.sleep)
+        )
+        pubsub = redis_client.client.pubsub()
+        pubsub.subscribe(events.CONTENT_EVENTS_CHANNEL)
+        try:
+            with ThreadPoolExecutor(max_workers=8) as pool:
+                for n in range(40):
+                    pool.submit(notify_content_changed, redis_client, [f"/{n}/"])
+            ids = []
+            while message := pubsub.get_message(timeout=1):
+                ids.append(json.loads(message["data"])["id"])
+        finally:
+            pubsub.close()
+        assert ids == list(range(1, 41))
+        assert [event["id"] for event in events_since(redis_client, 0)] == ids
+
+
+class TestEventStream:
+    """Test the per-client stream."""
+
+    def test_live_events_and_heartbeat(self):
+        """Test that a new client gets the version, then changes."""
+
+        async def scenario():
+            broadcaster = Broadcaster(redis_client)
+            stream = event_stream(broadcaster, redis_client, heartbeat=0.05)
+            assert (await anext(stream)).startswith("retry:")
+            version = (await read(stream, 1))[0]
+            assert version["event"] == "version"
+            await asyncio.to_thread(broadcaster.ready.wait, 2)
+
+            notify_content_changed(redis_client, ["/api/home/", "/api/home/"])
+            change, heartbeat = await read(stream, 2)
+            await stream.aclose()
+            assert not broadcaster.subscriptions
+            return version, change, heartbeat
+
+        version, change, heartbeat = asyncio.run(scenario())
+        assert version["id"] == "0"
+        assert change["event"] == "content"
+        assert change["id"] == "1"
+        assert change["data"]["urls"] == ["/api/home/"]
+        assert heartbeat == {"": "heartbeat"}
+
+    def test_resume_from_last_event_id(self):
+        """Test that a reconnecting client first gets what it missed."""
+        for _ in range(3):
+            notify_content_changed(redis_client, ["/api/home/"])
+
+        async def scenario():
+            stream = await connected(last_id=1)
+            messages = await read(stream, 2)
+            await stream.aclose()
+            return messages
+
+        assert [message["id"] for message in asyncio.run(scenario())] == ["2", "3"]
+
+    def test_event_published_before_the_subscription_is_live(self):
+        """Test that a new client's version includes events it could miss."""
+
+        async def scenario():
+            broadcaster = Broadcaster(redis_client)
+            gate = threading.Event()
+            listen = broadcaster._listen
+            broadcaster._listen = lambda: gate.wait(2) and listen()
+            stream = event_stream(broadcaster, redis_client, heartbeat=30)
+            await anext(stream)  # retry interval
+            version = asyncio.ensure_future(anext(stream))
+            await asyncio.sleep(0.05)
+            # Nobody is subscribed yet, so this publish reaches no client
+            notify_content_changed(redis_client, ["/api/home/"])
+            gate.set()
+            message = parse(await asyncio.wait_for(version, 2))
+            await stream.aclose()
+            return message
+
+        message = asyncio.run(scenario())
+        assert message["event"] == "version"
+        assert message["id"] == "1"
+
+    def test_missed_events_are_replayed(self, monkeypatch):
+        """Test that a gap in the ids is filled from the log, or reset."""
+        # As if the subscription were down while these were published
+        lost = {1, 2, 4}
+
+        async def scenario():
+            broadcaster = Broadcaster(redis_client)
+            publish = broadcaster.publish
+            broadcaster.publish = lambda data: (
+                json.loads(data)["id"] in lost or publish(data)
+            )
+            stream = event_stream(broadcaster, redis_client, heartbeat=30)
+            await anext(stream)  # retry interval
+            await read(stream, 1)  # version
+            for _ in range(3):
+                notify_content_changed(redis_client, ["/api/home/"])
+            replayed = await read(stream, 3)
+
+            # The log no longer reaches back to the missed event
+            monkeypatch.setattr(events, "CONTENT_EVENTS_LOG_SIZE", 1)
+            for _ in range(2):
+                notify_content_changed(redis_client, ["/api/home/"])
+            reset = await read(stream, 1)
+            await stream.aclose()
+            return replayed + reset
+
+        messages = asyncio.run(scenario())
+        assert [(m["event"], m["id"]) for m in messages] == [
+            ("content", "1"),
+            ("content", "2"),
+            ("content", "3"),
+            ("reset", "5"),
+        ]
+
+    def test_slow_client_is_disconnected(self, settings):
+        """Test that a full buffer ends the stream instead of growing."""
+        settings.SSE_CLIENT_BUFFER = 1
+
+        async def scenario():
+            stream = await connected()
+            await read(stream, 1)  # version
+            for _ in range(3):
+                notify_content_changed(redis_client, ["/api/home/"])
+            await asyncio.sleep(0.1)
+            messages = [parse(message) async for message in stream]
+            return messages
+
+        messages = asyncio.run(scenario())
+        assert [message["id"] for message in messages] == ["1"]
+
+
+class TestEventsView:
+    """Test the /api/events/ endpoint."""
+
+    def test_stream_response(self):
+        """Test the response type and headers."""
+        request = RequestFactory().get("/api/events/", HTTP_LAST_EVENT_ID="0")
+        response = asyncio.run(events_api(request))
+        assert response["Content-Type"] == "text/event-stream"
+        assert response["X-Accel-Buffering"] == "no"
+        assert response.is_async
+
+    def test_disconnect_ends_the_stream(self):
+        """Test that a client disconnecting through ASGI unsubscribes it."""
+        broadcaster = events.get_broadcaster(redis_client)
+        scope = {
+            "type": "http",
+            "asgi": {"version": "3.0"},
+            "http_version": "1.1",
+            "method": "GET",
+            "scheme": "http",
+            "path": "/api/events/",
+            "raw_path": b"/api/events/",
+            "query_string": b"",
+            "headers": [(b"host", b"localhost")],
+            "server": ("localhost", 8001),
+            "client": ("127.0.0.1", 50000),
+        }
+
+        async def scenario():
+            gone = asyncio.Event()
+            received = iter([{"type": "http.request", "body": b""}])
+            sent = []
+
+            async def receive():
+                try:
+                    return next(received)
+                except StopIteration:
+                    await gone.wait()
+                    return {"type": "http.disconnect"}
+
+            async def send(message):
+                sent.append(message)
+                if b"event: version" in message.get("body", b""):
+                    assert broadcaster.subscriptions
+                    gone.set()
+
+            await asyncio.wait_for(application(scope, receive, send), 2)
+            return sent
+
+        sent = asyncio.run(scenario())
+        assert sent[0]["status"] == 200
+        assert not broadcaster.subscriptions
+
+    def test_invalid_last_event_id(self):
+        """Test that a malformed Last-Event-ID is rejected."""
+        request = RequestFactory().get("/api/events/", HTTP_LAST_EVENT_ID="x")
+        assert asyncio.run(events_api(request)).status_code == 400
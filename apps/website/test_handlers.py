@@ -0,0 +1,109 @@
+"""
+Test cases for the lean middleware dispatch of public API reads.
+"""
+
+import io
+import sys
+
+from django.contrib.auth import get_user_model
+from django.test import Client
+
+import pytest
+
+from config.handlers import WSGIDispatcher, is_lean_request
+
+User = get_user_model()
+
+
+def call(application, path, method="GET", query="", **extra):
+    environ = {
+        "REQUEST_METHOD": method,
+        "PATH_INFO": path,
+        "QUERY_STRING": query,
+        "SERVER_NAME": "localhost",
+        "SERVER_PORT": "8000",
+        "HTTP_HOST": "localhost",
+        "wsgi.url_scheme": "http",
+        "wsgi.input": io.BytesIO(),
+        "wsgi.errors": sys.stderr,
+        **extra,
+    }
+    result = {}
+
+    def start_response(status, headers):
+        result["status"] = int(status.split()[0])
+        result["headers"] = dict(headers)
+
+    b"".join(application(environ, start_response))
+    return result
+
+
+class TestIsLeanRequest:
+    """Test which requests skip the full middleware stack."""
+
+    @pytest.mark.parametrize(
+        "path,method,expected",
+        [
+            ("/api/website-data/", "GET", True),
+            ("/api/seo/home/", "HEAD", True),
+            ("/api/health/set/", "POST", False),
+            ("/api/update-redis/", "GET", False),
+            ("/admin/", "GET", False),
+            ("/", "GET", False),
+        ],
+    )
+    def test_routing(self, path, method, expected):
+        """Test the routing decision for a few paths."""
+        assert is_lean_request(path, method) is expected
+
+    def test_profile_flag_takes_the_full_chain(self):
+        """Test that ?profile=1 keeps the session and auth middleware."""
+        assert not is_lean_request("/api/home/", "GET", "profile=1")
+        assert is_lean_request("/api/home/", "GET", "profile=")
+        assert is_lean_request("/api/home/", "GET", "q=profiles")
+
+
+@pytest.mark.django_db
+class TestWSGIDispatcher:
+    """Test the dispatcher end to end."""
+
+    @pytest.fixture
+    def application(self, settings):
+        settings.ALLOWED_HOSTS = ["localhost"]
+        return WSGIDispatcher()
+
+    def test_lean_chain_has_fewer_middleware(self, application, settings):
+        """Test that the lean handler is built from LEAN_MIDDLEWARE."""
+        assert len(application.lean._view_middleware) < len(
+            application.full._view_middleware
+        )
+
+    def test_admin_keeps_full_protection(self, application):
+        """Test that admin still redirects anonymous users to login."""
+        response = call(application, "/admin/")
+        assert response["status"] == 302
+        assert response["headers"]["X-Frame-Options"] == "DENY"
+
+    def test_public_read_is_served(self, application):
+        """Test that API reads work through the lean chain."""
+        response = call(application, "/api/menu-items/")
+        assert response["status"] == 200
+        assert "X-Frame-Options" not in response["headers"]
+
+    def test_staff_profile_flag(self, application, settings):
+        """Test that staff ?profile=1 requests are profiled via the dispatcher."""
+        settings.PROFILING_SAMPLE_RATE = 0.0
+        staff = User.objects.create_user(
+            username="profiler", password="pass", is_staff=True
+        )
+        client = Client()
+        client.force_login(staff)
+        cookie = f"sessionid={client.cookies['sessionid'].value}"
+
+        response = call(
+            application, "/api/home/", query="profile=1", HTTP_COOKIE=cookie
+        )
+        assert response["headers"].get("X-Profile-Id")
+
+        anonymous = call(application, "/api/home/", query="profile=1")
+        assert "X-Profile-Id" not in anonymous["headers"]
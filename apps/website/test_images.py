@@ -0,0 +1,130 @@
+"""
+Test cases for the responsive image variant pipeline.
+"""
+
+import io
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import FileSystemStorage, default_storage
+
+import pytest
+from PIL import Image
+
+from .models import Hero, Partners
+from .utils.images import generate_variants
+
+
+def make_png(width=800, height=400):
+    output = io.BytesIO()
+    Image.new("RGB", (width, height), (0, 120, 200)).save(output, format="PNG")
+    return output.getvalue()
+
+
+@pytest.fixture
+def storage(tmp_path):
+    return FileSystemStorage(location=tmp_path, base_url="/media/")
+
+
+class TestGenerateVariants:
+    """Test variant generation against a filesystem storage."""
+
+    def test_variants_are_generated_per_width_and_format(self, storage, settings):
+        """Test that widths above the source width are capped."""
+        settings.IMAGE_VARIANT_FORMATS = ("webp",)
+        storage.save("images/hero.png", ContentFile(make_png()))
+
+        result = generate_variants("/images/hero.png", storage=storage)
+
+        widths = [variant["width"] for variant in result["variants"]]
+        assert widths == [320, 640, 800]
+        for variant in result["variants"]:
+            assert f".{result['hash']}." in variant["url"]
+            assert storage.exists(variant["url"][len("/media/") :])
+        assert result["srcset"]["webp"].endswith("800w")
+
+    def test_unchanged_source_is_not_rendered_again(self, storage, settings):
+        """Test that existing variants are reused."""
+        settings.IMAGE_VARIANT_FORMATS = ("webp",)
+        storage.save("hero.png", ContentFile(make_png()))
+        first = generate_variants("hero.png", storage=storage)
+        path = storage.path(first["variants"][0]["url"][len("/media/") :])
+        mtime = storage.get_modified_time(path)
+
+        second = generate_variants("hero.png", storage=storage)
+
+        assert second == first
+        assert storage.get_modified_time(path) == mtime
+
+    def test_missing_source_returns_empty(self, storage):
+        """Test that paths outside storage are skipped."""
+        assert generate_variants("/images/missing.png", storage=storage) == {}
+
+
+@pytest.mark.django_db
+class TestVariantSignals:
+    """Test that saving a model stores its variants."""
+
+    def test_partner_variants_are_stored_on_commit(
+        self, tmp_path, settings, django_capture_on_commit_callbacks
+    ):
+        """Test that variants are generated once the row is committed."""
+        settings.MEDIA_ROOT = tmp_path
+        settings.IMAGE_VARIANT_FORMATS = ("webp",)
+        default_storage.save("partner.png", ContentFile(make_png(400, 200)))
+
+        with django_capture_on_commit_callbacks(execute=True):
+            partner = Partners.objects.create(
+                name_en="Partner", image="partner.png", order=1
+            )
+
+        partner.refresh_from_db()
+        assert partner.image_variants["source"] == "partner.png"
+        assert "webp" in partner.image_variants["srcset"]
+
+    def test_hero_without_image_has_no_variants(
+        self, django_capture_on_commit_callbacks
+    ):
+        """Test that heroes without an image are left empty."""
+        with django_capture_on_commit_callbacks(execute=True):
+            hero = Hero.objects.create(title_en="Hero")
+
+        hero.refresh_from_db()
+        assert hero.background_image_variants == {}
+
+    def test_replaced_file_is_regenerated(
+        self, tmp_path, settings, django_capture_on_commit_callbacks
+    ):
+        """Test that new content under the same path gets new variants."""
+        settings.MEDIA_ROOT = tmp_path
+        settings.IMAGE_VARIANT_FORMATS = ("webp",)
+        default_storage.save("partner.png", ContentFile(make_png(400, 200)))
+        with django_capture_on_commit_callbacks(execute=True):
+            partner = Partners.objects.create(
+                name_en="Partner", image="partner.png", order=1
+            )
+        partner.refresh_from_db()
+        first = partner.image_variants["hash"]
+
+        (tmp_path / "partner.png").write_bytes(make_png(300, 300))
+        with django_capture_on_commit_callbacks(execute=True):
+            partner.save()
+
+        partner.refresh_from_db()
+        assert partner.image_variants["hash"] != first
+        assert partner.image_variants["variants"][-1]["width"] == 300
+
+    def test_generation_errors_are_logged(
+        self, tmp_path, settings, django_capture_on_commit_callbacks, caplog
+    ):
+        """Test that a broken image does not escape the on_commit hook."""
+        settings.MEDIA_ROOT = tmp_path
+        default_storage.save("broken.png", ContentFile(b"not an image"))
+
+        with django_capture_on_commit_callbacks(execute=True):
+            partner = Partners.objects.create(
+                name_en="Partner", image="broken.png", order=1
+            )
+
+        partner.refresh_from_db()
+        assert partner.image_variants == {}
+        assert "Could not generate image variants" in caplog.text
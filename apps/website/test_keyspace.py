@@ -0,0 +1,102 @@
+"""
+Test cases for the Redis keyspace registry.
+"""
+
+import json
+
+import pytest
+
+from .utils.keyspace import (
+    PER_KEY,
+    PERSISTENT,
+    UndeclaredKeyError,
+    keyspace_problems,
+    keyspace_usage,
+    namespace_for,
+)
+from .views import HEALTH_STATUS_INDEX, redis_client
+
+
+class TestRegistry:
+    """Test namespace lookup and write enforcement."""
+
+    def test_namespace_for(self):
+        """Test exact names, prefixes and the most specific match."""
+        assert namespace_for("home_page").ttl is PERSISTENT
+        assert namespace_for("home_page:msgpack-dedup").encoding == "msgpack"
+        assert namespace_for(b"health_status_pr_12").expire() == 86400
+        sessions = namespace_for(":1:django.contrib.sessions.cached_dbabc")
+        assert sessions.owner == "sessions cache"
+        assert namespace_for(":1:other").ttl == PER_KEY
+        assert namespace_for("home_page_old") is None
+
+    def test_scratch_namespace_is_test_only(self, monkeypatch):
+        """Test that ``test:*`` comes from conftest, not the app's registry."""
+        assert namespace_for("test:x").owner == "tests"
+        monkeypatch.undo()
+        assert namespace_for("test:x") is None
+
+    def test_settings_ttl(self, settings):
+        """Test that TTLs named by a setting follow it."""
+        settings.PROFILING_TTL = 60
+        assert namespace_for("profile:abc").expire() == 60
+
+    def test_undeclared_write_is_refused(self):
+        """Test that the client only writes declared keys."""
+        with pytest.raises(UndeclaredKeyError):
+            redis_client.set_json("scratch", {})
+        assert not redis_client.exists("scratch")
+
+    def test_undeclared_pipeline_write_is_refused(self):
+        """Test that pipeline writes are checked when they are queued."""
+        for pipe in (redis_client.pipeline(), redis_client.raw_pipeline()):
+            pipe.set("test:pipeline", "x", ex=60)
+            with pytest.raises(UndeclaredKeyError):
+                pipe.zadd("scratch", {"x": 1})
+            pipe.reset()
+        assert not redis_client.exists("scratch")
+        assert not redis_client.exists("test:pipeline")
+
+    def test_declared_ttl_is_applied(self):
+        """Test that writes without an expiry get the namespace's TTL."""
+        redis_client.set_bytes("website_data:msgpack", b"\x80")
+        redis_client.set_json("seo_data", {})
+        assert 0 < redis_client.client.ttl("website_data:msgpack") <= 300
+        assert redis_client.client.ttl("seo_data") == -1
+        redis_client.delete("website_data:msgpack")
+
+
+@pytest.mark.django_db
+class TestKeyspaceUsage:
+    """Test the namespace report."""
+
+    def test_app_writes_are_declared(self, client):
+        """Test that publishing and serving leave only declared keys."""
+        client.get("/api/update-redis/")
+        client.post(
+            "/api/health/set/",
+            json.dumps({"status": "GOOD", "pr_number": 1}),
+            content_type="application/json",
+            HTTP_USER_AGENT="amal-googerit",
+        )
+        client.get("/api/website-data/", HTTP_ACCEPT="application/msgpack")
+        try:
+            rows, undeclared = keyspace_usage(redis_client.client, sample=5, seed=1)
+        finally:
+            redis_client.client.delete("health_status_pr_1", HEALTH_STATUS_INDEX)
+        assert keyspace_problems(rows, undeclared) == []
+        by_name = {row["namespace"]: row for row in rows}
+        assert by_name["explore:*"]["keys"] > by_name["explore:*"]["sampled"] == 5
+        assert by_name["home_page"]["estimated_bytes"] > 0
+
+    def test_problems(self):
+        """Test that stray keys and missing TTLs are reported."""
+        redis_client.client.set("stray", "x")
+        redis_client.client.set("health_status_pr_stale", "{}")
+        try:
+            rows, undeclared = keyspace_usage(redis_client.client)
+            problems = keyspace_problems(rows, undeclared)
+        finally:
+            redis_client.client.delete("stray", "health_status_pr_stale")
+        assert "undeclared key: stray" in problems
+        assert "health_status_pr_*: 1 sampled keys have no TTL" in problems
@@ -0,0 +1,109 @@
+"""
+Test cases for the in-process Redis backend.
+"""
+
+import time
+
+import pytest
+import redis
+
+from .utils.local_redis import LocalRedis, LocalStore, python_script
+from .utils.redis_client import RedisClient
+
+
+@pytest.fixture
+def local():
+    """Provide a client on an empty store."""
+    return LocalRedis(decode_responses=True, store=LocalStore())
+
+
+class TestLocalRedis:
+    """Test the commands the app relies on."""
+
+    def test_strings_and_expiry(self, local):
+        """Test get/set/mget and key expiry."""
+        local.set("a", 1)
+        local.set("b", "two", px=10)
+        assert local.mget(["a", "b", "missing"]) == ["1", "two", None]
+        assert 0 <= local.pttl("b") <= 10
+        time.sleep(0.02)
+        assert local.get("b") is None
+        assert local.exists("a", "b") == 1
+
+    def test_set_nx(self, local):
+        """Test conditional set."""
+        assert local.set("lock", "x", nx=True)
+        assert local.set("lock", "y", nx=True) is None
+        assert local.get("lock") == "x"
+
+    def test_hashes(self, local):
+        """Test hash reads and writes."""
+        assert local.hset("h", mapping={"a": "1", "b": "2"}) == 2
+        local.hset("h", "a", "3")
+        assert local.hget("h", "a") == "3"
+        assert local.hmget("h", "a", "c") == ["3", None]
+        assert local.hincrby("h", "n", 2) == 2
+        assert local.hincrby("h", "n") == 3
+        assert local.hdel("h", "a", "b", "n") == 3
+        assert not local.exists("h")
+
+    def test_sorted_sets(self, local):
+        """Test ordering, ranges, intersections and score removal."""
+        local.zadd("all", {"x": 2, "y": 1, "z": 3})
+        local.zadd("odd", {"x": 0, "z": 0})
+        assert local.zrange("all", 0, -1) == ["y", "x", "z"]
+        assert local.zrevrange("all", 0, 0) == ["z"]
+        assert local.zinter(["all", "odd"]) == ["x", "z"]
+        assert local.zrangebyscore("all", "(1", "+inf") == ["x", "z"]
+        assert local.zremrangebyscore("all", "-inf", "(2") == 1
+        assert local.zrange("all", 0, -1, withscores=True) == [
+            ("x", 2.0),
+            ("z", 3.0),
+        ]
+
+    def test_wrong_type(self, local):
+        """Test that commands on the wrong type fail like Redis."""
+        local.zadd("z", {"a": 1})
+        with pytest.raises(redis.ResponseError):
+            local.hget("z", "a")
+
+    def test_pipeline(self, local):
+        """Test that queued commands run together and return results."""
+        pipe = local.pipeline()
+        pipe.set("k", "v").sadd("s", "a", "b").smembers("s")
+        assert pipe.execute() == [True, 2, {"a", "b"}]
+
+    def test_pubsub(self, local):
+        """Test that published messages reach subscribers."""
+        pubsub = local.pubsub()
+        pubsub.subscribe("news")
+        assert local.publish("news", "hello") == 1
+        message = pubsub.get_message(timeout=1)
+        assert (message["channel"], message["data"]) == ("news", "hello")
+        pubsub.close()
+        assert local.publish("news", "again") == 0
+
+    def test_bytes_client_shares_store(self, local):
+        """Test that a non-decoding client sees the same data as bytes."""
+        local.set("k", "v")
+        raw = LocalRedis(store=local.store)
+        assert raw.get("k") == b"v"
+
+    def test_registered_script(self, local):
+        """Test that scripts run their registered Python version."""
+        lua = "return redis.call('INCR', KEYS[1])"
+
+        @python_script(lua)
+        def incr(client, keys, args):
+            return client.incr(keys[0])
+
+        script = local.register_script(lua)
+        assert script(keys=["n"]) == 1
+        assert script(keys=["n"]) == 2
+
+    def test_redis_client_backend(self, settings):
+        """Test that REDIS_BACKEND=memory needs no server."""
+        settings.REDIS_BACKEND = "memory"
+        client = RedisClient()
+        client.set_json("test:backend", {"ok": True})
+        assert RedisClient().get_json("test:backend") == {"ok": True}
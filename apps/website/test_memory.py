@@ -0,0 +1,104 @@
+"""
+Test cases for memory accounting and memory budgets.
+"""
+
+import os
+import subprocess  # nosec B404
+import sys
+import tracemalloc
+
+import pytest
+
+from .models import MenuItem
+from .utils import memory
+
+# Budgets for the Python heap (tracemalloc peak). Raise them deliberately,
+# with the reason in the commit, when a change needs more memory.
+IMPORT_VIEWS_BUDGET = 8 * 1024 * 1024
+WEBSITE_DATA_BUDGET = 4 * 1024 * 1024
+WEBSITE_DATA_ROWS = 2000
+
+IMPORT_VIEWS_SCRIPT = """
+import tracemalloc
+import django
+
+django.setup()
+tracemalloc.start()
+import apps.website.views  # noqa: F401
+print(tracemalloc.get_traced_memory()[1])
+"""
+
+
+@pytest.fixture
+def staff_client(client, admin_user):
+    client.force_login(admin_user)
+    return client
+
+
+@pytest.fixture
+def no_tracing():
+    yield
+    if tracemalloc.is_tracing():
+        tracemalloc.stop()
+    memory._last_snapshot = None
+
+
+@pytest.mark.django_db
+class TestMemoryEndpoints:
+    """Test the staff-only memory endpoints."""
+
+    def test_samples_recorded_after_requests(self, staff_client, settings):
+        """Test that each worker's usage is sampled over time."""
+        settings.MEMORY_SAMPLE_INTERVAL = 1
+        memory._last_sample = 0.0
+        staff_client.get("/api/home/")
+
+        data = staff_client.get("/api/memory/").json()
+        assert data["current"]["rss_bytes"] > 0
+        samples = data["workers"][memory.worker_id()]
+        assert samples[-1]["python_blocks"] > 0
+
+    def test_snapshot_diff(self, staff_client, no_tracing):
+        """Test that the first snapshot is a baseline and later ones diff."""
+        baseline = staff_client.post("/api/memory/snapshot/").json()
+        assert baseline["diff"] is False
+        kept = [bytearray(1024) for _ in range(100)]  # noqa: F841
+        diff = staff_client.post("/api/memory/snapshot/?stop=1").json()
+        assert diff["diff"] is True
+        assert any("size_diff" in entry for entry in diff["top"])
+        assert not tracemalloc.is_tracing()
+
+    def test_staff_only(self, client):
+        """Test that anonymous users cannot read or trace memory."""
+        assert client.get("/api/memory/").status_code == 403
+        assert client.post("/api/memory/snapshot/").status_code == 403
+
+
+class TestMemoryBudget:
+    """Fail when the memory footprint grows past its budget."""
+
+    def test_import_views(self):
+        """Test the heap needed to import the views module."""
+        result = subprocess.run(  # nosec B603
+            [sys.executable, "-c", IMPORT_VIEWS_SCRIPT],
+            capture_output=True,
+            text=True,
+            env=os.environ,
+            check=True,
+        )
+        peak = int(result.stdout.strip().splitlines()[-1])
+        assert peak < IMPORT_VIEWS_BUDGET
+
+    @pytest.mark.django_db
+    def test_website_data_payload(self, client, no_tracing):
+        """Test that streaming the website payload stays within budget."""
+        MenuItem.objects.bulk_create(
+            MenuItem(label_en=f"Item {i}", route=f"/item-{i}/", order=i)
+            for i in range(WEBSITE_DATA_ROWS)
+        )
+        tracemalloc.start()
+        response = client.get("/api/website-data/")
+        size = sum(len(chunk) for chunk in response.streaming_content)
+        peak = tracemalloc.get_traced_memory()[1]
+        assert size > WEBSITE_DATA_ROWS * 20
+        assert peak < WEBSITE_DATA_BUDGET
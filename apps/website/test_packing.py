@@ -0,0 +1,148 @@
+"""
+Test cases for msgpack responses.
+"""
+
+import json
+from datetime import datetime
+from pathlib import Path
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.test import RequestFactory
+
+import pytest
+
+from .models import FooterLink, MenuItem
+from .utils.packing import (
+    JSON,
+    MSGPACK,
+    MSGPACK_DEDUP,
+    PACKED_ACCEPT,
+    PACKED_FORMATS,
+    negotiate,
+    pack,
+    packed_key,
+    unpack,
+)
+from .utils.redis_test_json import home_data
+from .views import WEBSITE_DATA_KEY, redis_client
+
+MSGPACK_ACCEPT = "application/msgpack"
+DEDUP_ACCEPT = "application/msgpack; strings=table"
+
+
+NGINX_CONF = Path(settings.BASE_DIR) / "compose" / "prod" / "nginx.conf"
+
+
+def nginx_accept_map() -> dict:
+    """The literal entries of nginx's ``$api_cache_format`` map."""
+    conf = NGINX_CONF.read_text(encoding="utf-8")
+    block = conf.split("map $http_accept $api_cache_format {")[1].split("}")[0]
+    entries = [line.strip().rstrip(";").rsplit(None, 1) for line in block.split("\n")]
+    return {key.strip('"'): value for key, value in filter(None, entries)}
+
+
+def as_json(data):
+    return json.loads(json.dumps(data, cls=DjangoJSONEncoder))
+
+
+@pytest.fixture
+def no_packed_website_data():
+    redis_client.client.delete(
+        *(packed_key(WEBSITE_DATA_KEY, fmt) for fmt in PACKED_FORMATS)
+    )
+
+
+class TestPacking:
+    """Test encoding, decoding and negotiation."""
+
+    @pytest.mark.parametrize(
+        "accept, expected",
+        [
+            ("", JSON),
+            ("application/json", JSON),
+            (MSGPACK_ACCEPT, MSGPACK),
+            (DEDUP_ACCEPT, MSGPACK_DEDUP),
+            ("Application/MsgPack; Strings=Table", MSGPACK_DEDUP),
+            ("text/html, application/msgpack;q=0.9", JSON),
+            ("application/msgpack;strings=table", JSON),
+            ("application/x-msgpack", JSON),
+            ("*/*", JSON),
+        ],
+    )
+    def test_negotiate(self, accept, expected):
+        """Test that the Accept header selects the format."""
+        request = RequestFactory().get("/", HTTP_ACCEPT=accept)
+        assert negotiate(request) == expected
+
+    def test_nginx_map_matches_negotiate(self):
+        """Test that nginx caches under the format negotiate() picks."""
+        assert nginx_accept_map() == {"default": JSON, **PACKED_ACCEPT}
+
+    def test_round_trip(self):
+        """Test that both encodings decode to the JSON data."""
+        assert unpack(pack(home_data)) == home_data
+        assert unpack(pack(home_data, dedup=True), dedup=True) == home_data
+
+    def test_string_table_shrinks_repeated_strings(self):
+        """Test that repeated long strings are stored once."""
+        rows = [{"route": "/about-the-club", "label": f"Item {n}"} for n in range(50)]
+        plain, dedup = pack(rows), pack(rows, dedup=True)
+        assert dedup.count(b"/about-the-club") == 1
+        assert len(dedup) < len(plain)
+        assert unpack(dedup, dedup=True) == rows
+
+    def test_non_json_types_encode_like_json(self):
+        """Test that dates use the same encoding as the JSON responses."""
+        data = {"created": datetime(2024, 1, 2, 3, 4, 5)}
+        assert unpack(pack(data)) == as_json(data)
+        assert unpack(pack(data, dedup=True), dedup=True) == as_json(data)
+
+
+@pytest.mark.django_db
+class TestPackedResponses:
+    """Test msgpack variants of the read endpoints."""
+
+    def test_home_content_formats(self, client):
+        """Test that every published encoding is served with its type."""
+        client.get("/api/update-redis/")
+        response = client.get("/api/home/", HTTP_ACCEPT=MSGPACK_ACCEPT)
+        assert response["Content-Type"] == "application/msgpack"
+        assert "Accept" in response["Vary"]
+        assert unpack(response.content) == home_data
+
+        response = client.get("/api/home/", HTTP_ACCEPT=DEDUP_ACCEPT)
+        assert response["Content-Type"] == DEDUP_ACCEPT
+        assert unpack(response.content, dedup=True) == home_data
+
+        response = client.get("/api/home/")
+        assert response["Content-Type"] == "application/json"
+        assert "Accept" in response["Vary"]
+
+    def test_website_data_matches_json(self, client, no_packed_website_data):
+        """Test that the msgpack payload holds the same data as the JSON one."""
+        for index in range(3):
+            MenuItem.objects.create(label_en=f"Item {index}", route="/", order=index)
+        FooterLink.objects.create(key="about", label_en="About", route="/about")
+
+        response = client.get("/api/website-data/")
+        expected = json.loads(b"".join(response.streaming_content))
+        response = client.get("/api/website-data/", HTTP_ACCEPT=DEDUP_ACCEPT)
+        assert response.status_code == 200
+        assert unpack(response.content, dedup=True) == expected
+        response = client.get("/api/website-data/", HTTP_ACCEPT=MSGPACK_ACCEPT)
+        assert unpack(response.content) == expected
+
+    def test_website_data_is_dropped_on_change(
+        self, client, no_packed_website_data, django_capture_on_commit_callbacks
+    ):
+        """Test that saving content invalidates the cached encodings."""
+        client.get("/api/website-data/", HTTP_ACCEPT=MSGPACK_ACCEPT)
+        assert redis_client.get_bytes(packed_key(WEBSITE_DATA_KEY, MSGPACK))
+
+        with django_capture_on_commit_callbacks(execute=True):
+            MenuItem.objects.create(label_en="New", route="/new", order=1)
+
+        assert redis_client.get_bytes(packed_key(WEBSITE_DATA_KEY, MSGPACK)) is None
+        response = client.get("/api/website-data/", HTTP_ACCEPT=MSGPACK_ACCEPT)
+        assert unpack(response.content)["menu_items"][0]["label_en"] == "New"
@@ -0,0 +1,108 @@
+"""
+Performance budgets of the read endpoints.
+
+Each endpoint is measured against tables seeded at several sizes: SQL
+queries and Redis round trips must not grow with the data, and must match
+the budgets in perf_budgets.json (response sizes must stay within theirs).
+After an intended change, record new budgets with
+``pytest -m perf_budget --update-perf-budgets`` and review the diff.
+"""
+
+import json
+from urllib.parse import urlencode
+
+import pytest
+
+from .models import FooterLink, Hero, MenuItem, Partners
+from .utils.search import index_model
+from .views import HEALTH_STATUS_INDEX, redis_client
+
+# Rows per table the endpoints are measured at
+PERF_SIZES = (5, 50)
+
+BATCH_PATHS = ["/api/home/", "/api/seo/about/", "/api/health/status/?pr_number=1"]
+
+ENDPOINTS = [
+    ("website_data", "/api/website-data/", {}),
+    ("home", "/api/home/", {}),
+    ("home_msgpack", "/api/home/", {"HTTP_ACCEPT": "application/msgpack"}),
+    ("seo_page", "/api/seo/about/", {}),
+    ("explore", "/api/explore/", {}),
+    ("search", "/api/search/?q=item", {}),
+    ("menu_items", "/api/menu-items/", {}),
+    ("heroes", "/api/heroes/", {}),
+    ("partners", "/api/partners/", {}),
+    ("footer_links", "/api/footer-links/", {}),
+    ("health_status", "/api/health/status/", {}),
+    ("batch", "/api/batch/?" + urlencode({"path": BATCH_PATHS}, doseq=True), {}),
+]
+
+
+def seed(client, rows: int) -> None:
+    """Grow every content table, with its search documents, to ``rows`` rows"""
+    start = MenuItem.objects.count()
+    numbers = range(start, rows)
+    MenuItem.objects.bulk_create(
+        MenuItem(label_en=f"Item {n}", label_ar="عنصر", route=f"/item-{n}", order=n)
+        for n in numbers
+    )
+    Hero.objects.bulk_create(
+        Hero(title_en=f"Hero {n}", description_en="Description " * 5) for n in numbers
+    )
+    Partners.objects.bulk_create(
+        Partners(name_en=f"Partner {n}", image=f"partners/{n}.png", order=n)
+        for n in numbers
+    )
+    FooterLink.objects.bulk_create(
+        FooterLink(key=f"link-{n}", label_en=f"Link {n}", route=f"/link-{n}", order=n)
+        for n in numbers
+    )
+    # bulk_create sends no post_save, so the search index is rebuilt here
+    for model in (MenuItem, Hero, Partners, FooterLink):
+        index_model(model)
+    # One health status per row, so "latest" and pr_number=1 find one
+    response = client.post(
+        "/api/health/set-batch/",
+        json.dumps({"statuses": [{"pr_number": n, "status": "GOOD"} for n in numbers]}),
+        content_type="application/json",
+        HTTP_USER_AGENT="amal-googerit",
+    )
+    assert response.status_code == 200
+
+
+@pytest.fixture
+def health_statuses():
+    """Remove the health statuses written by ``seed``."""
+    yield
+    redis_client.client.delete(
+        HEALTH_STATUS_INDEX,
+        *(f"health_status_pr_{n}" for n in range(max(PERF_SIZES))),
+    )
+
+
+@pytest.mark.perf_budget
+@pytest.mark.django_db
+@pytest.mark.usefixtures("health_statuses")
+class TestPerfBudgets:
+    """Test query, Redis and size budgets per endpoint."""
+
+    @pytest.mark.parametrize(
+        "name, path, headers", ENDPOINTS, ids=[name for name, *_ in ENDPOINTS]
+    )
+    def test_endpoint_budget(
+        self, name, path, headers, client, request_cost, perf_budgets
+    ):
+        """Test that costs are constant in table size and within budget."""
+        client.get("/api/update-redis/")
+        costs = []
+        for size in PERF_SIZES:
+            seed(client, size)
+            costs.append(request_cost(path, **headers))
+
+        assert [cost["status"] for cost in costs] == [200] * len(PERF_SIZES)
+        for key in ("queries", "redis_commands"):
+            counts = [cost[key] for cost in costs]
+            assert (
+                len(set(counts)) == 1
+            ), f"{name}: {key} grow with table size {PERF_SIZES}: {counts}"
+        perf_budgets.check(name, costs[-1])
@@ -0,0 +1,88 @@
+"""
+Test cases for on-demand request profiling.
+"""
+
+import pstats
+
+import pytest
+
+from .models import MenuItem
+from .utils.profiling import make_token
+
+
+@pytest.fixture
+def staff_client(client, admin_user):
+    client.force_login(admin_user)
+    return client
+
+
+def profile_ids(staff_client):
+    response = staff_client.get("/api/profiles/")
+    return [profile["id"] for profile in response.json()["profiles"]]
+
+
+@pytest.mark.django_db
+class TestProfiling:
+    """Test when requests are profiled and how profiles are served."""
+
+    def test_not_profiled_by_default(self, client):
+        """Test that ordinary requests are not profiled."""
+        response = client.get("/api/menu-items/")
+        assert "X-Profile-Id" not in response
+
+    def test_invalid_token_ignored(self, client):
+        """Test that an unsigned header does not enable profiling."""
+        response = client.get("/api/menu-items/", HTTP_X_PROFILE="profile:forged")
+        assert "X-Profile-Id" not in response
+
+    def test_signed_header_profiles_request(self, client, staff_client, tmp_path):
+        """Test that a profiled request can be downloaded as a .prof file."""
+        MenuItem.objects.create(label_en="Home", route="/")
+        response = client.get("/api/menu-items/", HTTP_X_PROFILE=make_token())
+        profile_id = response["X-Profile-Id"]
+
+        profiles = staff_client.get("/api/profiles/").json()["profiles"]
+        assert profiles[0]["id"] == profile_id
+        assert profiles[0]["path"] == "/api/menu-items/"
+        assert profiles[0]["sql_queries"] >= 1
+
+        download = staff_client.get(f"/api/profiles/{profile_id}/")
+        assert download["Content-Type"] == "application/octet-stream"
+        path = tmp_path / "request.prof"
+        path.write_bytes(download.content)
+        stats = pstats.Stats(str(path))
+        assert any(name == "menu_items_api" for _, _, name in stats.stats)
+
+    def test_staff_query_flag(self, staff_client):
+        """Test that staff can profile their own request with ?profile=1."""
+        response = staff_client.get("/api/home/?profile=1")
+        assert response["X-Profile-Id"] in profile_ids(staff_client)
+
+    def test_query_flag_ignored_for_anonymous(self, client):
+        """Test that the query flag needs a staff user."""
+        response = client.get("/api/home/?profile=1")
+        assert "X-Profile-Id" not in response
+
+    def test_sampling(self, client, staff_client, settings):
+        """Test that a sample rate profiles requests without a trigger."""
+        settings.PROFILING_SAMPLE_RATE = 1.0
+        response = client.get("/api/home/")
+        settings.PROFILING_SAMPLE_RATE = 0.0
+        assert response["X-Profile-Id"] in profile_ids(staff_client)
+
+    def test_streamed_response_saved_after_body(self, client, staff_client):
+        """Test that streamed bodies are profiled until they finish."""
+        response = client.get("/api/website-data/", HTTP_X_PROFILE=make_token())
+        profile_id = response["X-Profile-Id"]
+        assert profile_id not in profile_ids(staff_client)
+        b"".join(response.streaming_content)
+        assert profile_id in profile_ids(staff_client)
+
+    def test_staff_only(self, client):
+        """Test that profiles are not visible to anonymous users."""
+        assert client.get("/api/profiles/").status_code == 403
+        assert client.get("/api/profiles/abc/").status_code == 403
+
+    def test_missing_profile(self, staff_client):
+        """Test that an unknown or expired profile returns 404."""
+        assert staff_client.get("/api/profiles/missing/").status_code == 404
@@ -0,0 +1,88 @@
+"""
+Test cases for the Redis token-bucket rate limiter.
+"""
+
+import uuid
+
+from django.http import JsonResponse
+from django.test import RequestFactory
+
+import pytest
+
+from .utils.rate_limit import rate_limit
+
+
+@pytest.fixture
+def limited_view(settings):
+    settings.RATE_LIMIT_ENABLED = True
+
+    @rate_limit(rate=2, per=60, scope=f"test-{uuid.uuid4().hex}")
+    def view(request):
+        return JsonResponse({"status": "ok"})
+
+    return view
+
+
+def request_from(address, **headers):
+    return RequestFactory().post("/", REMOTE_ADDR=address, **headers)
+
+
+class TestRateLimit:
+    """Test the rate_limit decorator."""
+
+    def test_requests_over_the_limit_get_429(self, limited_view):
+        """Test that the bucket empties after `rate` requests."""
+        statuses = [
+            limited_view(request_from("10.0.0.1")).status_code for _ in range(3)
+        ]
+        assert statuses == [200, 200, 429]
+
+    def test_retry_after_header(self, limited_view):
+        """Test that throttled responses tell clients when to retry."""
+        for _ in range(2):
+            limited_view(request_from("10.0.0.2"))
+        response = limited_view(request_from("10.0.0.2"))
+        assert 1 <= int(response["Retry-After"]) <= 30
+
+    def test_clients_have_separate_buckets(self, limited_view):
+        """Test that one client's traffic does not throttle another."""
+        for _ in range(3):
+            limited_view(request_from("10.0.0.3"))
+        assert limited_view(request_from("10.0.0.4")).status_code == 200
+
+    def test_real_ip_identifies_the_client(self, limited_view):
+        """Test that the address set by nginx is used."""
+        for _ in range(2):
+            limited_view(RequestFactory().post("/", HTTP_X_REAL_IP="1.2.3.4"))
+        response = limited_view(RequestFactory().post("/", HTTP_X_REAL_IP="1.2.3.4"))
+        assert response.status_code == 429
+        other = limited_view(RequestFactory().post("/", HTTP_X_REAL_IP="5.6.7.8"))
+        assert other.status_code == 200
+
+    def test_forwarded_for_cannot_dodge_the_limit(self, limited_view):
+        """Test that a new X-Forwarded-For per request is still one client."""
+        for n in range(2):
+            limited_view(
+                request_from("10.0.0.5", HTTP_X_FORWARDED_FOR=f"203.0.113.{n}")
+            )
+        response = limited_view(
+            request_from("10.0.0.5", HTTP_X_FORWARDED_FOR="203.0.113.99")
+        )
+        assert response.status_code == 429
+
+    def test_redis_errors_fail_open(self, limited_view, monkeypatch):
+        """Test that requests are allowed when Redis is unavailable."""
+
+        def broken(*args, **kwargs):
+            raise ConnectionError("Redis is down")
+
+        monkeypatch.setattr("apps.website.utils.rate_limit.take_token", broken)
+        assert limited_view(request_from("10.0.0.5")).status_code == 200
+
+    def test_disabled_by_setting(self, limited_view, settings):
+        """Test that RATE_LIMIT_ENABLED turns limits off."""
+        settings.RATE_LIMIT_ENABLED = False
+        statuses = {
+            limited_view(request_from("10.0.0.6")).status_code for _ in range(5)
+        }
+        assert statuses == {200}
@@ -0,0 +1,131 @@
+"""
+Test cases for read/write splitting between primary and replicas.
+"""
+
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.http import JsonResponse, StreamingHttpResponse
+from django.test import RequestFactory
+
+import pytest
+
+from . import routers
+from .middleware import ReplicaReadMiddleware
+from .models import MenuItem
+from .utils.redis_client import RedisClient, parse_sentinels
+
+
+@pytest.fixture
+def replica(monkeypatch):
+    """Pretend a read replica is configured."""
+    monkeypatch.setattr(routers, "replica_configured", lambda: True)
+    return routers.ReplicaRouter()
+
+
+class TestReplicaRouter:
+    """Test which database each query is sent to."""
+
+    def test_reads_use_primary_outside_requests(self, replica):
+        """Test that commands and shells read from the primary."""
+        assert replica.db_for_read(MenuItem) == "default"
+
+    def test_content_reads_use_replica(self, replica):
+        """Test that content reads in a request go to the replica."""
+        with routers.read_scope():
+            assert replica.db_for_read(MenuItem) == "replica"
+            assert replica.db_for_read(User) == "default"
+
+    def test_write_pins_rest_of_request(self, replica):
+        """Test that reads after a write see that write."""
+        with routers.read_scope():
+            assert replica.db_for_write(MenuItem) == "default"
+            assert replica.db_for_read(MenuItem) == "default"
+        with routers.read_scope():
+            assert replica.db_for_read(MenuItem) == "replica"
+
+    def test_no_replica_configured(self):
+        """Test that everything uses the primary without a replica."""
+        with routers.read_scope():
+            assert routers.ReplicaRouter().db_for_read(MenuItem) == "default"
+
+    @pytest.mark.django_db
+    def test_transactions_use_primary(self, replica):
+        """Test that reads inside a transaction stay on the primary."""
+        with routers.read_scope(), transaction.atomic():
+            assert replica.db_for_read(MenuItem) == "default"
+
+    def test_migrations_only_on_primary(self, replica):
+        """Test that the replica is never migrated."""
+        assert replica.allow_migrate("default", "website")
+        assert not replica.allow_migrate("replica", "website")
+
+
+class TestReplicaReadMiddleware:
+    """Test read-your-writes stickiness across requests."""
+
+    def run(self, request, response=None):
+        seen = {}
+
+        def view(request):
+            seen["db"] = routers.ReplicaRouter().db_for_read(MenuItem)
+            return response or JsonResponse({})
+
+        return ReplicaReadMiddleware(view)(request), seen
+
+    def test_get_reads_replica(self, replica):
+        """Test that plain reads use the replica."""
+        response, seen = self.run(RequestFactory().get("/api/menu-items/"))
+        assert seen["db"] == "replica"
+        assert routers.PRIMARY_COOKIE not in response.cookies
+
+    def test_write_sets_primary_cookie(self, replica, settings):
+        """Test that a write pins the client for a few seconds."""
+        settings.DB_PRIMARY_PIN_SECONDS = 5
+        response, seen = self.run(RequestFactory().post("/admin/"))
+        assert seen["db"] == "default"
+        assert response.cookies[routers.PRIMARY_COOKIE]["max-age"] == 5
+
+    def test_cookie_reads_primary(self, replica):
+        """Test that a pinned client reads from the primary."""
+        request = RequestFactory().get("/api/menu-items/")
+        request.COOKIES[routers.PRIMARY_COOKIE] = "1"
+        _, seen = self.run(request)
+        assert seen["db"] == "default"
+
+    def test_streamed_body_reads_replica(self, replica):
+        """Test that queries run while streaming are still routed."""
+
+        def body():
+            yield routers.ReplicaRouter().db_for_read(MenuItem)
+
+        response, _ = self.run(
+            RequestFactory().get("/api/website-data/"), StreamingHttpResponse(body())
+        )
+        assert b"".join(response.streaming_content) == b"replica"
+
+
+class TestRedisReplica:
+    """Test that Redis reads go to the replica and writes to the primary."""
+
+    def test_reads_from_replica(self, monkeypatch, settings):
+        """Test the client split when a replica URL is configured."""
+        settings.REDIS_BACKEND = "redis"
+        monkeypatch.setenv("REDIS_REPLICA_URL", "redis://localhost:6380/1")
+        client = RedisClient()
+        assert client.has_replica
+        assert client.replica.connection_pool.connection_kwargs["port"] == 6380
+
+    def test_single_server(self, monkeypatch):
+        """Test that reads use the primary when no replica is configured."""
+        monkeypatch.delenv("REDIS_REPLICA_URL", raising=False)
+        monkeypatch.delenv("REDIS_SENTINELS", raising=False)
+        client = RedisClient()
+        assert not client.has_replica
+        assert client.wait_for_replicas() == 0
+
+    def test_parse_sentinels(self):
+        """Test parsing the Sentinel address list."""
+        assert parse_sentinels("s1:26379, s2:26380") == [
+            ("s1", 26379),
+            ("s2", 26380),
+        ]
@@ -0,0 +1,88 @@
+"""
+Test cases for bilingual content search.
+"""
+
+import pytest
+
+from .models import MenuItem, SearchDocument
+from .utils.arabic import normalize_text
+from .utils.redis_test_json import home_data
+from .utils.search import index_home_data, search
+
+
+class TestNormalizeText:
+    """Test Arabic/English normalization."""
+
+    def test_diacritics_and_tatweel_are_removed(self):
+        """Test that harakat and tatweel do not affect matching."""
+        assert normalize_text("صَيْد الأسمـــاك") == normalize_text("صيد الاسماك")
+
+    def test_letter_variants_are_folded(self):
+        """Test alef, yaa and taa marbuta folding."""
+        assert normalize_text("أإآٱ") == "اااا"
+        assert normalize_text("مستشفى") == "مستشفي"
+        assert normalize_text("بطولة") == "بطوله"
+
+    def test_english_is_lowercased(self):
+        """Test that English text is lowercased and trimmed."""
+        assert normalize_text("  Jet   SKI ") == "jet ski"
+
+
+@pytest.mark.django_db
+class TestSearch:
+    """Test indexing and querying search documents."""
+
+    def test_home_data_sections_are_indexed(self):
+        """Test that explore, events, courses and news are indexed."""
+        index_home_data(home_data)
+        sources = set(SearchDocument.objects.values_list("source", flat=True))
+        assert sources == {"explore", "event", "course", "news"}
+
+    def test_arabic_query_matches_variant_spelling(self):
+        """Test that queries are normalized like the index."""
+        index_home_data(home_data)
+        results = list(search("ابوظبي"))
+        assert any(result["source"] == "event" for result in results)
+
+    def test_english_query(self):
+        """Test an English query."""
+        index_home_data(home_data)
+        results = list(search("jet ski"))
+        assert results[0]["title_en"] == "Abu Dhabi Jet Ski Championship"
+
+    def test_model_saves_update_the_index(
+        self, client, django_capture_on_commit_callbacks
+    ):
+        """Test that saving and deleting a row keeps the index in sync."""
+        with django_capture_on_commit_callbacks(execute=True):
+            item = MenuItem.objects.create(
+                label_en="Regatta", label_ar="سباق", route="/regatta"
+            )
+        response = client.get("/api/search/", {"q": "regatta"})
+        assert [r["url"] for r in response.json()["results"]] == ["/regatta"]
+
+        with django_capture_on_commit_callbacks(execute=True):
+            item.delete()
+        assert client.get("/api/search/", {"q": "regatta"}).json()["results"] == []
+
+    def test_index_errors_are_logged(
+        self, monkeypatch, django_capture_on_commit_callbacks, caplog
+    ):
+        """Test that a failing index update does not escape the save."""
+
+        def fail(*args):
+            raise RuntimeError("index unavailable")
+
+        monkeypatch.setattr("apps.website.signals.index_instance", fail)
+        monkeypatch.setattr("apps.website.signals.remove_instance", fail)
+        with django_capture_on_commit_callbacks(execute=True):
+            item = MenuItem.objects.create(label_en="Regatta", route="/regatta")
+        with django_capture_on_commit_callbacks(execute=True):
+            item.delete()
+
+        assert "Could not index MenuItem" in caplog.text
+        assert "Could not remove MenuItem" in caplog.text
+
+    def test_missing_query_returns_400(self, client):
+        """Test that an empty query is rejected."""
+        assert client.get("/api/search/").status_code == 400
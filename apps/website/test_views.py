@@ -2,13 +2,22 @@
 Additional test cases for website views.
 """
 
+import json
+
 from django.contrib.auth import get_user_model
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import DatabaseError
 from django.test import Client, TestCase
 from django.urls import reverse
 
 import pytest
 
-from .models import FooterLink, Hero, MenuItem, Partners
+from . import views
+from .models import FooterLink, Hero, MenuItem, Partners, SeoPage
+from .utils.pagination import keyset_filter
+from .utils.redis_seo import SEO_DATA
+from .utils.redis_test_json import home_data
+from .utils.streaming import ROWS_PER_WRITE
 
 User = get_user_model()
 
@@ -79,3 +88,281 @@ class TestModelCreation:
         assert footer_link.key == "test"
         assert footer_link.label_en == "Test Link"
         assert str(footer_link) == "Test Link"
+
+
+@pytest.mark.django_db
+class TestHealthStatusBatch:
+    """Test the batch health status endpoint."""
+
+    url = "/api/health/set-batch/"
+
+    def post(self, client, payload, user_agent="amal-googerit"):
+        return client.post(
+            self.url,
+            data=json.dumps(payload),
+            content_type="application/json",
+            HTTP_USER_AGENT=user_agent,
+        )
+
+    def test_batch_requires_authorization(self, client):
+        """Test that unknown callers are rejected."""
+        response = self.post(
+            client, {"statuses": [{"pr_number": 1, "status": "GOOD"}]}, "curl"
+        )
+        assert response.status_code == 403
+
+    def test_batch_sets_all_statuses(self, client):
+        """Test that every entry is stored and reported."""
+        response = self.post(
+            client,
+            {
+                "statuses": [
+                    {"pr_number": 901, "status": "good"},
+                    {"pr_number": 902, "status": "BAD"},
+                ]
+            },
+        )
+        assert response.status_code == 200
+        results = response.json()["results"]
+        assert [r["status"] for r in results] == ["success", "success"]
+
+        response = client.get("/api/health/status/", {"pr_number": 902})
+        assert response.json()["status"] == "BAD"
+
+        response = client.get("/api/health/status/")
+        assert response.json()["pr_number"] == 902
+
+    def test_batch_rejects_invalid_entries_without_writing(self, client):
+        """Test that one invalid entry rejects the whole batch."""
+        response = self.post(
+            client,
+            {
+                "statuses": [
+                    {"pr_number": 903, "status": "GOOD"},
+                    {"pr_number": 904, "status": "MAYBE"},
+                ]
+            },
+        )
+        assert response.status_code == 400
+        results = response.json()["results"]
+        assert [r["status"] for r in results] == ["skipped", "error"]
+
+        response = client.get("/api/health/status/", {"pr_number": 903})
+        assert response.json()["status"] == "UNKNOWN"
+
+    def test_batch_requires_statuses_list(self, client):
+        """Test that a missing statuses list is rejected."""
+        response = self.post(client, {"statuses": []})
+        assert response.status_code == 400
+
+
+@pytest.mark.django_db
+class TestCollectionPagination:
+    """Test the keyset-paginated collection endpoints."""
+
+    def test_pages_follow_order_then_id(self, client):
+        """Test that pages are contiguous and ordered by (order, id)."""
+        for order in [2, 1, 1, 3, 2]:
+            Partners.objects.create(name_en=f"P{order}", image="p.jpg", order=order)
+        expected = list(
+            Partners.objects.order_by("order", "id").values_list("id", flat=True)
+        )
+
+        seen = []
+        cursor = None
+        while True:
+            params = {"limit": 2}
+            if cursor:
+                params["cursor"] = cursor
+            data = client.get("/api/partners/", params).json()
+            seen.extend(row["id"] for row in data["results"])
+            cursor = data["next_cursor"]
+            assert data["has_more"] == (cursor is not None)
+            if not cursor:
+                break
+        assert seen == expected
+
+    def test_cursor_bounds_the_leading_column(self):
+        """Test that the keyset condition gives the index a range start."""
+        condition = keyset_filter(("order", "id"), [7, 3])
+        query = str(Partners.objects.filter(condition).query)
+        assert '"order" >= 7' in query
+        assert list(Partners.objects.filter(condition)) == []
+
+    def test_field_selection(self, client):
+        """Test that only the requested fields are returned."""
+        MenuItem.objects.create(label_en="Home", route="/", order=1)
+        data = client.get("/api/menu-items/", {"fields": "label_en"}).json()
+        assert data["results"] == [{"label_en": "Home"}]
+
+    def test_unknown_field_is_rejected(self, client):
+        """Test that unknown fields return 400."""
+        response = client.get("/api/footer-links/", {"fields": "password"})
+        assert response.status_code == 400
+
+    def test_invalid_cursor_is_rejected(self, client):
+        """Test that a tampered cursor returns 400."""
+        response = client.get("/api/heroes/", {"cursor": "not-a-cursor"})
+        assert response.status_code == 400
+
+
+@pytest.mark.django_db
+class TestWebsiteDataStreaming:
+    """Test the streamed website data payload."""
+
+    def expected_payload(self):
+        data = {
+            "menu_items": list(MenuItem.objects.all().values()),
+            "heroes": list(Hero.objects.all().values()),
+            "partners": list(Partners.objects.all().values()),
+            "footer_links": list(FooterLink.objects.all().values()),
+        }
+        return json.dumps(data, cls=DjangoJSONEncoder).encode("utf-8")
+
+    def test_empty_payload_matches_json_response(self, client):
+        """Test the streamed output with no rows."""
+        response = client.get("/api/website-data/")
+        assert response.status_code == 200
+        assert response.streaming
+        assert b"".join(response.streaming_content) == self.expected_payload()
+
+    def test_payload_matches_json_response(self, client):
+        """Test the streamed output across several write chunks."""
+        for index in range(ROWS_PER_WRITE * 2 + 3):
+            MenuItem.objects.create(
+                label_en=f"Item {index}", label_ar="الرئيسية", route="/", order=index
+            )
+        Hero.objects.create(title_en='Quote "hero"', description_en="Line\nbreak")
+        FooterLink.objects.create(key="about", label_en="About", route="/about")
+
+        response = client.get("/api/website-data/")
+        assert response["Content-Type"] == "application/json"
+        assert b"".join(response.streaming_content) == self.expected_payload()
+
+    def failing_values(self, monkeypatch, table):
+        """Make reading ``table`` raise like a lost database connection."""
+        real = views.iter_values
+
+        def rows(queryset):
+            if queryset.model is not table:
+                yield from real(queryset)
+                return
+            raise DatabaseError("connection lost")
+            yield
+
+        monkeypatch.setattr(views, "iter_values", rows)
+
+    def test_error_before_streaming_is_a_500(self, client, monkeypatch):
+        """Test that a failing first query still gets an error status."""
+        self.failing_values(monkeypatch, MenuItem)
+        response = client.get("/api/website-data/")
+        assert response.status_code == 500
+        assert response.json() == {"error": "connection lost"}
+
+    def test_error_while_streaming_aborts(self, client, monkeypatch):
+        """Test that a later failure ends the body instead of closing it."""
+        MenuItem.objects.create(label_en="Home", route="/")
+        self.failing_values(monkeypatch, Hero)
+        response = client.get("/api/website-data/")
+        body = response.streaming_content
+        assert next(body).startswith(b'{"menu_items": [{')
+        with pytest.raises(DatabaseError):
+            list(body)
+
+
+@pytest.mark.django_db
+class TestHomeContent:
+    """Test the published home content endpoint."""
+
+    def test_home_content_after_publish(self, client):
+        """Test that published content is served as stored."""
+        client.get("/api/update-redis/")
+        response = client.get("/api/home/")
+        assert response.status_code == 200
+        assert response.json() == home_data
+
+
+@pytest.mark.django_db
+class TestSeoPages:
+    """Test the per-page SEO endpoint."""
+
+    def test_published_defaults_are_served(self, client):
+        """Test that SEO_DATA entries are available after publishing."""
+        client.get("/api/update-redis/")
+        response = client.get("/api/seo/about/")
+        assert response.status_code == 200
+        assert response.json() == SEO_DATA["about"]
+
+    def test_admin_entry_overrides_default(
+        self, client, django_capture_on_commit_callbacks
+    ):
+        """Test that saving a SeoPage republishes only that page."""
+        client.get("/api/update-redis/")
+        with django_capture_on_commit_callbacks(execute=True):
+            SeoPage.objects.create(page="home", title="New", description="Desc")
+
+        assert client.get("/api/seo/home/").json() == {
+            "title": "New",
+            "description": "Desc",
+        }
+        assert client.get("/api/seo/about/").json() == SEO_DATA["about"]
+
+    def test_deleted_admin_page_is_unpublished(
+        self, client, django_capture_on_commit_callbacks
+    ):
+        """Test that deleting a page without a default removes its entry."""
+        with django_capture_on_commit_callbacks(execute=True):
+            page = SeoPage.objects.create(page="extra", title="E", description="")
+        assert client.get("/api/seo/extra/").status_code == 200
+
+        with django_capture_on_commit_callbacks(execute=True):
+            page.delete()
+        assert client.get("/api/seo/extra/").status_code == 404
+
+    def test_publish_errors_are_logged(
+        self, monkeypatch, django_capture_on_commit_callbacks, caplog
+    ):
+        """Test that a failing SEO publish does not escape the save."""
+
+        def fail(*args):
+            raise RuntimeError("redis unavailable")
+
+        monkeypatch.setattr("apps.website.signals.publish_seo_page", fail)
+        with django_capture_on_commit_callbacks(execute=True):
+            SeoPage.objects.create(page="home", title="New", description="Desc")
+        assert "Could not publish the SEO entry of home" in caplog.text
+
+    def test_unknown_page_returns_404(self, client):
+        """Test that missing pages return 404."""
+        client.get("/api/update-redis/")
+        assert client.get("/api/seo/missing-page/").status_code == 404
+
+
+@pytest.mark.django_db
+class TestExplore:
+    """Test server-side explore filtering."""
+
+    def test_unfiltered_returns_every_item_in_order(self, client):
+        """Test that all items are returned in catalog order."""
+        client.get("/api/update-redis/")
+        data = client.get("/api/explore/").json()
+        assert data["items"] == home_data["explore"]["items"]
+        assert data["filters"] == home_data["explore"]["filters"]
+
+    def test_category_filter(self, client):
+        """Test that only matching items are returned."""
+        client.get("/api/update-redis/")
+        data = client.get("/api/explore/", {"category": "modern"}).json()
+        expected = [
+            item
+            for item in home_data["explore"]["items"]
+            if item["category"] == "modern"
+        ]
+        assert expected
+        assert data["items"] == expected
+
+    def test_unknown_category_is_empty(self, client):
+        """Test that unknown categories return no items."""
+        client.get("/api/update-redis/")
+        data = client.get("/api/explore/", {"category": "nothing"}).json()
+        assert data["items"] == []
@@ -5,7 +5,31 @@ from . import views
 urlpatterns = [
     path("", views.home, name="home"),
     path("api/website-data/", views.website_data_api, name="website_data_api"),
+    path("api/home/", views.home_content_api, name="home_content_api"),
+    path("api/seo/<slug:page>/", views.seo_page_api, name="seo_page_api"),
+    path("api/explore/", views.explore_api, name="explore_api"),
+    path("api/search/", views.search_api, name="search_api"),
+    path("api/batch/", views.batch_api, name="batch_api"),
+    path("api/events/", views.events_api, name="events_api"),
+    path("api/menu-items/", views.menu_items_api, name="menu_items_api"),
+    path("api/heroes/", views.heroes_api, name="heroes_api"),
+    path("api/partners/", views.partners_api, name="partners_api"),
+    path("api/footer-links/", views.footer_links_api, name="footer_links_api"),
     path("api/update-redis/", views.update_redis, name="update_redis"),
     path("api/health/status/", views.get_health_status, name="get_health_status"),
     path("api/health/set/", views.set_health_status, name="set_health_status"),
+    path(
+        "api/health/set-batch/",
+        views.set_health_status_batch,
+        name="set_health_status_batch",
+    ),
+    path("api/profiles/", views.profiles_api, name="profiles_api"),
+    path(
+        "api/profiles/<slug:profile_id>/",
+        views.profile_download_api,
+        name="profile_download_api",
+    ),
+    path("api/memory/", views.memory_api, name="memory_api"),
+    path("api/admission/", views.admission_api, name="admission_api"),
+    path("api/memory/snapshot/", views.memory_snapshot_api, name="memory_snapshot_api"),
 ]
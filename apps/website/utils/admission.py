@@ -0,0 +1,156 @@
+import json
+import threading
+import time
+from collections import Counter
+
+from django.conf import settings
+
+from .memory import worker_id
+
+ADMISSION_TOTALS = "admission_totals"
+ADMISSION_WORKERS = "admission_workers"
+
+# Priorities: "always" is never shed, "low" is shed first
+ALWAYS = "always"
+NORMAL = "normal"
+LOW = "low"
+
+REQUEST_START_HEADER = "HTTP_X_REQUEST_START"
+# Weight of the newest request in the moving average latency
+LATENCY_WEIGHT = 0.1
+# A queue wait counts for at most this many times ADMISSION_MAX_LATENCY_MS,
+# so one bad timestamp (clock skew, a forged header) cannot hold the moving
+# average above the limit for long
+MAX_QUEUE_WAIT_FACTOR = 3
+
+
+def request_priority(request) -> str:
+    path = request.path
+    if path in settings.ADMISSION_PROBE_PATHS:
+        return ALWAYS
+    if request.method in ("GET", "HEAD") and path.startswith(
+        tuple(settings.ADMISSION_CACHED_PREFIXES)
+    ):
+        # nginx caches these; a miss that is shed would be retried by every
+        # client instead of being filled once
+        return ALWAYS
+    if path.startswith(tuple(settings.ADMISSION_LOW_PRIORITY_PREFIXES)):
+        return LOW
+    return NORMAL
+
+
+def queue_wait(request) -> float:
+    """Seconds since nginx received the request (``X-Request-Start: t=<s>``)
+
+    With sync workers an overload shows up as requests waiting for a free
+    worker, not as requests in flight, so this wait is part of the latency.
+    It is capped at ``MAX_QUEUE_WAIT_FACTOR`` times the latency limit.
+    """
+    value = request.META.get(REQUEST_START_HEADER, "")
+    try:
+        start = float(value.removeprefix("t="))
+    except ValueError:
+        return 0.0
+    limit = MAX_QUEUE_WAIT_FACTOR * settings.ADMISSION_MAX_LATENCY_MS / 1000
+    return min(max(0.0, time.time() - start), limit)
+
+
+class AdmissionController:
+    """In-flight count and moving average latency of this worker
+
+    Latency is the queue wait plus the time to respond. Shed requests add
+    their queue wait, so the average falls again once the queue drains
+    even if nothing is admitted for a while.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.in_flight = 0
+        self.latency = 0.0
+        self.counts = Counter()
+        self.last_flush = 0.0
+
+    def _observe(self, seconds: float) -> None:
+        self.latency += (seconds - self.latency) * LATENCY_WEIGHT
+
+    def admit(self, priority: str, waited: float = 0.0):
+        """Count the request in and return None, or return why it is shed"""
+        with self.lock:
+            reason = None
+            if priority != ALWAYS:
+                max_in_flight, max_latency = (
+                    (
+                        settings.ADMISSION_LOW_PRIORITY_MAX_IN_FLIGHT,
+                        settings.ADMISSION_LOW_PRIORITY_LATENCY_MS,
+                    )
+                    if priority == LOW
+                    else (
+                        settings.ADMISSION_MAX_IN_FLIGHT,
+                        settings.ADMISSION_MAX_LATENCY_MS,
+                    )
+                )
+                if self.in_flight >= max_in_flight:
+                    reason = "in_flight"
+                elif self.latency * 1000 >= max_latency:
+                    reason = "latency"
+            if reason:
+                self._observe(waited)
+                self.counts[f"shed:{priority}:{reason}"] += 1
+            else:
+                self.in_flight += 1
+                self.counts[f"admitted:{priority}"] += 1
+            return reason
+
+    def finish(self, seconds: float) -> None:
+        """Count an admitted request out after ``seconds`` (queue included)"""
+        with self.lock:
+            self.in_flight -= 1
+            self._observe(seconds)
+
+    def state(self) -> dict:
+        with self.lock:
+            return {
+                "in_flight": self.in_flight,
+                "latency_ms": round(self.latency * 1000, 1),
+                "counts": dict(self.counts),
+            }
+
+    def flush(self, redis_client) -> None:
+        """Add the counts since the last flush to the totals in Redis"""
+        with self.lock:
+            counts, self.counts = self.counts, Counter()
+            state = {
+                "worker": worker_id(),
+                "time": time.time(),
+                "in_flight": self.in_flight,
+                "latency_ms": round(self.latency * 1000, 1),
+                "counts": dict(counts),
+            }
+        pipe = redis_client.pipeline()
+        for field, count in counts.items():
+            pipe.hincrby(ADMISSION_TOTALS, field, count)
+        pipe.hset(ADMISSION_WORKERS, state["worker"], json.dumps(state))
+        pipe.execute()
+
+    def maybe_flush(self, redis_client) -> None:
+        """Flush every ``ADMISSION_STATS_INTERVAL`` seconds"""
+        now = time.monotonic()
+        interval = settings.ADMISSION_STATS_INTERVAL
+        if not interval or now - self.last_flush < interval:
+            return
+        self.last_flush = now
+        self.flush(redis_client)
+
+
+# One per process; every thread of a worker shares it
+controller = AdmissionController()
+
+
+def admission_stats(redis_client) -> dict:
+    """Shedding totals across workers and each worker's last reported state"""
+    totals = redis_client.replica.hgetall(ADMISSION_TOTALS)
+    workers = redis_client.replica.hgetall(ADMISSION_WORKERS)
+    return {
+        "totals": {field: int(count) for field, count in totals.items()},
+        "workers": {worker: json.loads(state) for worker, state in workers.items()},
+    }
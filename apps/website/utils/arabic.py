@@ -0,0 +1,33 @@
+import re
+import unicodedata
+
+# Harakat, Quranic annotation marks, superscript alef and tatweel
+_DIACRITICS = re.compile("[\u0610-\u061a\u064b-\u065f\u0670\u06d6-\u06ed\u0640]")
+
+_LETTER_VARIANTS = str.maketrans(
+    {
+        "أ": "ا",  # alef with hamza above -> alef
+        "إ": "ا",  # alef with hamza below -> alef
+        "آ": "ا",  # alef with madda -> alef
+        "ٱ": "ا",  # alef wasla -> alef
+        "ى": "ي",  # alef maksura -> yaa
+        "ئ": "ي",  # yaa with hamza -> yaa
+        "ة": "ه",  # taa marbuta -> haa
+    }
+)
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_text(text) -> str:
+    """Normalize English/Arabic text for indexing and querying
+
+    Strips Arabic diacritics and tatweel, folds alef, yaa and taa marbuta
+    variants, lowercases and collapses whitespace. The same function must be
+    applied to indexed text and to queries so that both sides match.
+    """
+    if not text:
+        return ""
+    text = unicodedata.normalize("NFKC", str(text))
+    text = _DIACRITICS.sub("", text).translate(_LETTER_VARIANTS)
+    return _WHITESPACE.sub(" ", text).strip().lower()
@@ -0,0 +1,155 @@
+import json
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import copy_context
+from urllib.parse import urlsplit
+
+from django.db import close_old_connections
+from django.http import HttpRequest, QueryDict
+from django.urls import Resolver404, resolve
+
+BATCH_MAX_REQUESTS = 10
+# Threads shared by all batches; sub-requests are mostly I/O bound
+BATCH_WORKERS = 4
+
+_executor = None
+
+
+class BatchError(ValueError):
+    """Raised when a batch request is malformed"""
+
+
+def batchable(redis_reads=None):
+    """Allow a GET view to be called from ``/api/batch/``
+
+    ``redis_reads(request, **kwargs)`` returns the ``(command, *args)`` reads
+    the view will make, so a batch can fetch them for every sub-request in
+    one pipeline (see ``RedisClient.prefetch``).
+    """
+
+    def decorator(view):
+        view.batchable = True
+        view.redis_reads = redis_reads
+        return view
+
+    return decorator
+
+
+def _get_executor():
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=BATCH_WORKERS, thread_name_prefix="batch"
+        )
+    return _executor
+
+
+def sub_request(request, path: str):
+    """Build an internal GET request for ``path`` from the batch request
+
+    Headers, cookies and the user are inherited; the sub-request does not go
+    through the middleware again. Responses are always JSON.
+    """
+    url = urlsplit(path)
+    sub = HttpRequest()
+    sub.method = "GET"
+    sub.path = sub.path_info = url.path
+    sub.META = {
+        **request.META,
+        "REQUEST_METHOD": "GET",
+        "PATH_INFO": url.path,
+        "QUERY_STRING": url.query,
+        "HTTP_ACCEPT": "application/json",
+    }
+    sub.GET = QueryDict(url.query)
+    sub.COOKIES = request.COOKIES
+    if hasattr(request, "user"):
+        sub.user = request.user
+    return sub
+
+
+def _error(status: int, message: str):
+    return status, json.dumps({"error": message})
+
+
+def _encode(response):
+    if response.streaming:
+        content = b"".join(response.streaming_content)
+    else:
+        content = response.content
+    body = content.decode(response.charset)
+    if not response.get("Content-Type", "").startswith("application/json"):
+        body = json.dumps(body)
+    return response.status_code, body
+
+
+def _serve(view, sub, kwargs):
+    """Run one sub-request and return ``(status, JSON body)``"""
+    try:
+        # Encoded here so streamed bodies are also produced in this thread
+        return _encode(view(sub, **kwargs))
+    except Exception as e:
+        return _error(500, str(e))
+
+
+def _serve_in_pool(view, sub, kwargs):
+    # Pool threads hold their own database connections; expire them the
+    # way the request handler does
+    close_old_connections()
+    try:
+        return _serve(view, sub, kwargs)
+    finally:
+        close_old_connections()
+
+
+def run_batch(request, paths: list, redis_client) -> str:
+    """Serve ``paths`` (GET URLs with optional query strings) in-process
+
+    Reads declared by the views are prefetched in one Redis pipeline, then
+    the views run concurrently. Returns the JSON body
+    ``{"responses": [{"path", "status", "body"}, ...]}`` in request order.
+    """
+    if not paths:
+        raise BatchError("Pass at least one 'path'")
+    if len(paths) > BATCH_MAX_REQUESTS:
+        raise BatchError(f"At most {BATCH_MAX_REQUESTS} paths per batch")
+
+    results = [None] * len(paths)
+    calls = []
+    reads = []
+    for index, path in enumerate(paths):
+        try:
+            match = resolve(urlsplit(path).path)
+        except Resolver404:
+            results[index] = _error(404, "Not found")
+            continue
+        if not getattr(match.func, "batchable", False):
+            results[index] = _error(400, "Not available in a batch")
+            continue
+        sub = sub_request(request, path)
+        if match.func.redis_reads:
+            reads.extend(match.func.redis_reads(sub, **match.kwargs))
+        calls.append((index, match.func, sub, match.kwargs))
+
+    with redis_client.prefetch(reads):
+        if len(calls) == 1:
+            index, *call = calls[0]
+            results[index] = _serve(*call)
+        else:
+            # Each thread runs in a copy of this context, so it sees the
+            # prefetched replies and the request's database read scope
+            futures = [
+                (
+                    index,
+                    _get_executor().submit(copy_context().run, _serve_in_pool, *call),
+                )
+                for index, *call in calls
+            ]
+            for index, future in futures:
+                results[index] = future.result()
+
+    items = [
+        f'{{"path": {json.dumps(path)}, "status": {status}, "body": {body}}}'
+        for path, (status, body) in zip(paths, results)
+    ]
+    # Bodies are already JSON, so they are spliced in without re-encoding
+    return '{"responses": [' + ", ".join(items) + "]}"
@@ -0,0 +1,74 @@
+import logging
+import threading
+from urllib.request import Request, urlopen
+
+from django.conf import settings
+
+from ..routers import PRIMARY_COOKIE
+from .packing import PACKED_ACCEPT
+
+logger = logging.getLogger(__name__)
+
+# nginx keys cached API responses on the normalized language and encoding
+# (see compose/prod/nginx.conf), so every combination has to be refreshed
+CACHE_VARIANTS = [
+    {"Accept-Language": language, "Accept-Encoding": encoding}
+    for language in ("en", "ar")
+    for encoding in ("identity", "gzip")
+]
+
+# Public GET endpoints served from Redis content published by update_redis
+PUBLISHED_CONTENT_URLS = ["/api/home/"]
+
+# Endpoints that also answer in msgpack; nginx adds the negotiated format to
+# their cache key (``$api_cache_format``) and ignores ``Vary: Accept``, so
+# one request per format refreshes the entry every client of it reads
+PACKED_URLS = {"/api/home/", "/api/website-data/"}
+PACKED_VARIANTS = [{"Accept": accept} for accept in PACKED_ACCEPT]
+
+
+def _variants(path: str) -> list:
+    if path not in PACKED_URLS:
+        return CACHE_VARIANTS
+    return CACHE_VARIANTS + [
+        {**headers, **packed}
+        for headers in CACHE_VARIANTS
+        for packed in PACKED_VARIANTS
+    ]
+
+
+def _refresh(base_url: str, host: str, paths: list) -> None:
+    for path in paths:
+        for headers in _variants(path):
+            # Read from the primary: the replica may not have the change yet
+            headers = {**headers, "Cookie": f"{PRIMARY_COOKIE}=1"}
+            if host:
+                # Django must see one of its ALLOWED_HOSTS
+                headers = {**headers, "Host": host}
+            try:
+                request = Request(base_url.rstrip("/") + path, headers=headers)
+                with urlopen(request, timeout=5) as response:  # nosec B310
+                    response.read()
+            except Exception:
+                logger.warning("Failed to purge cached %s (%s)", path, headers)
+
+
+def purge_urls(paths, background: bool = True) -> None:
+    """Replace nginx's cached copies of ``paths`` with fresh responses
+
+    Requests go to the internal purge listener configured by
+    ``NGINX_CACHE_PURGE_URL``, which always bypasses the cache and stores
+    the new response under the same key. Does nothing when the setting is
+    empty (e.g. in development).
+    """
+    base_url = getattr(settings, "NGINX_CACHE_PURGE_URL", "")
+    host = getattr(settings, "NGINX_CACHE_PURGE_HOST", "")
+    paths = sorted(set(paths))
+    if not base_url or not paths:
+        return
+    if background:
+        threading.Thread(
+            target=_refresh, args=(base_url, host, paths), daemon=True
+        ).start()
+    else:
+        _refresh(base_url, host, paths)
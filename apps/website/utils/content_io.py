@@ -0,0 +1,212 @@
+import json
+from collections import defaultdict
+
+from django.utils.text import slugify
+
+from ..models import FooterLink, Hero, MenuItem, Partners
+from .ordering import ORDER_GAP
+
+# Record "model" label -> model class, in dependency-free import order
+CONTENT_MODELS = {
+    "menu_item": MenuItem,
+    "hero": Hero,
+    "partners": Partners,
+    "footer_link": FooterLink,
+}
+
+# Derived columns that are rebuilt after import rather than exported
+DERIVED_FIELDS = {"background_image_variants", "image_variants"}
+
+READ_SIZE = 64 * 1024
+
+# Field identifying a home_data row across imports, per record "model"
+HOME_DATA_KEYS = {
+    "menu_item": "route",
+    "hero": "title_en",
+    "partners": "image",
+    "footer_link": "key",
+}
+
+
+class ContentFormatError(ValueError):
+    """Raised when an import file does not match the expected format"""
+
+
+def model_label(model) -> str:
+    return next(label for label, cls in CONTENT_MODELS.items() if cls is model)
+
+
+def content_fields(model) -> list:
+    """Concrete non-pk fields that are exported and imported"""
+    return [
+        field.attname
+        for field in model._meta.concrete_fields
+        if not field.primary_key and field.attname not in DERIVED_FIELDS
+    ]
+
+
+def iter_ndjson(handle):
+    """Yield one record per non-empty line"""
+    for number, line in enumerate(handle, start=1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield json.loads(line)
+        except json.JSONDecodeError as e:
+            raise ContentFormatError(f"Line {number}: {e.msg}")
+
+
+def iter_json_array(handle):
+    """Yield the elements of a top-level JSON array without loading it all
+
+    Only the element being decoded (plus one read buffer) is held in memory.
+    """
+    decoder = json.JSONDecoder()
+    buffer = handle.read(READ_SIZE).lstrip()
+    if not buffer.startswith("["):
+        raise ContentFormatError("Expected a JSON array")
+    buffer = buffer[1:]
+    eof = False
+    expect_value = True
+    while True:
+        buffer = buffer.lstrip()
+        if not buffer and not eof:
+            chunk = handle.read(READ_SIZE)
+            eof = not chunk
+            buffer += chunk
+            continue
+        if buffer.startswith("]"):
+            return
+        if not expect_value:
+            if not buffer.startswith(","):
+                raise ContentFormatError("Expected ',' between array elements")
+            buffer = buffer[1:]
+            expect_value = True
+            continue
+        try:
+            value, end = decoder.raw_decode(buffer)
+        except json.JSONDecodeError:
+            if eof:
+                raise ContentFormatError("Truncated JSON array")
+            chunk = handle.read(READ_SIZE)
+            eof = not chunk
+            buffer += chunk
+            continue
+        yield value
+        buffer = buffer[end:]
+        expect_value = False
+
+
+def iter_home_data(data: dict):
+    """Map the ``home_data`` page shape onto content records
+
+    ``home_data`` has no ids; ``match_existing`` finds the rows to update
+    by natural key (``HOME_DATA_KEYS``).
+    """
+    if not isinstance(data, dict):
+        raise ContentFormatError("Expected a home_data JSON object")
+    menu = data.get("header", {}).get("menu", {})
+    for index, item in enumerate(menu.values(), start=1):
+        yield {
+            "model": "menu_item",
+            "fields": {
+                "label_en": item.get("en"),
+                "label_ar": item.get("ar"),
+                "route": item.get("href", ""),
+                "order": index * ORDER_GAP,
+            },
+        }
+
+    hero = data.get("hero")
+    if hero:
+        yield {
+            "model": "hero",
+            "fields": {
+                "title_en": hero.get("title", {}).get("en"),
+                "title_ar": hero.get("title", {}).get("ar"),
+                "description_en": hero.get("description", {}).get("en"),
+                "description_ar": hero.get("description", {}).get("ar"),
+                "button_en": hero.get("button", {}).get("en"),
+                "button_ar": hero.get("button", {}).get("ar"),
+                "background_image": hero.get("hero_background"),
+            },
+        }
+
+    for index, partner in enumerate(data.get("partners", []), start=1):
+        yield {
+            "model": "partners",
+            "fields": {
+                "name_en": partner.get("alt", ""),
+                "image": partner.get("src", ""),
+                "order": index * ORDER_GAP,
+            },
+        }
+
+    footer = data.get("footer", {})
+    links = [
+        item
+        for section in footer.values()
+        if isinstance(section, dict)
+        for item in section.get("items", [])
+    ]
+    for index, link in enumerate(links, start=1):
+        route = link.get("href", "")
+        yield {
+            "model": "footer_link",
+            "fields": {
+                "key": slugify(link.get("en", ""))[:64],
+                "label_en": link.get("en", ""),
+                "label_ar": link.get("ar"),
+                "route": route,
+                "is_external": route.startswith(("http://", "https://")),
+                "order": index * ORDER_GAP,
+            },
+        }
+
+
+def match_existing(records) -> list:
+    """Give records the id of the existing row with the same natural key
+
+    Importing the same file again then updates those rows instead of
+    duplicating them, and rows created another way are left alone. Records
+    sharing a key value are matched to existing rows in id order; any left
+    over are inserted.
+    """
+    records = list(records)
+    for label, field in HOME_DATA_KEYS.items():
+        own = [record for record in records if record["model"] == label]
+        values = {record["fields"].get(field) for record in own}
+        existing = defaultdict(list)
+        rows = CONTENT_MODELS[label].objects.filter(**{f"{field}__in": values})
+        for value, pk in rows.order_by("pk").values_list(field, "pk"):
+            existing[value].append(pk)
+        for record in own:
+            ids = existing[record["fields"].get(field)]
+            if ids:
+                record["id"] = ids.pop(0)
+    return records
+
+
+def build_instance(record: dict):
+    """Turn one record into an unsaved model instance"""
+    if not isinstance(record, dict):
+        raise ContentFormatError("Each record must be an object")
+    model = CONTENT_MODELS.get(record.get("model"))
+    if model is None:
+        raise ContentFormatError(f"Unknown model {record.get('model')!r}")
+    fields = record.get("fields") or {}
+    unknown = set(fields) - set(content_fields(model)) - DERIVED_FIELDS
+    if unknown:
+        raise ContentFormatError(
+            f"Unknown fields for {record['model']}: {', '.join(sorted(unknown))}"
+        )
+    return model(pk=record.get("id"), **fields)
+
+
+def export_record(model, row: dict) -> dict:
+    return {
+        "model": model_label(model),
+        "id": row.pop("id"),
+        "fields": row,
+    }
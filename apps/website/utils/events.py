@@ -0,0 +1,276 @@
+import asyncio
+import json
+import logging
+import threading
+import time
+
+from django.conf import settings
+
+from asgiref.sync import sync_to_async
+
+from .local_redis import python_script
+
+logger = logging.getLogger(__name__)
+
+CONTENT_EVENTS_CHANNEL = "content_events"
+# Incremented per event; its value is the event id (and content version)
+CONTENT_VERSION_KEY = "content_version"
+# Recent events by id, replayed to clients that reconnect with Last-Event-ID
+CONTENT_EVENTS_LOG = "content_events_log"
+CONTENT_EVENTS_LOG_SIZE = 500
+
+# Seconds before the subscriber thread retries after losing Redis
+RESUBSCRIBE_DELAY = 1.0
+# Seconds a new stream waits for the Redis subscription to be live
+SUBSCRIBE_TIMEOUT = 5.0
+# Milliseconds browsers wait before reconnecting a dropped stream
+SSE_RETRY_MS = 5000
+
+_broadcaster = None
+_broadcaster_lock = threading.Lock()
+
+
+# Issue, log and publish one event atomically, so two publishers can never
+# publish their ids out of order (clients skip ids they have already seen).
+#   KEYS[1]  version counter
+#   KEYS[2]  event log
+#   ARGV[1]  channel
+#   ARGV[2]  JSON list of URLs
+#   ARGV[3]  time
+#   ARGV[4]  log size
+# Returns the event's JSON, as json.dumps would write it
+PUBLISH_EVENT_LUA = """
+local id = redis.call('INCR', KEYS[1])
+local data = '{"id": ' .. id .. ', "urls": ' .. ARGV[2] .. ', "time": ' .. ARGV[3] .. '}'
+redis.call('ZADD', KEYS[2], id, data)
+redis.call('ZREMRANGEBYSCORE', KEYS[2], '-inf', id - tonumber(ARGV[4]))
+redis.call('PUBLISH', ARGV[1], data)
+return data
+"""
+
+
+@python_script(PUBLISH_EVENT_LUA)
+def _local_publish_event(client, keys, args):
+    """PUBLISH_EVENT_LUA for the in-process backend (runs under its lock)"""
+    channel, urls, when, size = args
+    event_id = client.incr(keys[0])
+    data = f'{{"id": {event_id}, "urls": {urls}, "time": {when}}}'
+    client.zadd(keys[1], {data: event_id})
+    client.zremrangebyscore(keys[1], "-inf", event_id - int(size))
+    client.publish(channel, data)
+    return data
+
+
+_scripts = {}
+
+
+def notify_content_changed(redis_client, urls) -> dict:
+    """Publish a content event telling clients to re-fetch ``urls``"""
+    client = redis_client.client
+    script = _scripts.get(id(client))
+    if script is None:
+        script = _scripts[id(client)] = client.register_script(PUBLISH_EVENT_LUA)
+    data = script(
+        keys=[CONTENT_VERSION_KEY, CONTENT_EVENTS_LOG],
+        args=[
+            CONTENT_EVENTS_CHANNEL,
+            json.dumps(sorted(set(urls))),
+            repr(time.time()),
+            CONTENT_EVENTS_LOG_SIZE,
+        ],
+    )
+    return json.loads(data)
+
+
+def current_version(redis_client) -> int:
+    return int(redis_client.client.get(CONTENT_VERSION_KEY) or 0)
+
+
+def events_since(redis_client, last_id: int):
+    """Logged events after ``last_id``, or None if some were already trimmed"""
+    version = current_version(redis_client)
+    if last_id > version:
+        # Not an id we issued (e.g. Redis lost its data)
+        return None
+    events = [
+        json.loads(data)
+        for data in redis_client.client.zrangebyscore(
+            CONTENT_EVENTS_LOG, f"({last_id}", "+inf"
+        )
+    ]
+    first = events[0]["id"] if events else version + 1
+    if first > last_id + 1:
+        return None
+    return events
+
+
+def format_event(event_type: str, data: dict, event_id=None) -> str:
+    """Encode one Server-Sent Events message"""
+    lines = [] if event_id is None else [f"id: {event_id}"]
+    lines += [f"event: {event_type}", f"data: {json.dumps(data)}"]
+    return "\n".join(lines) + "\n\n"
+
+
+class Subscription:
+    """One SSE client's bounded buffer of raw event payloads
+
+    Filled from the subscriber thread through the client's event loop. When
+    the buffer is full the event is dropped and the subscription marked
+    ``overflowed``; the stream then ends and the client resumes from the
+    event log with Last-Event-ID.
+    """
+
+    def __init__(self, loop, size: int):
+        self.loop = loop
+        self.queue = asyncio.Queue(maxsize=size)
+        self.overflowed = False
+
+    def deliver(self, data: str) -> None:
+        try:
+            self.loop.call_soon_threadsafe(self._put, data)
+        except RuntimeError:
+            # The loop has shut down
+            pass
+
+    def _put(self, data: str) -> None:
+        try:
+            self.queue.put_nowait(data)
+        except asyncio.QueueFull:
+            self.overflowed = True
+
+
+class Broadcaster:
+    """Fan one Redis pub/sub subscription out to every client in the process
+
+    The subscription is held by a daemon thread started with the first
+    client, so a process keeps one Redis connection for events however
+    many streams it serves.
+    """
+
+    def __init__(self, redis_client, channel: str = CONTENT_EVENTS_CHANNEL):
+        self.redis_client = redis_client
+        self.channel = channel
+        self.lock = threading.Lock()
+        self.subscriptions = set()
+        self.thread = None
+        # Set while the Redis subscription is live
+        self.ready = threading.Event()
+
+    def subscribe(self, size: int = None) -> Subscription:
+        subscription = Subscription(
+            asyncio.get_running_loop(), size or settings.SSE_CLIENT_BUFFER
+        )
+        with self.lock:
+            self.subscriptions.add(subscription)
+            if self.thread is None:
+                self.thread = threading.Thread(
+                    target=self._listen, name="content-events", daemon=True
+                )
+                self.thread.start()
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        with self.lock:
+            self.subscriptions.discard(subscription)
+
+    def publish(self, data: str) -> None:
+        with self.lock:
+            subscriptions = list(self.subscriptions)
+        for subscription in subscriptions:
+            subscription.deliver(data)
+
+    def _listen(self) -> None:
+        while True:
+            pubsub = self.redis_client.client.pubsub(ignore_subscribe_messages=True)
+            try:
+                pubsub.subscribe(self.channel)
+                self.ready.set()
+                for message in pubsub.listen():
+                    if message["type"] == "message":
+                        self.publish(message["data"])
+            except Exception:
+                logger.exception("Lost the %s subscription", self.channel)
+            finally:
+                self.ready.clear()
+                pubsub.close()
+            time.sleep(RESUBSCRIBE_DELAY)
+
+
+def get_broadcaster(redis_client) -> Broadcaster:
+    """This process's broadcaster"""
+    global _broadcaster
+    with _broadcaster_lock:
+        if _broadcaster is None:
+            _broadcaster = Broadcaster(redis_client)
+        return _broadcaster
+
+
+async def _in_thread(func, *args):
+    # Not thread sensitive: streams must not queue behind each other
+    return await sync_to_async(func, thread_sensitive=False)(*args)
+
+
+async def _catch_up(redis_client, last_id: int):
+    """``(messages, last_id)`` bringing a client from ``last_id`` up to date
+
+    The messages replay the logged events after ``last_id``, or are one
+    ``reset`` event if the log no longer reaches back that far.
+    """
+    backlog = await _in_thread(events_since, redis_client, last_id)
+    if backlog is None:
+        last_id = await _in_thread(current_version, redis_client)
+        return [format_event("reset", {"version": last_id}, last_id)], last_id
+    messages = []
+    for event in backlog:
+        last_id = event["id"]
+        messages.append(format_event("content", event, last_id))
+    return messages, last_id
+
+
+async def event_stream(broadcaster, redis_client, last_id=None, heartbeat=None):
+    """Yield SSE messages for content events until closed or cancelled
+
+    Events after ``last_id`` are replayed from the log first; if the log no
+    longer reaches back that far a ``reset`` event tells the client to
+    re-fetch everything. Events that skip ids (published while the Redis
+    subscription was down) are filled in from the log the same way. A
+    comment line is sent every ``heartbeat`` seconds without events, which
+    keeps proxies from closing the connection. The stream does not notice
+    a client that has gone by itself; under ASGI config.handlers cancels it
+    when the client disconnects.
+    """
+    heartbeat = heartbeat or settings.SSE_HEARTBEAT_SECONDS
+    # Subscribe and wait for the subscription before reading the log, so no
+    # event falls in between
+    subscription = broadcaster.subscribe()
+    try:
+        yield f"retry: {SSE_RETRY_MS}\n\n"
+        await _in_thread(broadcaster.ready.wait, SUBSCRIBE_TIMEOUT)
+        if last_id is None:
+            last_id = await _in_thread(current_version, redis_client)
+            yield format_event("version", {"version": last_id}, last_id)
+        else:
+            messages, last_id = await _catch_up(redis_client, last_id)
+            for message in messages:
+                yield message
+
+        while True:
+            try:
+                data = await asyncio.wait_for(subscription.queue.get(), heartbeat)
+            except asyncio.TimeoutError:
+                yield ": heartbeat\n\n"
+                continue
+            event = json.loads(data)
+            if event["id"] > last_id + 1:
+                # Events were missed; the log has them up to this one
+                messages, last_id = await _catch_up(redis_client, last_id)
+                for message in messages:
+                    yield message
+            elif event["id"] > last_id:
+                last_id = event["id"]
+                yield format_event("content", event, last_id)
+            if subscription.overflowed and subscription.queue.empty():
+                # Events were dropped; the client resumes from the log
+                return
+    finally:
+        broadcaster.unsubscribe(subscription)
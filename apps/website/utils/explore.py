@@ -0,0 +1,78 @@
+import json
+
+# Item fields that can be filtered on; each value gets its own sorted set
+EXPLORE_FACETS = ("category",)
+
+EXPLORE_ITEM_PREFIX = "explore:item:"
+EXPLORE_ALL_KEY = "explore:all"
+EXPLORE_FILTERS_KEY = "explore:filters"
+EXPLORE_FACET_KEYS = "explore:facet_keys"
+
+# Filter value meaning "no filter" in the published ``filters`` list
+ALL_FILTER = "all"
+
+
+def facet_key(facet: str, value: str) -> str:
+    return f"explore:{facet}:{value}"
+
+
+def explore_urls(data: dict) -> list:
+    """Public URLs whose responses depend on the published explore section"""
+    urls = ["/api/explore/"]
+    for item in data.get("explore", {}).get("filters", []):
+        if item["key"] != ALL_FILTER:
+            urls.append(f"/api/explore/?category={item['key']}")
+    return urls
+
+
+def publish_explore(redis_client, data: dict) -> None:
+    """Publish explore items and their per-facet membership sets
+
+    Every item is stored pre-encoded under its own key. Membership is kept
+    in sorted sets scored by catalog position, so intersections come back
+    in catalog order. The previous catalog is replaced in one transaction.
+    """
+    explore = data.get("explore", {})
+    items = explore.get("items", [])
+
+    old_ids = redis_client.client.zrange(EXPLORE_ALL_KEY, 0, -1)
+    old_facet_keys = redis_client.client.smembers(EXPLORE_FACET_KEYS)
+
+    pipe = redis_client.pipeline()
+    stale = [EXPLORE_ITEM_PREFIX + item_id for item_id in old_ids]
+    stale += list(old_facet_keys) + [EXPLORE_ALL_KEY, EXPLORE_FACET_KEYS]
+    pipe.delete(*stale)
+
+    facet_members = {}
+    for position, item in enumerate(items):
+        item_id = str(item["id"])
+        pipe.set(EXPLORE_ITEM_PREFIX + item_id, json.dumps(item))
+        pipe.zadd(EXPLORE_ALL_KEY, {item_id: position})
+        for facet in EXPLORE_FACETS:
+            if item.get(facet) is not None:
+                key = facet_key(facet, item[facet])
+                facet_members.setdefault(key, {})[item_id] = position
+    for key, members in facet_members.items():
+        pipe.zadd(key, members)
+    if facet_members:
+        pipe.sadd(EXPLORE_FACET_KEYS, *facet_members)
+    pipe.set(EXPLORE_FILTERS_KEY, json.dumps(explore.get("filters", [])))
+    pipe.execute()
+
+
+def find_items(redis_client, filters: dict):
+    """Return ``(raw item JSON strings, raw filters JSON)`` for ``filters``
+
+    ``filters`` maps facet names to a single value. Membership sets are
+    intersected by Redis (ZINTER) and the items fetched with one MGET.
+    """
+    keys = [
+        facet_key(facet, value)
+        for facet, value in filters.items()
+        if value and value != ALL_FILTER
+    ]
+    item_ids = redis_client.replica.zinter(keys or [EXPLORE_ALL_KEY])
+    raw = redis_client.replica.mget(
+        [EXPLORE_FILTERS_KEY] + [EXPLORE_ITEM_PREFIX + item_id for item_id in item_ids]
+    )
+    return [item for item in raw[1:] if item is not None], raw[0]
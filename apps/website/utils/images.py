@@ -0,0 +1,136 @@
+import hashlib
+import io
+import logging
+import posixpath
+from concurrent.futures import ProcessPoolExecutor
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+
+logger = logging.getLogger(__name__)
+
+VARIANT_DIR = "variants"
+DEFAULT_WIDTHS = (320, 640, 1280)
+DEFAULT_FORMATS = ("webp", "avif")
+DEFAULT_WORKERS = 2
+
+_pool = None
+
+
+def _get_pool():
+    """Return the process pool shared by this worker, creating it on first use"""
+    global _pool
+    if _pool is None:
+        _pool = ProcessPoolExecutor(
+            max_workers=getattr(settings, "IMAGE_VARIANT_WORKERS", DEFAULT_WORKERS)
+        )
+    return _pool
+
+
+def _supported_formats():
+    from PIL import features
+
+    formats = getattr(settings, "IMAGE_VARIANT_FORMATS", DEFAULT_FORMATS)
+    return [fmt for fmt in formats if features.check(fmt)]
+
+
+def _render_variant(source: bytes, width: int, fmt: str) -> bytes:
+    """Resize ``source`` to ``width`` pixels wide and encode it as ``fmt``
+
+    Runs inside the process pool, so it only takes and returns bytes.
+    """
+    from PIL import Image
+
+    with Image.open(io.BytesIO(source)) as image:
+        image = image.convert("RGBA" if image.mode in ("RGBA", "LA", "P") else "RGB")
+        height = max(1, round(image.height * width / image.width))
+        resized = image.resize((width, height), Image.LANCZOS)
+        output = io.BytesIO()
+        resized.save(output, format=fmt.upper(), quality=80)
+        return output.getvalue()
+
+
+def _source_width(source: bytes) -> int:
+    from PIL import Image
+
+    with Image.open(io.BytesIO(source)) as image:
+        return image.width
+
+
+def storage_name(path: str) -> str:
+    """Map an image path as stored on the models to a storage name"""
+    media_url = getattr(settings, "MEDIA_URL", "") or ""
+    if media_url and path.startswith(media_url):
+        path = path[len(media_url) :]
+    return path.lstrip("/")
+
+
+def variant_name(name: str, digest: str, width: int, fmt: str) -> str:
+    stem = posixpath.splitext(posixpath.basename(name))[0]
+    return f"{VARIANT_DIR}/{stem}.{digest}.{width}w.{fmt}"
+
+
+def content_hash(source: bytes) -> str:
+    """Short hash of an image's bytes, embedded in its variant names"""
+    return hashlib.sha256(source).hexdigest()[:12]
+
+
+def source_hash(path: str, storage=None):
+    """``content_hash`` of the image at ``path``, or None if it is not stored"""
+    storage = storage or default_storage
+    name = storage_name(path or "")
+    if not name or not storage.exists(name):
+        return None
+    with storage.open(name, "rb") as handle:
+        return content_hash(handle.read())
+
+
+def generate_variants(path: str, storage=None) -> dict:
+    """Generate resized WebP/AVIF variants of an image held in ``storage``
+
+    Variant filenames embed a hash of the source content, so a variant that
+    already exists in storage is up to date and is not rendered again; only
+    missing variants are sent to the process pool. Returns a description of
+    the variants with a ``srcset`` string per format, or an empty dict when
+    the source is not in storage.
+    """
+    storage = storage or default_storage
+    name = storage_name(path or "")
+    if not name or not storage.exists(name):
+        logger.info("Skipping image variants for %r: not found in storage", path)
+        return {}
+
+    with storage.open(name, "rb") as handle:
+        source = handle.read()
+    digest = content_hash(source)
+    source_width = _source_width(source)
+    widths = getattr(settings, "IMAGE_VARIANT_WIDTHS", DEFAULT_WIDTHS)
+    widths = sorted({min(width, source_width) for width in widths})
+
+    variants = []
+    pending = {}
+    for fmt in _supported_formats():
+        for width in widths:
+            target = variant_name(name, digest, width, fmt)
+            variants.append({"name": target, "width": width, "format": fmt})
+            if not storage.exists(target):
+                pending[target] = _get_pool().submit(
+                    _render_variant, source, width, fmt
+                )
+
+    for target, future in pending.items():
+        storage.save(target, ContentFile(future.result()))
+
+    srcset = {}
+    for variant in variants:
+        variant["url"] = storage.url(variant.pop("name"))
+        srcset.setdefault(variant["format"], []).append(
+            f"{variant['url']} {variant['width']}w"
+        )
+    return {
+        "source": path,
+        "hash": digest,
+        "variants": variants,
+        "srcset": {fmt: ", ".join(entries) for fmt, entries in srcset.items()},
+    }
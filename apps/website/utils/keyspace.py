@@ -0,0 +1,188 @@
+import random
+from collections import defaultdict
+from functools import lru_cache
+from typing import NamedTuple, Optional, Union
+
+from django.conf import settings
+
+# ``Namespace.ttl`` of keys that live until they are replaced or deleted.
+# Production Redis evicts with ``volatile-lru``, so these are never evicted
+PERSISTENT = None
+# ``Namespace.ttl`` of keys that expire after a time each writer chooses
+PER_KEY = 0
+
+# Undeclared keys listed per report
+UNDECLARED_EXAMPLES = 10
+
+
+class UndeclaredKeyError(KeyError):
+    """A write to a key that no ``KEYSPACE`` namespace declares"""
+
+
+class Namespace(NamedTuple):
+    """Keys matching ``pattern`` (exact, or a prefix ending in ``*``)
+
+    ``ttl`` is seconds, the name of a setting holding seconds, ``PER_KEY``
+    or ``PERSISTENT``.
+    """
+
+    pattern: str
+    ttl: Union[int, str, None]
+    encoding: str
+    owner: str
+
+    def expire(self) -> Optional[int]:
+        """Seconds a new key lives, or None if the writer decides or it is kept"""
+        if isinstance(self.ttl, str):
+            return getattr(settings, self.ttl)
+        return self.ttl or None
+
+    @property
+    def expires(self) -> bool:
+        return self.ttl is not PERSISTENT
+
+    def describe_ttl(self) -> str:
+        if self.ttl is PERSISTENT:
+            return "persistent"
+        if self.ttl == PER_KEY:
+            return "per key"
+        return f"{self.expire()}s"
+
+
+# Every key the app writes. Published content is persistent: it is replaced
+# on publish and a miss would be an empty page, not a slower one
+KEYSPACE = (
+    Namespace("home_page", PERSISTENT, "json", "views.update_redis"),
+    Namespace("home_page:msgpack*", PERSISTENT, "msgpack", "views.update_redis"),
+    Namespace("seo_data", PERSISTENT, "json", "views.update_redis"),
+    Namespace("seo_pages", PERSISTENT, "hash of json", "utils.seo"),
+    Namespace("explore:*", PERSISTENT, "json, zset, set", "utils.explore"),
+    Namespace("website_data:msgpack*", 300, "msgpack", "views.website_data"),
+    Namespace("health_status_pr_*", 86400, "json", "views.set_health_status"),
+    Namespace("health_status_index", PERSISTENT, "zset", "views.set_health_status"),
+    Namespace("content_version", PERSISTENT, "counter", "utils.events"),
+    Namespace("content_events_log", PERSISTENT, "zset of json", "utils.events"),
+    Namespace("rate_limit:*", PER_KEY, "hash", "utils.rate_limit"),
+    Namespace("profile:*", "PROFILING_TTL", "json", "utils.profiling"),
+    Namespace("profile_index", PERSISTENT, "zset", "utils.profiling"),
+    Namespace("memory_samples:*", "MEMORY_SAMPLE_RETENTION", "zset", "utils.memory"),
+    Namespace("memory_workers", PERSISTENT, "zset", "utils.memory"),
+    Namespace("admission_totals", PERSISTENT, "hash", "utils.admission"),
+    Namespace("admission_workers", PERSISTENT, "hash of json", "utils.admission"),
+    Namespace(
+        ":1:django.contrib.sessions.cached_db*", PER_KEY, "pickle", "sessions cache"
+    ),
+    Namespace(":1:*", PER_KEY, "pickle", "django cache"),
+)
+
+
+@lru_cache(maxsize=1)
+def _index(keyspace: tuple):
+    """``(exact patterns, prefixes)`` of ``keyspace``, built once per registry"""
+    exact = {ns.pattern: ns for ns in keyspace if not ns.pattern.endswith("*")}
+    # Longest prefix first, so the most specific namespace wins
+    prefixes = sorted(
+        ((ns.pattern[:-1], ns) for ns in keyspace if ns.pattern.endswith("*")),
+        key=lambda entry: len(entry[0]),
+        reverse=True,
+    )
+    return exact, prefixes
+
+
+def namespace_for(key) -> Optional[Namespace]:
+    """The namespace declaring ``key``, or None"""
+    if isinstance(key, bytes):
+        key = key.decode(errors="replace")
+    exact, prefixes = _index(KEYSPACE)
+    if key in exact:
+        return exact[key]
+    for prefix, namespace in prefixes:
+        if key.startswith(prefix):
+            return namespace
+    return None
+
+
+def _measure(client, keys: list) -> list:
+    """``(memory usage, ttl)`` of each key, in one round trip"""
+    pipe = client.pipeline(transaction=False)
+    for key in keys:
+        pipe.memory_usage(key)
+        pipe.ttl(key)
+    replies = pipe.execute()
+    return list(zip(replies[::2], replies[1::2]))
+
+
+def keyspace_usage(client, sample: int = 100, count: int = 1000, seed=None):
+    """Key counts and sampled memory per namespace
+
+    Walks the keyspace with SCAN (``count`` keys per call, so the server is
+    never blocked like with KEYS) and keeps a random ``sample`` of keys per
+    namespace, whose ``MEMORY USAGE`` and TTL are read. Totals are
+    estimated from the sample's mean. Returns ``(rows, undeclared)``; the
+    rows are sorted by estimated bytes, largest first.
+    """
+    rng = random.Random(seed)
+    counts = defaultdict(int)
+    samples = defaultdict(list)
+    undeclared = []
+    for key in client.scan_iter(count=count):
+        namespace = namespace_for(key)
+        if namespace is None:
+            if len(undeclared) < UNDECLARED_EXAMPLES:
+                undeclared.append(key)
+        counts[namespace] += 1
+        # Reservoir sampling: every key is kept with the same probability
+        keep = samples[namespace]
+        if len(keep) < sample:
+            keep.append(key)
+        else:
+            slot = rng.randrange(counts[namespace])
+            if slot < sample:
+                keep[slot] = key
+
+    rows = []
+    for namespace, keys in samples.items():
+        measured = _measure(client, keys)
+        sizes = [size or 0 for size, _ in measured]
+        ttls = [ttl for _, ttl in measured if ttl >= -1]
+        mean = sum(sizes) / len(sizes) if sizes else 0
+        limit = namespace.expire() if namespace else None
+        rows.append(
+            {
+                "namespace": namespace.pattern if namespace else "(undeclared)",
+                "owner": namespace.owner if namespace else "",
+                "ttl": namespace.describe_ttl() if namespace else "",
+                "keys": counts[namespace],
+                "sampled": len(keys),
+                "sampled_bytes": sum(sizes),
+                "estimated_bytes": round(mean * counts[namespace]),
+                # Sampled keys that eviction or expiry would never remove
+                # although the namespace declares a TTL
+                "missing_ttl": (
+                    sum(ttl == -1 for ttl in ttls)
+                    if namespace and namespace.expires
+                    else 0
+                ),
+                "ttl_over_declared": sum(
+                    limit is not None and ttl > limit for ttl in ttls
+                ),
+            }
+        )
+    rows.sort(key=lambda row: row["estimated_bytes"], reverse=True)
+    return rows, undeclared
+
+
+def keyspace_problems(rows: list, undeclared: list) -> list:
+    """Human readable violations of the declared keyspace"""
+    problems = [f"undeclared key: {key}" for key in undeclared]
+    for row in rows:
+        if row["missing_ttl"]:
+            problems.append(
+                f"{row['namespace']}: {row['missing_ttl']} sampled keys have no TTL"
+            )
+        if row["ttl_over_declared"]:
+            problems.append(
+                f"{row['namespace']}: {row['ttl_over_declared']} sampled keys "
+                f"outlive the declared {row['ttl']}"
+            )
+    return problems
@@ -0,0 +1,527 @@
+import fnmatch
+import math
+import queue
+import threading
+import time
+
+import redis
+
+# Lua source -> Python function(client, keys, args) run by
+# ``LocalRedis.register_script``; modules that use scripts register an
+# equivalent here (see rate_limit.py)
+PYTHON_SCRIPTS = {}
+
+WRONGTYPE = "WRONGTYPE Operation against a key holding the wrong kind of value"
+
+
+def python_script(lua: str):
+    """Register the decorated function as the local version of ``lua``"""
+
+    def decorator(func):
+        PYTHON_SCRIPTS[lua] = func
+        return func
+
+    return decorator
+
+
+def _encode(value) -> bytes:
+    # Same conversions redis-py applies before sending a value
+    if isinstance(value, bytes):
+        return value
+    if isinstance(value, float):
+        return repr(value).encode()
+    return str(value).encode()
+
+
+def _key(name) -> str:
+    return name.decode() if isinstance(name, bytes) else str(name)
+
+
+def _score_bound(value):
+    """Parse a ZRANGEBYSCORE bound; returns ``(score, exclusive)``"""
+    value = _key(value)
+    exclusive = value.startswith("(")
+    value = value.lstrip("(")
+    if value in ("-inf", "+inf", "inf"):
+        return (-math.inf if value == "-inf" else math.inf), exclusive
+    return float(value), exclusive
+
+
+def _score_range(min, max):
+    """Return a predicate for scores between two ZRANGEBYSCORE bounds"""
+    low, low_exclusive = _score_bound(min)
+    high, high_exclusive = _score_bound(max)
+
+    def in_range(score):
+        return (score > low or (score == low and not low_exclusive)) and (
+            score < high or (score == high and not high_exclusive)
+        )
+
+    return in_range
+
+
+class LocalStore:
+    """Data shared by every ``LocalRedis`` client in this process"""
+
+    def __init__(self):
+        self.lock = threading.RLock()
+        self.data = {}
+        self.expires = {}
+        self.subscribers = {}
+
+
+_default_store = LocalStore()
+
+
+class LocalPipeline:
+    """Queues commands and runs them together under the store lock"""
+
+    def __init__(self, client):
+        self.client = client
+        self.commands = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.reset()
+
+    def __getattr__(self, name):
+        command = getattr(self.client, name)
+
+        def queue_command(*args, **kwargs):
+            self.commands.append((command, args, kwargs))
+            return self
+
+        return queue_command
+
+    def reset(self):
+        self.commands = []
+
+    def execute(self, raise_on_error: bool = True):
+        results = []
+        with self.client.store.lock:
+            for command, args, kwargs in self.commands:
+                try:
+                    results.append(command(*args, **kwargs))
+                except redis.ResponseError as e:
+                    results.append(e)
+        self.reset()
+        if raise_on_error:
+            for result in results:
+                if isinstance(result, Exception):
+                    raise result
+        return results
+
+
+class LocalPubSub:
+    """Subscriber side of ``LocalRedis.publish``"""
+
+    def __init__(self, client):
+        self.client = client
+        self.channels = set()
+        self.messages = queue.Queue()
+
+    def subscribe(self, *channels):
+        with self.client.store.lock:
+            for channel in map(_key, channels):
+                self.client.store.subscribers.setdefault(channel, set()).add(self)
+                self.channels.add(channel)
+
+    def unsubscribe(self, *channels):
+        with self.client.store.lock:
+            for channel in map(_key, channels or list(self.channels)):
+                self.client.store.subscribers.get(channel, set()).discard(self)
+                self.channels.discard(channel)
+
+    def get_message(self, ignore_subscribe_messages: bool = False, timeout=0.0):
+        try:
+            if timeout:
+                return self.messages.get(timeout=timeout)
+            return self.messages.get_nowait()
+        except queue.Empty:
+            return None
+
+    def listen(self):
+        while self.channels:
+            yield self.messages.get()
+
+    def close(self):
+        self.unsubscribe()
+
+    def _deliver(self, channel: str, data: bytes):
+        self.messages.put(
+            {
+                "type": "message",
+                "pattern": None,
+                "channel": self.client._out(channel.encode()),
+                "data": self.client._out(data),
+            }
+        )
+
+
+class LocalRedis:
+    """In-process stand-in for ``redis.Redis``
+
+    Implements the commands this app uses (strings with expiry, hashes,
+    sets, sorted sets, pipelines, pub/sub and registered scripts) on a
+    process-wide store. All clients in a process see the same data, but
+    separate processes do not, so use it for tests, benchmarks and
+    single-process deployments only.
+    """
+
+    def __init__(self, decode_responses: bool = False, store: LocalStore = None):
+        self.decode_responses = decode_responses
+        self.store = store or _default_store
+
+    def _out(self, value):
+        if value is None or not self.decode_responses:
+            return value
+        return value.decode()
+
+    def _alive(self, name: str) -> bool:
+        deadline = self.store.expires.get(name)
+        if deadline is not None and deadline <= time.monotonic():
+            self.store.data.pop(name, None)
+            del self.store.expires[name]
+        return name in self.store.data
+
+    def _lookup(self, name, kind, create: bool = False):
+        name = _key(name)
+        if not self._alive(name):
+            if not create:
+                return None
+            self.store.data[name] = kind()
+        value = self.store.data[name]
+        if type(value) is not kind:
+            raise redis.ResponseError(WRONGTYPE)
+        return value
+
+    def _drop_if_empty(self, name):
+        name = _key(name)
+        if name in self.store.data and not self.store.data[name]:
+            self.delete(name)
+
+    # Server
+
+    def ping(self) -> bool:
+        return True
+
+    def flushdb(self) -> bool:
+        with self.store.lock:
+            self.store.data.clear()
+            self.store.expires.clear()
+        return True
+
+    def wait(self, num_replicas: int, timeout: int) -> int:
+        return 0
+
+    def info(self, section=None) -> dict:
+        with self.store.lock:
+            names = [name for name in list(self.store.data) if self._alive(name)]
+            used = sum(self.memory_usage(name) for name in names)
+        return {
+            "used_memory": used,
+            "maxmemory": 0,
+            "maxmemory_policy": "noeviction",
+        }
+
+    def pipeline(self, transaction: bool = True):
+        return LocalPipeline(self)
+
+    def register_script(self, script: str):
+        func = PYTHON_SCRIPTS.get(script)
+        if func is None:
+            raise NotImplementedError("No local implementation of this script")
+
+        def run(keys=(), args=(), client=None):
+            with self.store.lock:
+                return func(self, list(keys), list(args))
+
+        return run
+
+    # Keys
+
+    def delete(self, *names) -> int:
+        removed = 0
+        with self.store.lock:
+            for name in map(_key, names):
+                if self._alive(name):
+                    del self.store.data[name]
+                    removed += 1
+                self.store.expires.pop(name, None)
+        return removed
+
+    def exists(self, *names) -> int:
+        with self.store.lock:
+            return sum(self._alive(_key(name)) for name in names)
+
+    def expire(self, name, time_seconds) -> bool:
+        return self.pexpire(name, int(time_seconds * 1000))
+
+    def pexpire(self, name, time_ms) -> bool:
+        name = _key(name)
+        with self.store.lock:
+            if not self._alive(name):
+                return False
+            self.store.expires[name] = time.monotonic() + time_ms / 1000
+        return True
+
+    def ttl(self, name) -> int:
+        pttl = self.pttl(name)
+        return pttl if pttl < 0 else math.ceil(pttl / 1000)
+
+    def pttl(self, name) -> int:
+        name = _key(name)
+        with self.store.lock:
+            if not self._alive(name):
+                return -2
+            deadline = self.store.expires.get(name)
+        if deadline is None:
+            return -1
+        return max(0, int((deadline - time.monotonic()) * 1000))
+
+    def keys(self, pattern="*") -> list:
+        with self.store.lock:
+            names = [name for name in list(self.store.data) if self._alive(name)]
+        pattern = _key(pattern)
+        return [
+            self._out(name.encode())
+            for name in names
+            if fnmatch.fnmatchcase(name, pattern)
+        ]
+
+    def memory_usage(self, key, samples=None):
+        """Bytes of the key and its contents (no allocator overhead)"""
+        name = _key(key)
+        with self.store.lock:
+            if not self._alive(name):
+                return None
+            value = self.store.data[name]
+            if isinstance(value, bytes):
+                size = len(value)
+            elif isinstance(value, set):
+                size = sum(map(len, value))
+            else:
+                # Hashes and sorted sets (scores count as 8 bytes)
+                size = sum(
+                    len(_encode(field)) + (8 if isinstance(v, float) else len(v))
+                    for field, v in value.items()
+                )
+        return len(name.encode()) + size
+
+    def scan_iter(self, match=None, count=None, _type=None):
+        yield from self.keys(match or "*")
+
+    # Strings
+
+    def get(self, name):
+        with self.store.lock:
+            return self._out(self._lookup(name, bytes))
+
+    def mget(self, keys, *args) -> list:
+        names = [keys] if isinstance(keys, (str, bytes)) else list(keys)
+        with self.store.lock:
+            return [self._get_or_none(name) for name in names + list(args)]
+
+    def _get_or_none(self, name):
+        try:
+            return self.get(name)
+        except redis.ResponseError:
+            return None
+
+    def set(self, name, value, ex=None, px=None, nx=False, xx=False, keepttl=False):
+        name = _key(name)
+        with self.store.lock:
+            exists = self._alive(name)
+            if (nx and exists) or (xx and not exists):
+                return None
+            self.store.data[name] = _encode(value)
+            if not keepttl:
+                self.store.expires.pop(name, None)
+            if ex is not None:
+                self.pexpire(name, int(ex * 1000))
+            elif px is not None:
+                self.pexpire(name, px)
+        return True
+
+    def incrby(self, name, amount: int = 1) -> int:
+        with self.store.lock:
+            value = int(self._lookup(name, bytes) or 0) + amount
+            self.store.data[_key(name)] = _encode(value)
+        return value
+
+    def incr(self, name, amount: int = 1) -> int:
+        return self.incrby(name, amount)
+
+    # Hashes
+
+    def hset(self, name, key=None, value=None, mapping=None, items=None) -> int:
+        pairs = dict(mapping or {})
+        if key is not None:
+            pairs[key] = value
+        for index in range(0, len(items or []), 2):
+            pairs[items[index]] = items[index + 1]
+        with self.store.lock:
+            hash_ = self._lookup(name, dict, create=True)
+            added = sum(_key(field) not in hash_ for field in pairs)
+            hash_.update({_key(field): _encode(v) for field, v in pairs.items()})
+        return added
+
+    def hget(self, name, key):
+        with self.store.lock:
+            hash_ = self._lookup(name, dict) or {}
+            return self._out(hash_.get(_key(key)))
+
+    def hmget(self, name, keys, *args) -> list:
+        keys = [keys] if isinstance(keys, (str, bytes)) else list(keys)
+        return [self.hget(name, key) for key in keys + list(args)]
+
+    def hincrby(self, name, key, amount: int = 1) -> int:
+        with self.store.lock:
+            hash_ = self._lookup(name, dict, create=True)
+            value = int(hash_.get(_key(key), 0)) + amount
+            hash_[_key(key)] = _encode(value)
+        return value
+
+    def hgetall(self, name) -> dict:
+        with self.store.lock:
+            hash_ = dict(self._lookup(name, dict) or {})
+        return {self._out(k.encode()): self._out(v) for k, v in hash_.items()}
+
+    def hdel(self, name, *keys) -> int:
+        with self.store.lock:
+            hash_ = self._lookup(name, dict) or {}
+            removed = sum(hash_.pop(_key(key), None) is not None for key in keys)
+            self._drop_if_empty(name)
+        return removed
+
+    def hlen(self, name) -> int:
+        with self.store.lock:
+            return len(self._lookup(name, dict) or {})
+
+    # Sets
+
+    def sadd(self, name, *values) -> int:
+        with self.store.lock:
+            members = self._lookup(name, set, create=True)
+            before = len(members)
+            members.update(_key(value) for value in values)
+            return len(members) - before
+
+    def srem(self, name, *values) -> int:
+        with self.store.lock:
+            members = self._lookup(name, set) or set()
+            before = len(members)
+            members.difference_update(_key(value) for value in values)
+            self._drop_if_empty(name)
+            return before - len(members)
+
+    def smembers(self, name) -> set:
+        with self.store.lock:
+            members = set(self._lookup(name, set) or ())
+        return {self._out(member.encode()) for member in members}
+
+    def sismember(self, name, value) -> bool:
+        with self.store.lock:
+            return _key(value) in (self._lookup(name, set) or ())
+
+    def scard(self, name) -> int:
+        with self.store.lock:
+            return len(self._lookup(name, set) or ())
+
+    # Sorted sets
+
+    def zadd(self, name, mapping: dict, nx=False, xx=False) -> int:
+        with self.store.lock:
+            zset = self._lookup(name, _SortedSet, create=True)
+            added = 0
+            for member, score in mapping.items():
+                member = _key(member)
+                exists = member in zset
+                if (nx and exists) or (xx and not exists):
+                    continue
+                zset[member] = float(score)
+                added += not exists
+            self._drop_if_empty(name)
+        return added
+
+    def zscore(self, name, value):
+        with self.store.lock:
+            return (self._lookup(name, _SortedSet) or {}).get(_key(value))
+
+    def zcard(self, name) -> int:
+        with self.store.lock:
+            return len(self._lookup(name, _SortedSet) or ())
+
+    def _ordered(self, zset, desc=False) -> list:
+        return sorted(zset.items(), key=lambda item: (item[1], item[0]), reverse=desc)
+
+    def _range_result(self, items, withscores):
+        if withscores:
+            return [(self._out(m.encode()), score) for m, score in items]
+        return [self._out(m.encode()) for m, _ in items]
+
+    def zrange(self, name, start: int, end: int, desc=False, withscores=False):
+        with self.store.lock:
+            items = self._ordered(self._lookup(name, _SortedSet) or {}, desc)
+        end = len(items) + end if end < 0 else end
+        return self._range_result(items[start : end + 1], withscores)
+
+    def zrevrange(self, name, start: int, end: int, withscores=False):
+        return self.zrange(name, start, end, desc=True, withscores=withscores)
+
+    def zrem(self, name, *values) -> int:
+        with self.store.lock:
+            zset = self._lookup(name, _SortedSet) or {}
+            removed = sum(zset.pop(_key(v), None) is not None for v in values)
+            self._drop_if_empty(name)
+        return removed
+
+    def zrangebyscore(self, name, min, max, withscores=False):
+        in_range = _score_range(min, max)
+        with self.store.lock:
+            items = self._ordered(self._lookup(name, _SortedSet) or {})
+        return self._range_result(
+            [(member, score) for member, score in items if in_range(score)],
+            withscores,
+        )
+
+    def zremrangebyscore(self, name, min, max) -> int:
+        in_range = _score_range(min, max)
+        with self.store.lock:
+            zset = self._lookup(name, _SortedSet) or {}
+            doomed = [member for member, score in zset.items() if in_range(score)]
+            for member in doomed:
+                del zset[member]
+            self._drop_if_empty(name)
+        return len(doomed)
+
+    def zinter(self, keys, aggregate=None, withscores=False):
+        with self.store.lock:
+            zsets = [self._lookup(key, _SortedSet) or {} for key in keys]
+        if not zsets:
+            return []
+        combine = {"MIN": min, "MAX": max}.get((aggregate or "SUM").upper(), sum)
+        members = set(zsets[0]).intersection(*zsets[1:])
+        result = _SortedSet(
+            (member, combine(zset[member] for zset in zsets)) for member in members
+        )
+        return self._range_result(self._ordered(result), withscores)
+
+    # Pub/sub
+
+    def publish(self, channel, message) -> int:
+        channel = _key(channel)
+        with self.store.lock:
+            subscribers = list(self.store.subscribers.get(channel, ()))
+        for subscriber in subscribers:
+            subscriber._deliver(channel, _encode(message))
+        return len(subscribers)
+
+    def pubsub(self, **kwargs):
+        return LocalPubSub(self)
+
+
+class _SortedSet(dict):
+    """member -> score; a distinct type so WRONGTYPE checks work"""
@@ -0,0 +1,168 @@
+import hashlib
+import json
+import os
+import threading
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from django.core.files import File
+
+MANIFEST_NAME = ".media_sync_manifest.json"
+HASH_CHUNK = 1024 * 1024
+# Completed uploads between manifest writes (the manifest is also written on
+# exit, including Ctrl-C, so an interrupted sync resumes where it stopped)
+MANIFEST_FLUSH_EVERY = 50
+DEFAULT_WORKERS = 8
+DEFAULT_MULTIPART_THRESHOLD = 8 * 1024 * 1024
+
+
+def file_sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as handle:
+        for chunk in iter(lambda: handle.read(HASH_CHUNK), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def iter_media_files(root: str):
+    """Yield ``(relative storage name, absolute path)`` for every file"""
+    for directory, dirs, files in os.walk(root):
+        dirs.sort()
+        for filename in sorted(files):
+            if filename == MANIFEST_NAME:
+                continue
+            path = os.path.join(directory, filename)
+            name = os.path.relpath(path, root).replace(os.sep, "/")
+            yield name, path
+
+
+class Manifest:
+    """name -> {"sha256", "size", "mtime_ns"} of files already in the storage"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.lock = threading.Lock()
+        try:
+            with open(path, encoding="utf-8") as handle:
+                self.entries = json.load(handle)
+        except FileNotFoundError:
+            self.entries = {}
+
+    def unchanged(self, name: str, stat) -> bool:
+        """True if size and mtime match, i.e. the file need not be re-hashed"""
+        entry = self.entries.get(name)
+        return bool(
+            entry
+            and entry["size"] == stat.st_size
+            and entry["mtime_ns"] == stat.st_mtime_ns
+        )
+
+    def record(self, name: str, sha256: str, stat) -> None:
+        with self.lock:
+            self.entries[name] = {
+                "sha256": sha256,
+                "size": stat.st_size,
+                "mtime_ns": stat.st_mtime_ns,
+            }
+
+    def save(self) -> None:
+        with self.lock:
+            data = json.dumps(self.entries, indent=1, sort_keys=True)
+        temporary = f"{self.path}.tmp"
+        with open(temporary, "w", encoding="utf-8") as handle:
+            handle.write(data)
+        os.replace(temporary, self.path)
+
+
+def configure_multipart(storage, threshold: int) -> None:
+    """Use multipart uploads above ``threshold`` bytes on S3 storages
+
+    S3Boto3Storage uploads through boto3's managed transfer, which splits
+    large files into concurrently uploaded parts; other storages ignore this.
+    """
+    if not hasattr(storage, "transfer_config"):
+        return
+    from boto3.s3.transfer import TransferConfig
+
+    storage.transfer_config = TransferConfig(
+        multipart_threshold=threshold, multipart_chunksize=threshold
+    )
+
+
+def upload(storage, name: str, path: str) -> None:
+    """Save ``path`` as ``name``, replacing the stored file
+
+    Storages that overwrite in place (S3 with ``file_overwrite``, the
+    default) keep ``name`` available and are written directly, so the live
+    file is never missing. Only storages that would pick a new name get
+    the old file deleted first.
+    """
+    if storage.get_available_name(name) != name:
+        storage.delete(name)
+    with open(path, "rb") as handle:
+        saved = storage.save(name, File(handle, name=name))
+    if saved != name:
+        raise OSError(f"Storage saved {name} as {saved}")
+
+
+def sync_media(
+    root: str,
+    storage,
+    manifest_path: str = None,
+    workers: int = DEFAULT_WORKERS,
+    dry_run: bool = False,
+    on_result=None,
+) -> dict:
+    """Upload new and changed files under ``root`` to ``storage``
+
+    Files whose size and mtime match the manifest are skipped without being
+    read; the rest are hashed and skipped if their content is unchanged.
+    At most ``workers`` uploads run at once and only ``2 * workers`` are
+    queued. ``on_result(name, status, error)`` is called per changed file.
+    Returns counts of "uploaded", "unchanged", "failed" and "bytes".
+    """
+    manifest = Manifest(manifest_path or os.path.join(root, MANIFEST_NAME))
+    counts = {"uploaded": 0, "unchanged": 0, "failed": 0, "bytes": 0}
+    report = on_result or (lambda name, status, error: None)
+
+    def upload_changed(name, path, stat):
+        if manifest.unchanged(name, stat):
+            return "unchanged"
+        sha256 = file_sha256(path)
+        entry = manifest.entries.get(name)
+        if entry and entry["sha256"] == sha256:
+            manifest.record(name, sha256, stat)
+            return "unchanged"
+        if not dry_run:
+            upload(storage, name, path)
+            manifest.record(name, sha256, stat)
+        return "uploaded"
+
+    def collect(done):
+        for future in done:
+            name, stat = pending.pop(future)
+            try:
+                status, error = future.result(), None
+            except Exception as e:
+                status, error = "failed", e
+            counts[status] += 1
+            if status == "uploaded":
+                counts["bytes"] += stat.st_size
+            if status != "unchanged":
+                report(name, status, error)
+            if status == "uploaded" and counts["uploaded"] % MANIFEST_FLUSH_EVERY == 0:
+                manifest.save()
+
+    pending = {}
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            for name, path in iter_media_files(root):
+                if len(pending) >= 2 * workers:
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    collect(done)
+                stat = os.stat(path)
+                pending[pool.submit(upload_changed, name, path, stat)] = (name, stat)
+            collect(wait(pending).done)
+    finally:
+        if not dry_run:
+            manifest.save()
+    return counts
@@ -0,0 +1,147 @@
+import json
+import os
+import resource
+import socket
+import sys
+import time
+import tracemalloc
+
+from django.conf import settings
+
+MEMORY_SAMPLES_PREFIX = "memory_samples:"
+MEMORY_WORKERS = "memory_workers"
+
+SNAPSHOT_FRAMES = 10
+SNAPSHOT_TOP = 25
+
+_last_sample = 0.0
+_last_snapshot = None
+
+
+def worker_id() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def peak_rss_bytes() -> int:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def rss_bytes() -> int:
+    """Current resident set size of this process"""
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except OSError:
+        # No /proc (e.g. macOS): the peak is the best available figure
+        return peak_rss_bytes()
+
+
+def memory_usage() -> dict:
+    """RSS and Python heap figures for this worker"""
+    usage = {
+        "worker": worker_id(),
+        "time": time.time(),
+        "rss_bytes": rss_bytes(),
+        "peak_rss_bytes": peak_rss_bytes(),
+        "python_blocks": sys.getallocatedblocks(),
+        "tracing": tracemalloc.is_tracing(),
+    }
+    if usage["tracing"]:
+        usage["traced_bytes"], usage["traced_peak_bytes"] = (
+            tracemalloc.get_traced_memory()
+        )
+    return usage
+
+
+def record_sample(redis_client) -> dict:
+    """Append this worker's usage to its sample history in Redis"""
+    sample = memory_usage()
+    now = sample["time"]
+    keep = settings.MEMORY_SAMPLE_RETENTION
+    key = MEMORY_SAMPLES_PREFIX + sample["worker"]
+    pipe = redis_client.pipeline()
+    pipe.zadd(key, {json.dumps(sample): now})
+    pipe.zremrangebyscore(key, "-inf", now - keep)
+    pipe.expire(key, keep)
+    pipe.zadd(MEMORY_WORKERS, {sample["worker"]: now})
+    pipe.zremrangebyscore(MEMORY_WORKERS, "-inf", now - keep)
+    pipe.execute()
+    return sample
+
+
+def maybe_record_sample(redis_client) -> None:
+    """Record a sample if ``MEMORY_SAMPLE_INTERVAL`` seconds have passed
+
+    Called after every request; between samples it only compares two floats.
+    """
+    global _last_sample
+    interval = settings.MEMORY_SAMPLE_INTERVAL
+    now = time.monotonic()
+    if not interval or now - _last_sample < interval:
+        return
+    _last_sample = now
+    record_sample(redis_client)
+
+
+def worker_samples(redis_client) -> dict:
+    """worker id -> samples (oldest first) for every recently seen worker"""
+    workers = redis_client.replica.zrange(MEMORY_WORKERS, 0, -1)
+    pipe = redis_client.replica.pipeline(transaction=False)
+    for worker in workers:
+        pipe.zrange(MEMORY_SAMPLES_PREFIX + worker, 0, -1)
+    return {
+        worker: [json.loads(sample) for sample in samples]
+        for worker, samples in zip(workers, pipe.execute())
+        if samples
+    }
+
+
+def take_snapshot(stop: bool = False) -> dict:
+    """Snapshot allocations and diff them against this worker's last one
+
+    The first call starts ``tracemalloc`` (which slows the worker down) and
+    only returns a baseline; ``stop`` turns tracing off again.
+    """
+    global _last_snapshot
+    if not tracemalloc.is_tracing():
+        tracemalloc.start(SNAPSHOT_FRAMES)
+        _last_snapshot = None
+
+    snapshot = tracemalloc.take_snapshot().filter_traces(
+        [tracemalloc.Filter(False, tracemalloc.__file__)]
+    )
+    if _last_snapshot is None:
+        stats = snapshot.statistics("lineno")
+        top = [
+            {"location": str(stat.traceback), "size": stat.size, "count": stat.count}
+            for stat in stats[:SNAPSHOT_TOP]
+        ]
+        diff = False
+    else:
+        stats = snapshot.compare_to(_last_snapshot, "lineno")
+        top = [
+            {
+                "location": str(stat.traceback),
+                "size": stat.size,
+                "size_diff": stat.size_diff,
+                "count": stat.count,
+                "count_diff": stat.count_diff,
+            }
+            for stat in stats[:SNAPSHOT_TOP]
+        ]
+        diff = True
+    _last_snapshot = snapshot
+
+    traced, peak = tracemalloc.get_traced_memory()
+    if stop:
+        tracemalloc.stop()
+        _last_snapshot = None
+    return {
+        "worker": worker_id(),
+        "diff": diff,
+        "traced_bytes": traced,
+        "traced_peak_bytes": peak,
+        "top": top,
+    }
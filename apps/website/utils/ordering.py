@@ -0,0 +1,46 @@
+from django.db.models import Max, Min
+
+# Space left between consecutive ``order`` values, so an item can be placed
+# between two others without renumbering the rest of the table
+ORDER_GAP = 1024
+
+
+def next_order(model) -> int:
+    """Return an ``order`` value that places a new row last"""
+    current = model.objects.aggregate(value=Max("order"))["value"]
+    return ORDER_GAP if current is None else current + ORDER_GAP
+
+
+def move_to_edge(queryset, top: bool = True) -> list:
+    """Move the selected rows before (or after) every other row
+
+    Returns the updated objects; they are written with one ``bulk_update``.
+    """
+    model = queryset.model
+    others = model.objects.exclude(pk__in=queryset.values("pk"))
+    objects = list(queryset.order_by("order", "id"))
+    edge = others.aggregate(value=(Min if top else Max)("order"))["value"]
+    if edge is None:
+        # Every row is selected: keep their order, evenly spaced
+        start = ORDER_GAP
+    elif top:
+        start = edge - ORDER_GAP * len(objects)
+        if start < 0:
+            # PositiveIntegerField: make room by renumbering once
+            rebalance(model, first=ORDER_GAP * (len(objects) + 1))
+            return move_to_edge(model.objects.filter(pk__in=[o.pk for o in objects]))
+    else:
+        start = edge + ORDER_GAP
+    for index, obj in enumerate(objects):
+        obj.order = start + index * ORDER_GAP
+    model.objects.bulk_update(objects, ["order"])
+    return objects
+
+
+def rebalance(model, first: int = ORDER_GAP) -> list:
+    """Renumber every row to evenly spaced ``order`` values in one query"""
+    objects = list(model.objects.order_by("order", "id").only("id", "order"))
+    for index, obj in enumerate(objects):
+        obj.order = first + index * ORDER_GAP
+    model.objects.bulk_update(objects, ["order"])
+    return objects
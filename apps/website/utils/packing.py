@@ -0,0 +1,123 @@
+from collections import Counter
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils.cache import patch_vary_headers
+
+import msgpack
+
+JSON = "json"
+MSGPACK = "msgpack"
+# msgpack with repeated strings moved into a leading string table
+MSGPACK_DEDUP = "msgpack-dedup"
+PACKED_FORMATS = (MSGPACK, MSGPACK_DEDUP)
+
+CONTENT_TYPES = {
+    JSON: "application/json",
+    MSGPACK: "application/msgpack",
+    MSGPACK_DEDUP: "application/msgpack; strings=table",
+}
+# Accept values that select a packed format, compared case-insensitively
+PACKED_ACCEPT = {CONTENT_TYPES[fmt]: fmt for fmt in PACKED_FORMATS}
+
+# msgpack extension type of a reference into the string table; its data is
+# the packed table index
+STRING_REF = 1
+# Shorter strings cost no more inline than as a reference
+MIN_SHARED_LENGTH = 8
+
+_encoder = DjangoJSONEncoder()
+
+
+def negotiate(request) -> str:
+    """Pick the response format from the ``Accept`` header
+
+    Only an ``Accept`` of exactly one of the ``PACKED_ACCEPT`` values
+    selects msgpack; anything else, including lists of media ranges, gets
+    JSON. nginx's ``$api_cache_format`` map (compose/prod/nginx.conf) lists
+    the same values, so cached entries are stored under the right format.
+    """
+    return PACKED_ACCEPT.get(request.META.get("HTTP_ACCEPT", "").lower(), JSON)
+
+
+def vary_on_accept(response):
+    patch_vary_headers(response, ("Accept",))
+    return response
+
+
+def packed_key(key: str, fmt: str) -> str:
+    """Redis key of the ``fmt`` encoding of the value stored under ``key``"""
+    return f"{key}:{fmt}"
+
+
+def _count_strings(value, counts):
+    if isinstance(value, str):
+        counts[value] += 1
+    elif isinstance(value, dict):
+        for key, item in value.items():
+            _count_strings(key, counts)
+            _count_strings(item, counts)
+    elif isinstance(value, (list, tuple)):
+        for item in value:
+            _count_strings(item, counts)
+
+
+def _replace_strings(value, refs):
+    if isinstance(value, str):
+        return refs.get(value, value)
+    if isinstance(value, dict):
+        return {
+            refs.get(key, key): _replace_strings(item, refs)
+            for key, item in value.items()
+        }
+    if isinstance(value, (list, tuple)):
+        return [_replace_strings(item, refs) for item in value]
+    return value
+
+
+def pack(data, dedup: bool = False) -> bytes:
+    """Encode JSON-shaped ``data`` as msgpack
+
+    With ``dedup`` the output is two msgpack objects: the list of strings
+    that occur more than once, then ``data`` with those strings replaced by
+    ``STRING_REF`` extension values holding their index.
+    """
+    if not dedup:
+        return msgpack.packb(data, default=_encoder.default)
+    data = msgpack.unpackb(msgpack.packb(data, default=_encoder.default))
+    counts = Counter()
+    _count_strings(data, counts)
+    table = [
+        string
+        for string, count in counts.most_common()
+        if count > 1 and len(string) >= MIN_SHARED_LENGTH
+    ]
+    refs = {
+        string: msgpack.ExtType(STRING_REF, msgpack.packb(index))
+        for index, string in enumerate(table)
+    }
+    return msgpack.packb(table) + msgpack.packb(_replace_strings(data, refs))
+
+
+def unpack(payload: bytes, dedup: bool = False):
+    """Decode ``pack`` output (reference implementation for clients)"""
+    if not dedup:
+        return msgpack.unpackb(payload)
+    table = []
+
+    def ext_hook(code, data):
+        if code == STRING_REF:
+            return table[msgpack.unpackb(data)]
+        return msgpack.ExtType(code, data)
+
+    unpacker = msgpack.Unpacker(ext_hook=ext_hook)
+    unpacker.feed(payload)
+    table.extend(next(unpacker))
+    return next(unpacker)
+
+
+def store_packed(redis_pipe, key: str, data, expire: int = None) -> None:
+    """Queue every packed encoding of ``data`` next to the JSON under ``key``"""
+    for fmt in PACKED_FORMATS:
+        redis_pipe.set(
+            packed_key(key, fmt), pack(data, fmt == MSGPACK_DEDUP), ex=expire
+        )
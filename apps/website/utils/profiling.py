@@ -0,0 +1,148 @@
+import base64
+import cProfile
+import json
+import marshal
+import os
+import random
+import time
+import uuid
+import zlib
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.core import signing
+from django.db import connections
+
+PROFILE_KEY_PREFIX = "profile:"
+PROFILE_INDEX = "profile_index"
+PROFILE_HEADER = "HTTP_X_PROFILE"
+PROFILE_QUERY_FLAG = "profile"
+PROFILE_SALT = "apps.website.profiling"
+
+# Paths never profiled (the profile endpoints themselves)
+UNPROFILED_PREFIXES = ("/api/profiles/",)
+
+# redis-py entry points whose cumulative time is Redis time (network included)
+REDIS_FUNCTIONS = {"execute_command", "execute"}
+
+
+def make_token() -> str:
+    """Return a value for the ``X-Profile`` header"""
+    return signing.TimestampSigner(salt=PROFILE_SALT).sign("profile")
+
+
+def _valid_token(value: str) -> bool:
+    try:
+        signing.TimestampSigner(salt=PROFILE_SALT).unsign(
+            value, max_age=settings.PROFILING_TOKEN_MAX_AGE
+        )
+    except signing.BadSignature:
+        return False
+    return True
+
+
+def profile_trigger(request):
+    """Return why ``request`` should be profiled, or None
+
+    Checked on every request, so the common case is a couple of dict
+    lookups: no header, no query flag and no sampling.
+    """
+    header = request.META.get(PROFILE_HEADER)
+    if header is not None:
+        return "header" if _valid_token(header) else None
+    if PROFILE_QUERY_FLAG in request.META.get("QUERY_STRING", ""):
+        user = getattr(request, "user", None)
+        if request.GET.get(PROFILE_QUERY_FLAG) and user and user.is_staff:
+            return "staff"
+    rate = settings.PROFILING_SAMPLE_RATE
+    if rate and random.random() < rate:  # nosec B311
+        return "sample"
+    return None
+
+
+class RequestProfile:
+    """cProfile run of one request plus its SQL query count and time"""
+
+    def __init__(self, request, trigger: str):
+        self.id = uuid.uuid4().hex
+        self.request = request
+        self.trigger = trigger
+        self.profiler = cProfile.Profile()
+        self.sql_queries = 0
+        self.sql_seconds = 0.0
+        self.elapsed = 0.0
+
+    def _time_query(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.sql_queries += 1
+            self.sql_seconds += time.perf_counter() - start
+
+    def run(self, func, *args):
+        """Call ``func(*args)`` with profiling on; may be called repeatedly"""
+        start = time.perf_counter()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(self._time_query))
+            self.profiler.enable()
+            try:
+                return func(*args)
+            finally:
+                self.profiler.disable()
+                self.elapsed += time.perf_counter() - start
+
+    def redis_seconds(self) -> float:
+        total = 0.0
+        for (filename, _, name), stat in self.profiler.stats.items():
+            package = os.path.basename(os.path.dirname(filename))
+            if name in REDIS_FUNCTIONS and package == "redis":
+                total += stat[3]  # cumulative time
+        return total
+
+    def save(self, redis_client, status_code: int) -> None:
+        """Store the profile and its summary with ``PROFILING_TTL``"""
+        self.profiler.create_stats()
+        now = time.time()
+        meta = {
+            "id": self.id,
+            "method": self.request.method,
+            "path": self.request.get_full_path(),
+            "status": status_code,
+            "trigger": self.trigger,
+            "created": now,
+            "duration_ms": round(self.elapsed * 1000, 2),
+            "sql_queries": self.sql_queries,
+            "sql_ms": round(self.sql_seconds * 1000, 2),
+            "redis_ms": round(self.redis_seconds() * 1000, 2),
+        }
+        # The client decodes responses, so the binary stats travel as base64
+        stats = base64.b64encode(zlib.compress(marshal.dumps(self.profiler.stats)))
+        ttl = settings.PROFILING_TTL
+        pipe = redis_client.pipeline()
+        pipe.set(
+            PROFILE_KEY_PREFIX + self.id,
+            json.dumps({"meta": meta, "stats": stats.decode()}),
+            ex=ttl,
+        )
+        pipe.zadd(PROFILE_INDEX, {self.id: now})
+        pipe.zremrangebyscore(PROFILE_INDEX, "-inf", now - ttl)
+        pipe.execute()
+
+
+def recent_profiles(redis_client, limit: int = 50) -> list:
+    """Summaries of the newest stored profiles"""
+    ids = redis_client.replica.zrevrange(PROFILE_INDEX, 0, limit - 1)
+    if not ids:
+        return []
+    raw = redis_client.replica.mget([PROFILE_KEY_PREFIX + id_ for id_ in ids])
+    return [json.loads(entry)["meta"] for entry in raw if entry]
+
+
+def load_profile(redis_client, profile_id: str):
+    """Return the profile as ``.prof`` bytes (pstats format), or None"""
+    entry = redis_client.get_json(PROFILE_KEY_PREFIX + profile_id)
+    if entry is None:
+        return None
+    return zlib.decompress(base64.b64decode(entry["stats"]))
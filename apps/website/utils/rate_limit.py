@@ -0,0 +1,131 @@
+import logging
+import math
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.http import JsonResponse
+
+from .local_redis import python_script
+
+logger = logging.getLogger(__name__)
+
+RATE_LIMIT_PREFIX = "rate_limit:"
+
+# Token bucket, evaluated atomically inside Redis in one round trip. The
+# clock is Redis' own TIME, so every app host shares the same buckets.
+#   KEYS[1]  bucket hash
+#   ARGV[1]  capacity (burst size)
+#   ARGV[2]  refill rate in tokens per millisecond
+# Returns {allowed (0/1), milliseconds until a token is available}
+TOKEN_BUCKET_LUA = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local time = redis.call('TIME')
+local now = tonumber(time[1]) * 1000 + math.floor(tonumber(time[2]) / 1000)
+
+local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(bucket[1]) or capacity
+local ts = tonumber(bucket[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+
+local allowed = 0
+local retry_after = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+    allowed = 1
+else
+    retry_after = math.ceil((1 - tokens) / rate)
+end
+
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', tostring(now))
+redis.call('PEXPIRE', KEYS[1], math.ceil(capacity / rate) + 1000)
+return {allowed, retry_after}
+"""
+
+
+@python_script(TOKEN_BUCKET_LUA)
+def _local_token_bucket(client, keys, args):
+    """TOKEN_BUCKET_LUA for the in-process backend (runs under its lock)"""
+    capacity, rate = float(args[0]), float(args[1])
+    now = int(time.time() * 1000)
+    tokens, ts = client.hmget(keys[0], "tokens", "ts")
+    tokens = capacity if tokens is None else float(tokens)
+    ts = now if ts is None else float(ts)
+    tokens = min(capacity, tokens + max(0, now - ts) * rate)
+
+    allowed, retry_after = 0, 0
+    if tokens >= 1:
+        tokens -= 1
+        allowed = 1
+    else:
+        retry_after = math.ceil((1 - tokens) / rate)
+
+    client.hset(keys[0], mapping={"tokens": repr(tokens), "ts": str(now)})
+    client.pexpire(keys[0], math.ceil(capacity / rate) + 1000)
+    return [allowed, retry_after]
+
+
+_scripts = {}
+
+
+def client_ip(request) -> str:
+    """Client address as seen by nginx
+
+    nginx sets ``X-Real-IP`` to the connecting address on every proxied
+    location, overwriting whatever the client sent. ``X-Forwarded-For`` is
+    not used: nginx only appends to it, so its first entry is whatever the
+    client chose to send.
+    """
+    return request.META.get("HTTP_X_REAL_IP") or request.META.get("REMOTE_ADDR", "")
+
+
+def take_token(redis_client, key: str, capacity: int, rate_per_ms: float):
+    """Take one token from ``key``; returns ``(allowed, retry_after_ms)``"""
+    client = redis_client.client
+    script = _scripts.get(id(client))
+    if script is None:
+        script = _scripts[id(client)] = client.register_script(TOKEN_BUCKET_LUA)
+    allowed, retry_after = script(keys=[key], args=[capacity, repr(rate_per_ms)])
+    return bool(int(allowed)), int(retry_after)
+
+
+def rate_limit(
+    rate: int, per: int = 60, burst: int = None, scope: str = None, key=client_ip
+):
+    """Limit a view to ``rate`` requests per ``per`` seconds per client
+
+    ``burst`` is the bucket size (defaults to ``rate``), ``scope`` names the
+    limit (defaults to the view name) and ``key`` maps a request to a client
+    id. Over the limit the view returns 429 with ``Retry-After``. If Redis is
+    unavailable the request is let through rather than failing.
+    """
+    capacity = burst or rate
+    rate_per_ms = rate / (per * 1000)
+
+    def decorator(view):
+        name = scope or view.__name__
+
+        @wraps(view)
+        def wrapped(request, *args, **kwargs):
+            if not getattr(settings, "RATE_LIMIT_ENABLED", True):
+                return view(request, *args, **kwargs)
+            from ..views import redis_client
+
+            bucket = f"{RATE_LIMIT_PREFIX}{name}:{key(request)}"
+            try:
+                allowed, retry_after = take_token(
+                    redis_client, bucket, capacity, rate_per_ms
+                )
+            except Exception:
+                logger.exception("Rate limiter unavailable for %s", name)
+                return view(request, *args, **kwargs)
+            if not allowed:
+                response = JsonResponse({"error": "Too many requests"}, status=429)
+                response["Retry-After"] = str(max(1, math.ceil(retry_after / 1000)))
+                return response
+            return view(request, *args, **kwargs)
+
+        return wrapped
+
+    return decorator
@@ -1,20 +1,153 @@
 import json
 import os
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import cached_property
+
+from django.conf import settings
 
 import redis
+from redis.sentinel import Sentinel
+
+from .keyspace import KEYSPACE, UndeclaredKeyError, namespace_for
+from .local_redis import LocalRedis
+
+# Milliseconds a publish waits for replicas to acknowledge its writes
+REPLICA_WAIT_TIMEOUT = 500
+
+# (command, *args) -> reply of reads fetched ahead by ``RedisClient.prefetch``
+_prefetched = ContextVar("redis_prefetched", default=None)
+
+
+# Pipeline commands that write the key named by their first argument
+WRITE_COMMANDS = frozenset(
+    {
+        "set",
+        "setex",
+        "psetex",
+        "setnx",
+        "append",
+        "incr",
+        "incrby",
+        "decr",
+        "decrby",
+        "hset",
+        "hsetnx",
+        "hmset",
+        "hincrby",
+        "sadd",
+        "zadd",
+        "zincrby",
+        "lpush",
+        "rpush",
+    }
+)
+
+
+def parse_sentinels(value: str) -> list:
+    """Parse ``"host:port,host:port"`` into ``[(host, port), ...]``"""
+    hosts = []
+    for entry in value.split(","):
+        host, _, port = entry.strip().rpartition(":")
+        hosts.append((host, int(port)))
+    return hosts
+
+
+class _CheckedPipeline:
+    """Pipeline wrapper that refuses writes to undeclared keys
+
+    The key is checked when the command is queued, so a pipeline holding
+    an undeclared write raises before anything is sent.
+    """
+
+    def __init__(self, pipeline, namespace):
+        self._pipeline = pipeline
+        self._namespace = namespace
+
+    def __getattr__(self, name):
+        attribute = getattr(self._pipeline, name)
+        if name not in WRITE_COMMANDS:
+            return attribute
+
+        def command(*args, **kwargs):
+            self._namespace(args[0] if args else kwargs["name"])
+            attribute(*args, **kwargs)
+            return self
+
+        return command
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return self._pipeline.__exit__(*exc)
 
 
 class RedisClient:
+    """Redis access for the app
+
+    Writes always go to ``client`` (the primary). Plain reads go to
+    ``replica``, which is a read replica when ``REDIS_REPLICA_URL`` or
+    ``REDIS_SENTINELS`` is set and the primary otherwise.
+
+    Binary values go through ``set_bytes``/``get_bytes``, which use
+    separate connections that do not decode responses.
+
+    ``REDIS_BACKEND=memory`` swaps the server for an in-process store
+    (``LocalRedis``) with the same commands, for tests, benchmarks and
+    single-process deployments.
+
+    Every key belongs to a namespace declared in ``KEYSPACE`` with its TTL,
+    encoding and owner. ``set``, ``set_json`` and ``set_bytes`` refuse
+    undeclared keys and apply the declared TTL when none is given. Writes
+    queued on ``pipeline`` and ``raw_pipeline`` are checked the same way;
+    their writers look the TTL up with ``expire_for``.
+    """
+
+    KEYSPACE = KEYSPACE
+
     def __init__(self) -> None:
         """Initialize Redis client with configuration from environment variables."""
-        # Try REDIS_URL first (for Docker), fall back to individual variables
+        # decode_responses=True → strings instead of bytes
+        self.client, self.replica = self._connect(decode_responses=True)
+
+    def _connect(self, decode_responses: bool):
+        """Return ``(primary, replica)`` connections for the configured server"""
+        if settings.REDIS_BACKEND == "memory":
+            local = LocalRedis(decode_responses=decode_responses)
+            return local, local
+
+        # Try Sentinel, then REDIS_URL (for Docker), then individual variables
+        sentinels = os.getenv("REDIS_SENTINELS")
         redis_url = os.getenv("REDIS_URL")
+        replica_url = os.getenv("REDIS_REPLICA_URL")
+
+        if sentinels:
+            # Sentinel tells us the current primary and replicas, and the
+            # clients follow a failover without a restart
+            sentinel = Sentinel(
+                parse_sentinels(sentinels),
+                socket_timeout=5,
+                sentinel_kwargs={"password": os.getenv("REDIS_SENTINEL_PASSWORD")},
+            )
+            service = os.getenv("REDIS_SENTINEL_SERVICE", "mymaster")
+            options = {
+                "username": os.getenv("REDIS_USER"),
+                "password": os.getenv("REDIS_DJANGO_PASSWORD"),
+                "decode_responses": decode_responses,
+                "socket_timeout": 5,
+                "health_check_interval": 30,
+            }
+            return (
+                sentinel.master_for(service, **options),
+                sentinel.slave_for(service, **options),
+            )
 
         if redis_url:
             # Use REDIS_URL (Docker setup)
-            self.client = redis.from_url(
+            client = redis.from_url(
                 redis_url,
-                decode_responses=True,
+                decode_responses=decode_responses,
                 socket_timeout=5,
                 health_check_interval=30,
             )
@@ -25,39 +158,138 @@ class RedisClient:
             self.username = os.getenv("REDIS_USER")
             self.password = os.getenv("REDIS_DJANGO_PASSWORD")
 
-            # decode_responses=True → strings instead of bytes
-            self.client = redis.Redis(
+            client = redis.Redis(
                 host=self.host,
                 port=self.port,
                 username=self.username,
                 password=self.password,
-                decode_responses=True,
+                decode_responses=decode_responses,
                 socket_timeout=5,
                 health_check_interval=30,
             )
 
+        if not replica_url:
+            return client, client
+        replica = redis.from_url(
+            replica_url,
+            decode_responses=decode_responses,
+            socket_timeout=5,
+            health_check_interval=30,
+        )
+        return client, replica
+
+    @cached_property
+    def _raw(self):
+        # Opened on first use, so only processes serving binary payloads
+        # hold these extra pools
+        return self._connect(decode_responses=False)
+
+    @property
+    def has_replica(self) -> bool:
+        return self.replica is not self.client
+
+    def namespace(self, key: str):
+        """The ``KEYSPACE`` namespace of ``key``; raises UndeclaredKeyError"""
+        namespace = namespace_for(key)
+        if namespace is None:
+            raise UndeclaredKeyError(f"No Redis namespace declares {key!r}")
+        return namespace
+
+    def expire_for(self, key: str, expire: int = None):
+        """``expire`` if given, else the declared TTL of ``key``'s namespace"""
+        declared = self.namespace(key).expire()
+        return declared if expire is None else expire
+
     def set(self, key: str, value, expire: int = None):
         """Store value in Redis (original method)"""
         print(f"Setting value for key: {key}")
-        self.client.set(key, value, ex=expire)
+        self.client.set(key, value, ex=self.expire_for(key, expire))
 
     def get(self, key: str):
         """Get value from Redis (original method)"""
-        return self.client.get(key)
+        return self._read("get", key)
 
     def set_json(self, key: str, value: dict, expire: int = None):
         """Store dict as JSON in Redis"""
         print(f"Setting JSON for key: {key}")
-        self.client.set(key, json.dumps(value), ex=expire)
+        self.client.set(key, json.dumps(value), ex=self.expire_for(key, expire))
 
     def get_json(self, key: str):
         """Fetch JSON from Redis and parse it"""
-        raw = self.client.get(key)
+        raw = self._read("get", key)
         return json.loads(raw) if raw else None
 
+    def hget(self, key: str, field: str):
+        """Get one field of a Redis hash"""
+        return self._read("hget", key, field)
+
+    def zrevrange(self, key: str, start: int, end: int) -> list:
+        """Members of a sorted set from the highest score down"""
+        return self._read("zrevrange", key, start, end)
+
+    def _read(self, command: str, *args):
+        prefetched = _prefetched.get()
+        if prefetched is not None and (command, *args) in prefetched:
+            return prefetched[(command, *args)]
+        return getattr(self.replica, command)(*args)
+
+    @contextmanager
+    def prefetch(self, reads):
+        """Fetch ``reads`` in one pipeline and answer them from memory
+
+        ``reads`` are ``(command, *args)`` tuples for ``get``, ``hget`` or
+        ``zrevrange``. Inside the block (and in contexts copied from it),
+        those calls return the prefetched replies instead of going to Redis.
+        """
+        reads = list(dict.fromkeys(reads))
+        if not reads:
+            yield
+            return
+        pipe = self.replica.pipeline(transaction=False)
+        for command, *args in reads:
+            getattr(pipe, command)(*args)
+        token = _prefetched.set(dict(zip(reads, pipe.execute())))
+        try:
+            yield
+        finally:
+            _prefetched.reset(token)
+
+    def pipeline(self, transaction: bool = True):
+        """Return a pipeline that queues commands until ``execute()``"""
+        return _CheckedPipeline(
+            self.client.pipeline(transaction=transaction), self.namespace
+        )
+
+    def wait_for_replicas(self, timeout: int = REPLICA_WAIT_TIMEOUT) -> int:
+        """Block until a replica has the writes made so far (or ``timeout`` ms)
+
+        Call after publishing and before anything re-reads the new content
+        (e.g. a cache purge), so readers do not see the old values.
+        """
+        if not self.has_replica:
+            return 0
+        try:
+            return self.client.wait(1, timeout)
+        except redis.RedisError:
+            return 0
+
+    def set_bytes(self, key: str, value: bytes, expire: int = None):
+        """Store a binary value (e.g. a msgpack payload)"""
+        self._raw[0].set(key, value, ex=self.expire_for(key, expire))
+
+    def get_bytes(self, key: str):
+        """Get a binary value without decoding it"""
+        return self._raw[1].get(key)
+
+    def raw_pipeline(self, transaction: bool = True):
+        """Pipeline on the undecoded connection, for binary values"""
+        return _CheckedPipeline(
+            self._raw[0].pipeline(transaction=transaction), self.namespace
+        )
+
     def delete(self, key: str):
         """Delete a key"""
         self.client.delete(key)
 
     def exists(self, key: str) -> bool:
-        return self.client.exists(key) == 1
+        return self.replica.exists(key) == 1
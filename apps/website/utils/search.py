@@ -0,0 +1,194 @@
+from django.contrib.postgres.search import (
+    SearchQuery,
+    SearchRank,
+    SearchVector,
+    TrigramSimilarity,
+)
+from django.db import connection
+from django.db.models import CharField, F, Q
+from django.db.models.functions import Cast
+
+from ..models import FooterLink, Hero, MenuItem, Partners, SearchDocument
+from .arabic import normalize_text
+
+# Sources built from the published home_data rather than from models
+HOME_DATA_SOURCES = ("explore", "event", "course", "news")
+
+MAX_RESULTS = 50
+
+SEARCH_VECTOR = SearchVector("search_title", weight="A", config="simple") + (
+    SearchVector("search_body", weight="B", config="simple")
+)
+
+
+def _text(value, language):
+    if isinstance(value, dict):
+        return value.get(language) or ""
+    return value or ""
+
+
+def _document(source, source_id, title=None, body=None, url=""):
+    title_en, title_ar = _text(title, "en"), _text(title, "ar")
+    body_en, body_ar = _text(body, "en"), _text(body, "ar")
+    return SearchDocument(
+        source=source,
+        source_id=str(source_id),
+        title_en=title_en,
+        title_ar=title_ar,
+        body_en=body_en,
+        body_ar=body_ar,
+        url=url or "",
+        search_title=normalize_text(f"{title_en} {title_ar}"),
+        search_body=normalize_text(f"{body_en} {body_ar}"),
+    )
+
+
+# model -> (source label, function building a document from an instance)
+MODEL_SOURCES = {
+    MenuItem: (
+        "menu_item",
+        lambda obj: _document(
+            "menu_item", obj.pk, {"en": obj.label_en, "ar": obj.label_ar}, url=obj.route
+        ),
+    ),
+    Hero: (
+        "hero",
+        lambda obj: _document(
+            "hero",
+            obj.pk,
+            {"en": obj.title_en, "ar": obj.title_ar},
+            {"en": obj.description_en, "ar": obj.description_ar},
+        ),
+    ),
+    Partners: (
+        "partners",
+        lambda obj: _document(
+            "partners", obj.pk, {"en": obj.name_en, "ar": obj.name_ar}
+        ),
+    ),
+    FooterLink: (
+        "footer_link",
+        lambda obj: _document(
+            "footer_link",
+            obj.pk,
+            {"en": obj.label_en, "ar": obj.label_ar},
+            url=obj.route,
+        ),
+    ),
+}
+
+
+def home_data_documents(data: dict):
+    """Yield search documents for the bilingual sections of ``home_data``"""
+    for item in data.get("explore", {}).get("items", []):
+        yield _document(
+            "explore", item["id"], item.get("name"), item.get("description")
+        )
+    for event in data.get("events", {}).get("content", []):
+        yield _document(
+            "event", event["id"], event.get("title"), event.get("description")
+        )
+    for index, course in enumerate(data.get("courses", {}).get("courses", []), 1):
+        yield _document(
+            "course",
+            index,
+            course.get("title"),
+            course.get("description"),
+            url=course.get("button_text", {}).get("href", ""),
+        )
+    for card in data.get("news", {}).get("cards", []):
+        yield _document("news", card["id"], card.get("title"), url=card.get("link"))
+
+
+def save_documents(documents: list) -> None:
+    """Upsert documents and recompute their search vectors"""
+    if not documents:
+        return
+    SearchDocument.objects.bulk_create(
+        documents,
+        update_conflicts=True,
+        unique_fields=["source", "source_id"],
+        update_fields=[
+            "title_en",
+            "title_ar",
+            "body_en",
+            "body_ar",
+            "url",
+            "search_title",
+            "search_body",
+        ],
+    )
+    if connection.vendor == "postgresql":
+        by_source = {}
+        for document in documents:
+            by_source.setdefault(document.source, []).append(document.source_id)
+        for source, source_ids in by_source.items():
+            SearchDocument.objects.filter(
+                source=source, source_id__in=source_ids
+            ).update(search_vector=SEARCH_VECTOR)
+
+
+def index_instance(instance) -> None:
+    source, build = MODEL_SOURCES[type(instance)]
+    save_documents([build(instance)])
+
+
+def remove_instance(model, pk) -> None:
+    source, _ = MODEL_SOURCES[model]
+    SearchDocument.objects.filter(source=source, source_id=str(pk)).delete()
+
+
+def index_model(model, batch_size: int = 1000) -> None:
+    """Rebuild the documents of every row of ``model`` in bounded batches"""
+    source, build = MODEL_SOURCES[model]
+    batch = []
+    for obj in model.objects.order_by("pk").iterator(chunk_size=batch_size):
+        batch.append(build(obj))
+        if len(batch) >= batch_size:
+            save_documents(batch)
+            batch = []
+    save_documents(batch)
+    # source_id is text, so compare against the primary keys cast to text
+    existing = model.objects.annotate(pk_text=Cast("pk", CharField())).values("pk_text")
+    SearchDocument.objects.filter(source=source).exclude(
+        source_id__in=existing
+    ).delete()
+
+
+def index_home_data(data: dict) -> None:
+    """Replace the documents built from ``home_data``"""
+    documents = list(home_data_documents(data))
+    save_documents(documents)
+    for source in HOME_DATA_SOURCES:
+        current = [doc.source_id for doc in documents if doc.source == source]
+        SearchDocument.objects.filter(source=source).exclude(
+            source_id__in=current
+        ).delete()
+
+
+def search(query: str, limit: int = MAX_RESULTS):
+    """Return the best matching documents for ``query`` (English or Arabic)"""
+    normalized = normalize_text(query)
+    if not normalized:
+        return []
+    documents = SearchDocument.objects.all()
+    if connection.vendor == "postgresql":
+        ts_query = SearchQuery(normalized, config="simple", search_type="websearch")
+        documents = (
+            documents.annotate(
+                rank=SearchRank(F("search_vector"), ts_query)
+                + TrigramSimilarity("search_title", normalized)
+            )
+            .filter(
+                Q(search_vector=ts_query) | Q(search_title__trigram_similar=normalized)
+            )
+            .order_by("-rank", "source", "source_id")
+        )
+    else:
+        # Plain substring matching for non-Postgres development databases
+        documents = documents.filter(
+            Q(search_title__contains=normalized) | Q(search_body__contains=normalized)
+        ).order_by("source", "source_id")
+    return documents.values(
+        "source", "source_id", "title_en", "title_ar", "body_en", "body_ar", "url"
+    )[:limit]
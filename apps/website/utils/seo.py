@@ -0,0 +1,53 @@
+import json
+
+from .redis_seo import SEO_DATA
+
+# Redis hash holding one pre-encoded JSON entry per page
+SEO_HASH_KEY = "seo_pages"
+
+
+def seo_url(page: str) -> str:
+    return f"/api/seo/{page}/"
+
+
+def encode_entry(title: str, description: str) -> str:
+    return json.dumps({"title": title, "description": description})
+
+
+def seo_entries() -> dict:
+    """Return ``{page: encoded entry}`` with admin rows overriding SEO_DATA"""
+    from ..models import SeoPage
+
+    entries = {
+        page: encode_entry(data["title"], data["description"])
+        for page, data in SEO_DATA.items()
+    }
+    for row in SeoPage.objects.values("page", "title", "description"):
+        entries[row["page"]] = encode_entry(row["title"], row["description"])
+    return entries
+
+
+def publish_seo_pages(redis_client) -> list:
+    """Replace the whole SEO hash in one transaction; returns the pages"""
+    entries = seo_entries()
+    pipe = redis_client.pipeline()
+    pipe.delete(SEO_HASH_KEY)
+    if entries:
+        pipe.hset(SEO_HASH_KEY, mapping=entries)
+    pipe.execute()
+    return list(entries)
+
+
+def publish_seo_page(redis_client, page: str) -> None:
+    """Write (or remove) the hash field of a single page"""
+    from ..models import SeoPage
+
+    row = SeoPage.objects.filter(page=page).values("title", "description").first()
+    if row is None and page in SEO_DATA:
+        row = SEO_DATA[page]
+    pipe = redis_client.pipeline()
+    if row is None:
+        pipe.hdel(SEO_HASH_KEY, page)
+    else:
+        pipe.hset(SEO_HASH_KEY, page, encode_entry(row["title"], row["description"]))
+    pipe.execute()
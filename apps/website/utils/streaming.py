@@ -0,0 +1,68 @@
+import itertools
+import logging
+
+from django.core.serializers.json import DjangoJSONEncoder
+
+logger = logging.getLogger(__name__)
+
+# Rows fetched from the database per server-side cursor round trip
+DEFAULT_CHUNK_SIZE = 500
+# Rows encoded into a single chunk of the response body
+ROWS_PER_WRITE = 100
+
+
+def stream_json_object(sections, encoder_class=DjangoJSONEncoder):
+    """Yield a JSON object whose values are arrays, one piece at a time
+
+    ``sections`` is an iterable of ``(key, rows)`` pairs where ``rows`` is any
+    iterable of JSON-serializable values (typically a queryset iterator). The
+    concatenated output is byte-for-byte what
+    ``JsonResponse(dict(sections))`` would produce, but only
+    ``ROWS_PER_WRITE`` encoded rows are held in memory at a time.
+
+    Markup is held back and sent with the rows that follow it, so the first
+    chunk is only produced once the first query has returned (see
+    ``start_stream``). An error after that is logged and re-raised: the
+    server then drops the connection without ending the chunked body, which
+    clients and proxies see as an incomplete response rather than a
+    complete 200.
+    """
+    encoder = encoder_class()
+    pending = "{"
+    try:
+        for index, (key, rows) in enumerate(sections):
+            pending += f"{', ' if index else ''}{encoder.encode(key)}: ["
+            buffer = []
+            first = True
+            for row in rows:
+                buffer.append(encoder.encode(row))
+                if len(buffer) >= ROWS_PER_WRITE:
+                    yield pending + ("" if first else ", ") + ", ".join(buffer)
+                    pending, buffer, first = "", [], False
+            if buffer:
+                pending += ("" if first else ", ") + ", ".join(buffer)
+            yield pending + "]"
+            pending = ""
+        yield "}"
+    except Exception:
+        logger.exception("Streamed JSON response failed part way")
+        raise
+
+
+def start_stream(chunks):
+    """Produce the first chunk of ``chunks`` now and return the whole stream
+
+    Errors raised before anything is sent (e.g. the first query failing)
+    surface here, while the view can still answer with an error status.
+    """
+    chunks = iter(chunks)
+    try:
+        head = next(chunks)
+    except StopIteration:
+        return iter(())
+    return itertools.chain([head], chunks)
+
+
+def iter_values(queryset, chunk_size: int = DEFAULT_CHUNK_SIZE):
+    """Iterate ``queryset.values()`` through a server-side cursor"""
+    return queryset.values().iterator(chunk_size=chunk_size)
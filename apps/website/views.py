@@ -1,17 +1,47 @@
 import json
+import time
 from datetime import datetime
 
-from django.http import JsonResponse
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
 from django.shortcuts import render
+from django.utils.functional import SimpleLazyObject
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_POST
 
 from .models import FooterLink, Hero, MenuItem, Partners
+from .utils.admission import admission_stats
+from .utils.admission import controller as admission_controller
+from .utils.batch import BatchError, batchable, run_batch
+from .utils.cache_purge import PUBLISHED_CONTENT_URLS, purge_urls
+from .utils.events import event_stream, get_broadcaster, notify_content_changed
+from .utils.explore import EXPLORE_FACETS, explore_urls, find_items, publish_explore
+from .utils.keyspace import namespace_for
+from .utils.memory import memory_usage, take_snapshot, worker_samples
+from .utils.packing import (
+    CONTENT_TYPES,
+    JSON,
+    MSGPACK_DEDUP,
+    negotiate,
+    pack,
+    packed_key,
+    store_packed,
+    vary_on_accept,
+)
+from .utils.pagination import PaginationError, paginate, parse_fields
+from .utils.profiling import load_profile, recent_profiles
+from .utils.rate_limit import rate_limit
 from .utils.redis_client import RedisClient
 from .utils.redis_seo import SEO_DATA
-from .utils.redis_test_json import home_data
+from .utils.search import MAX_RESULTS, index_home_data, search
+from .utils.seo import SEO_HASH_KEY, publish_seo_pages, seo_url
+from .utils.streaming import iter_values, start_stream, stream_json_object
 
 # Create your views here.
 
-redis_client = RedisClient()
+# Built on first use, so importing the views does not touch Redis settings
+redis_client = SimpleLazyObject(RedisClient)
+
+WEBSITE_DATA_KEY = "website_data"
 
 
 def home(request):
@@ -23,63 +53,336 @@ def home(request):
             "message": "Welcome to ADMSC API",
             "endpoints": {
                 "website_data": "/api/website-data/",
+                "home_content": "/api/home/",
+                "seo": "/api/seo/<page>/",
+                "search": "/api/search/?q=<query>",
+                "batch": "/api/batch/?path=<url>&path=<url>",
+                "events": "/api/events/",
+                "explore": "/api/explore/?category=<category>",
+                "menu_items": "/api/menu-items/",
+                "heroes": "/api/heroes/",
+                "partners": "/api/partners/",
+                "footer_links": "/api/footer-links/",
                 "update_redis": "/api/update-redis/",
+                "profiles": "/api/profiles/",
+                "memory": "/api/memory/",
+                "admission": "/api/admission/",
                 "admin": "/admin/",
             },
         }
     )
 
 
+@batchable()
 def website_data_api(request):
     """
     API endpoint that returns all website data as JSON
+
+    The response is streamed table by table through server-side cursors, so
+    memory use does not grow with the number of rows. msgpack clients get a
+    cached encoding instead (see ``utils.packing``).
     """
     try:
-        # Get all data from each model
-        menu_items = list(MenuItem.objects.all().values())
-        heroes = list(Hero.objects.all().values())
-        partners = list(Partners.objects.all().values())
-        footer_links = list(FooterLink.objects.all().values())
+        fmt = negotiate(request)
+        if fmt != JSON:
+            return vary_on_accept(_packed_website_data(fmt))
+
+        sections = [
+            ("menu_items", iter_values(MenuItem.objects.all())),
+            ("heroes", iter_values(Hero.objects.all())),
+            ("partners", iter_values(Partners.objects.all())),
+            ("footer_links", iter_values(FooterLink.objects.all())),
+        ]
 
-        # Combine all data into a single response
+        # The first query runs here, so a database error is still a 500
+        body = start_stream(stream_json_object(sections))
+        return vary_on_accept(
+            StreamingHttpResponse(body, content_type="application/json")
+        )
+
+    except Exception as e:
+        return JsonResponse({"error": str(e)}, status=500)
+
+
+def _packed_website_data(fmt):
+    key = packed_key(WEBSITE_DATA_KEY, fmt)
+    payload = redis_client.get_bytes(key)
+    if payload is None:
+        # Encoded whole, so read from the primary like any cache fill
         data = {
-            "menu_items": menu_items,
-            "heroes": heroes,
-            "partners": partners,
-            "footer_links": footer_links,
+            name: list(model.objects.using("default").values())
+            for name, model in (
+                ("menu_items", MenuItem),
+                ("heroes", Hero),
+                ("partners", Partners),
+                ("footer_links", FooterLink),
+            )
         }
+        payload = pack(data, fmt == MSGPACK_DEDUP)
+        # Dropped on every content change (see signals.invalidate_content);
+        # the declared TTL only bounds staleness
+        redis_client.set_bytes(key, payload)
+    return HttpResponse(payload, content_type=CONTENT_TYPES[fmt])
+
+
+def _collection_api(request, model, ordering):
+    """
+    Return one keyset-paginated page of ``model`` rows
+
+    Query parameters: ``cursor`` (opaque, from ``next_cursor``), ``limit``
+    and ``fields`` (comma separated field names).
+    """
+    try:
+        fields = parse_fields(model, request.GET.get("fields"))
+        rows, next_cursor = paginate(
+            model.objects.all(),
+            ordering,
+            fields,
+            cursor=request.GET.get("cursor"),
+            limit=request.GET.get("limit"),
+        )
+        return JsonResponse(
+            {
+                "results": rows,
+                "next_cursor": next_cursor,
+                "has_more": next_cursor is not None,
+            }
+        )
+    except PaginationError as e:
+        return JsonResponse({"error": str(e)}, status=400)
+    except Exception as e:
+        return JsonResponse({"error": str(e)}, status=500)
+
+
+@batchable()
+def menu_items_api(request):
+    """
+    API endpoint that pages through menu items ordered by (order, id)
+    """
+    return _collection_api(request, MenuItem, ("order", "id"))
+
+
+@batchable()
+def heroes_api(request):
+    """
+    API endpoint that pages through heroes ordered by id
+    """
+    return _collection_api(request, Hero, ("id",))
+
+
+@batchable()
+def partners_api(request):
+    """
+    API endpoint that pages through partners ordered by (order, id)
+    """
+    return _collection_api(request, Partners, ("order", "id"))
+
+
+@batchable()
+def footer_links_api(request):
+    """
+    API endpoint that pages through footer links ordered by (order, id)
+    """
+    return _collection_api(request, FooterLink, ("order", "id"))
+
+
+@batchable(redis_reads=lambda request: [("get", "home_page")])
+def home_content_api(request):
+    """
+    API endpoint that returns the home page content published by update_redis
+    """
+    try:
+        # Every format is encoded at publish time and returned as stored
+        fmt = negotiate(request)
+        if fmt == JSON:
+            raw = redis_client.get("home_page")
+        else:
+            raw = redis_client.get_bytes(packed_key("home_page", fmt))
+        if raw is None:
+            return JsonResponse(
+                {"error": "Home content has not been published"}, status=404
+            )
+        return vary_on_accept(HttpResponse(raw, content_type=CONTENT_TYPES[fmt]))
+    except Exception as e:
+        return JsonResponse({"error": str(e)}, status=500)
+
+
+@batchable(redis_reads=lambda request, page: [("hget", SEO_HASH_KEY, page)])
+def seo_page_api(request, page):
+    """
+    API endpoint that returns the SEO metadata of a single page
+    """
+    try:
+        # One HGET; the entry is stored pre-encoded as JSON
+        raw = redis_client.hget(SEO_HASH_KEY, page)
+        if raw is None:
+            return JsonResponse(
+                {"error": f"No SEO data found for page '{page}'"}, status=404
+            )
+        return HttpResponse(raw, content_type="application/json")
+    except Exception as e:
+        return JsonResponse({"error": str(e)}, status=500)
+
+
+@batchable()
+def explore_api(request):
+    """
+    API endpoint that returns the explore items matching the given filters
+
+    e.g. ``/api/explore/?category=traditional``; without filters every item
+    is returned. The published ``filters`` list is included for the UI.
+    """
+    try:
+        filters = {facet: request.GET.get(facet) for facet in EXPLORE_FACETS}
+        items, raw_filters = find_items(redis_client, filters)
+        if raw_filters is None:
+            return JsonResponse(
+                {"error": "Explore content has not been published"}, status=404
+            )
+        # Items are stored pre-encoded, so the body is assembled without
+        # decoding them
+        body = '{"items": [' + ", ".join(items) + '], "filters": ' + raw_filters + "}"
+        return HttpResponse(body, content_type="application/json")
+    except Exception as e:
+        return JsonResponse({"error": str(e)}, status=500)
+
+
+@batchable()
+def search_api(request):
+    """
+    API endpoint that searches club content in English and Arabic
+    """
+    try:
+        query = request.GET.get("q", "").strip()
+        if not query:
+            return JsonResponse({"error": "Missing search query 'q'"}, status=400)
+        try:
+            limit = min(int(request.GET.get("limit", MAX_RESULTS)), MAX_RESULTS)
+        except ValueError:
+            return JsonResponse({"error": "limit must be an integer"}, status=400)
+        results = list(search(query, limit=max(limit, 1)))
+        return JsonResponse({"query": query, "results": results})
+    except Exception as e:
+        return JsonResponse({"error": str(e)}, status=500)
+
+
+async def events_api(request):
+    """
+    Server-Sent Events stream of content changes (served under ASGI)
+
+    Each ``content`` event lists the URLs to re-fetch; its id is the new
+    content version, so appending ``?v=<id>`` gets past cached copies.
+    Reconnecting clients send ``Last-Event-ID`` and receive the events
+    they missed. The stream ends when the client disconnects (see
+    ``STREAMING_PATHS``).
+    """
+    last_id = request.headers.get("Last-Event-ID") or request.GET.get("last_event_id")
+    try:
+        last_id = int(last_id) if last_id else None
+    except ValueError:
+        return JsonResponse({"error": "Invalid Last-Event-ID"}, status=400)
+    stream = event_stream(get_broadcaster(redis_client), redis_client, last_id)
+    response = StreamingHttpResponse(stream, content_type="text/event-stream")
+    response["Cache-Control"] = "no-cache"
+    # Tell nginx not to buffer the stream
+    response["X-Accel-Buffering"] = "no"
+    return response
+
 
-        return JsonResponse(data, safe=False)
+def batch_api(request):
+    """
+    API endpoint that serves several read endpoints in one response
 
+    e.g. ``/api/batch/?path=/api/home/&path=/api/seo/about/``; each item of
+    ``responses`` has the sub-request's ``path``, ``status`` and ``body``.
+    """
+    try:
+        body = run_batch(request, request.GET.getlist("path"), redis_client)
+        return HttpResponse(body, content_type="application/json")
+    except BatchError as e:
+        return JsonResponse({"error": str(e)}, status=400)
     except Exception as e:
         return JsonResponse({"error": str(e)}, status=500)
 
 
+@rate_limit(rate=6, per=60)
 def update_redis(request):
     """
     API endpoint that updates the Redis database
     """
+    # Large content module, only needed when publishing
+    from .utils.redis_test_json import home_data
+
     try:
         # here we can impliment the logic for the db update - from the admin side
-        redis_client.set_json("home_page", home_data)  # TTL = 1 hour
+        # Published content is persistent (see utils.keyspace): it is
+        # replaced on the next publish, never expired or evicted
+        redis_client.set_json("home_page", home_data)
+        packed = redis_client.raw_pipeline()
+        store_packed(packed, "home_page", home_data)
+        packed.execute()
         print("Task completed")
-        redis_client.set_json("seo_data", SEO_DATA)  # TTL = 1 hour
-        redis_client.set_json("test", "tested")  # TTL = 1 hour
+        redis_client.set_json("seo_data", SEO_DATA)
+        seo_pages = publish_seo_pages(redis_client)
+        publish_explore(redis_client, home_data)
+        index_home_data(home_data)
+        # The purge re-fetches these URLs; make sure replicas are caught up
+        redis_client.wait_for_replicas()
+        urls = (
+            PUBLISHED_CONTENT_URLS
+            + [seo_url(page) for page in seo_pages]
+            + explore_urls(home_data)
+        )
+        purge_urls(urls)
+        notify_content_changed(redis_client, urls)
         return JsonResponse({"status": "ok", "stored": home_data})
     except Exception as e:
         return JsonResponse({"error": str(e)}, status=500)
 
 
+HEALTH_STATUS_TTL = namespace_for("health_status_pr_").expire()
+HEALTH_STATUS_INDEX = "health_status_index"
+HEALTH_BATCH_MAX_ITEMS = 500
+VALID_HEALTH_STATUSES = ["GOOD", "BAD"]
+
+
+def _is_health_admin(request):
+    """Check if the request comes from amal-googerit"""
+    # You can add more sophisticated auth later
+    user_agent = request.META.get("HTTP_USER_AGENT", "")
+    return "amal-googerit" in user_agent or "amal-googerit" in str(request.META)
+
+
+def _build_health_data(status, pr_number):
+    return {
+        "status": status,
+        "pr_number": pr_number,
+        "timestamp": str(datetime.now()),
+        "set_by": "amal-googerit",
+    }
+
+
+def _queue_health_status(pipe, health_data):
+    """Queue the health key write and its index entry on a Redis pipeline"""
+    pr_number = health_data["pr_number"]
+    now = time.time()
+    pipe.set(
+        f"health_status_pr_{pr_number}",
+        json.dumps(health_data),
+        ex=HEALTH_STATUS_TTL,
+    )
+    pipe.zadd(HEALTH_STATUS_INDEX, {str(pr_number): now})
+    # Drop index entries whose health keys have already expired
+    pipe.zremrangebyscore(HEALTH_STATUS_INDEX, "-inf", now - HEALTH_STATUS_TTL)
+
+
+@rate_limit(rate=60, per=60)
 def set_health_status(request):
     """
     API endpoint to set health status (for amal-googerit only)
     """
     try:
-        # Check if user is amal-googerit (you can add more sophisticated auth later)
-        user_agent = request.META.get("HTTP_USER_AGENT", "")
-        if "amal-googerit" not in user_agent and "amal-googerit" not in str(
-            request.META
-        ):
+        if not _is_health_admin(request):
             return JsonResponse({"error": "Unauthorized"}, status=403)
 
         # Get health status from request
@@ -87,22 +390,16 @@ def set_health_status(request):
         status = data.get("status", "").upper()
         pr_number = data.get("pr_number", "unknown")
 
-        if status not in ["GOOD", "BAD"]:
+        if status not in VALID_HEALTH_STATUSES:
             return JsonResponse(
                 {"error": "Invalid status. Use GOOD or BAD"}, status=400
             )
 
         # Store health status in Redis
-        health_data = {
-            "status": status,
-            "pr_number": pr_number,
-            "timestamp": str(datetime.now()),
-            "set_by": "amal-googerit",
-        }
-
-        redis_client.set_json(
-            f"health_status_pr_{pr_number}", health_data, expire=86400
-        )  # 24 hours
+        health_data = _build_health_data(status, pr_number)
+        pipe = redis_client.pipeline()
+        _queue_health_status(pipe, health_data)
+        pipe.execute()
 
         return JsonResponse(
             {
@@ -118,6 +415,93 @@ def set_health_status(request):
         return JsonResponse({"error": str(e)}, status=500)
 
 
+@csrf_exempt
+@require_POST
+@rate_limit(rate=10, per=60)
+def set_health_status_batch(request):
+    """
+    API endpoint to set many health statuses at once (for amal-googerit only)
+
+    Expects ``{"statuses": [{"pr_number": ..., "status": "GOOD"}, ...]}``.
+    Every entry is validated before anything is written; when all of them are
+    valid they are stored in a single Redis pipeline.
+    """
+    try:
+        if not _is_health_admin(request):
+            return JsonResponse({"error": "Unauthorized"}, status=403)
+
+        data = json.loads(request.body.decode("utf-8"))
+        entries = data.get("statuses") if isinstance(data, dict) else None
+        if not isinstance(entries, list) or not entries:
+            return JsonResponse(
+                {"error": "Expected a non-empty 'statuses' list"}, status=400
+            )
+        if len(entries) > HEALTH_BATCH_MAX_ITEMS:
+            return JsonResponse(
+                {"error": f"At most {HEALTH_BATCH_MAX_ITEMS} statuses per batch"},
+                status=400,
+            )
+
+        results = []
+        valid = []
+        for entry in entries:
+            if not isinstance(entry, dict):
+                results.append({"status": "error", "error": "Entry must be an object"})
+                continue
+            status = str(entry.get("status", "")).upper()
+            pr_number = entry.get("pr_number")
+            if pr_number in (None, ""):
+                results.append({"status": "error", "error": "Missing pr_number"})
+            elif status not in VALID_HEALTH_STATUSES:
+                results.append(
+                    {
+                        "pr_number": pr_number,
+                        "status": "error",
+                        "error": "Invalid status. Use GOOD or BAD",
+                    }
+                )
+            else:
+                health_data = _build_health_data(status, pr_number)
+                valid.append(health_data)
+                results.append(
+                    {"pr_number": pr_number, "status": "success", "data": health_data}
+                )
+
+        if len(valid) != len(entries):
+            # Nothing is written unless the whole batch is valid
+            for result in results:
+                if result["status"] == "success":
+                    result["status"] = "skipped"
+                    del result["data"]
+            return JsonResponse({"status": "error", "results": results}, status=400)
+
+        pipe = redis_client.pipeline()
+        for health_data in valid:
+            _queue_health_status(pipe, health_data)
+        pipe.execute()
+
+        return JsonResponse(
+            {
+                "status": "success",
+                "message": f"Health status set for {len(valid)} PRs",
+                "results": results,
+            }
+        )
+
+    except json.JSONDecodeError:
+        return JsonResponse({"error": "Invalid JSON"}, status=400)
+    except Exception as e:
+        return JsonResponse({"error": str(e)}, status=500)
+
+
+def _health_status_reads(request):
+    pr_number = request.GET.get("pr_number", "latest")
+    if pr_number == "latest":
+        return [("zrevrange", HEALTH_STATUS_INDEX, 0, 0)]
+    return [("get", f"health_status_pr_{pr_number}")]
+
+
+@batchable(redis_reads=_health_status_reads)
 def get_health_status(request):
     """
     API endpoint to get current health status
@@ -126,14 +510,14 @@ def get_health_status(request):
         pr_number = request.GET.get("pr_number", "latest")
 
         if pr_number == "latest":
-            # Get the latest health status
-            keys = redis_client.client.keys("health_status_pr_*")
-            if keys:
-                latest_key = max(
-                    keys, key=lambda k: redis_client.client.hget(k, "timestamp") or ""
-                )
-                health_data = redis_client.get_json(latest_key)
-            else:
+            # Get the latest health status from the index
+            latest = redis_client.zrevrange(HEALTH_STATUS_INDEX, 0, 0)
+            health_data = (
+                redis_client.get_json(f"health_status_pr_{latest[0]}")
+                if latest
+                else None
+            )
+            if not health_data:
                 health_data = {"status": "UNKNOWN", "message": "No health status found"}
         else:
             # Get specific PR health status
@@ -148,3 +532,79 @@ def get_health_status(request):
 
     except Exception as e:
         return JsonResponse({"error": str(e)}, status=500)
+
+
+def profiles_api(request):
+    """
+    Staff-only list of recently stored request profiles
+    """
+    if not request.user.is_staff:
+        return JsonResponse({"error": "Unauthorized"}, status=403)
+    try:
+        return JsonResponse({"profiles": recent_profiles(redis_client)})
+    except Exception as e:
+        return JsonResponse({"error": str(e)}, status=500)
+
+
+def profile_download_api(request, profile_id):
+    """
+    Staff-only download of one profile as a ``.prof`` file
+
+    The file is in the pstats format, so it loads in ``python -m pstats``,
+    snakeviz, tuna and similar viewers.
+    """
+    if not request.user.is_staff:
+        return JsonResponse({"error": "Unauthorized"}, status=403)
+    try:
+        data = load_profile(redis_client, profile_id)
+        if data is None:
+            return JsonResponse({"error": "Profile not found"}, status=404)
+        response = HttpResponse(data, content_type="application/octet-stream")
+        response["Content-Disposition"] = f'attachment; filename="{profile_id}.prof"'
+        return response
+    except Exception as e:
+        return JsonResponse({"error": str(e)}, status=500)
+
+
+def admission_api(request):
+    """
+    Staff-only load shedding counts, in total and per worker
+    """
+    if not request.user.is_staff:
+        return JsonResponse({"error": "Unauthorized"}, status=403)
+    try:
+        return JsonResponse(
+            {"current": admission_controller.state(), **admission_stats(redis_client)}
+        )
+    except Exception as e:
+        return JsonResponse({"error": str(e)}, status=500)
+
+
+def memory_api(request):
+    """
+    Staff-only memory use of this worker and the sample history of all workers
+    """
+    if not request.user.is_staff:
+        return JsonResponse({"error": "Unauthorized"}, status=403)
+    try:
+        return JsonResponse(
+            {"current": memory_usage(), "workers": worker_samples(redis_client)}
+        )
+    except Exception as e:
+        return JsonResponse({"error": str(e)}, status=500)
+
+
+@require_POST
+def memory_snapshot_api(request):
+    """
+    Staff-only tracemalloc snapshot of this worker, diffed against its last one
+
+    The first call starts tracing and returns a baseline; pass ``?stop=1``
+    to stop tracing once done.
+    """
+    if not request.user.is_staff:
+        return JsonResponse({"error": "Unauthorized"}, status=403)
+    try:
+        return JsonResponse(take_snapshot(stop=bool(request.GET.get("stop"))))
+    except Exception as e:
+        return JsonResponse({"error": str(e)}, status=500)
@@ -0,0 +1,134 @@
+"""
+Request handlers that send public API reads through a shorter middleware chain.
+
+Read-only ``/api/`` requests need none of the session, auth, messages, CSRF
+or clickjacking middleware, so they are served by a second handler built
+from ``settings.LEAN_MIDDLEWARE``. Everything else (``/admin/``, writes,
+staff-only endpoints, staff ``?profile=1`` requests) keeps the full
+``settings.MIDDLEWARE`` stack.
+
+Under ASGI, responses on ``settings.STREAMING_PATHS`` are also cancelled as
+soon as their client disconnects.
+"""
+
+import asyncio
+from urllib.parse import parse_qs
+
+import django
+from django.conf import settings
+from django.core.handlers.asgi import ASGIHandler
+from django.core.handlers.wsgi import WSGIHandler
+
+from apps.website.utils.profiling import PROFILE_QUERY_FLAG
+
+LEAN_METHODS = {"GET", "HEAD", "OPTIONS"}
+
+
+def is_lean_request(path: str, method: str, query_string: str = "") -> bool:
+    """Return True if the request can skip the full middleware stack"""
+    if method not in LEAN_METHODS:
+        return False
+    if not path.startswith(tuple(settings.LEAN_PATH_PREFIXES)):
+        return False
+    if PROFILE_QUERY_FLAG in query_string and parse_qs(query_string).get(
+        PROFILE_QUERY_FLAG
+    ):
+        # The staff check of ?profile=1 needs the session and auth middleware
+        return False
+    return not path.startswith(tuple(settings.LEAN_EXCLUDED_PREFIXES))
+
+
+class LeanHandlerMixin:
+    """Build the middleware chain from LEAN_MIDDLEWARE instead of MIDDLEWARE"""
+
+    def load_middleware(self, is_async=False):
+        # BaseHandler reads settings.MIDDLEWARE directly; swap it only while
+        # this handler is built (once, at startup)
+        full_middleware = settings.MIDDLEWARE
+        settings.MIDDLEWARE = settings.LEAN_MIDDLEWARE
+        try:
+            super().load_middleware(is_async=is_async)
+        finally:
+            settings.MIDDLEWARE = full_middleware
+
+
+class LeanWSGIHandler(LeanHandlerMixin, WSGIHandler):
+    pass
+
+
+class LeanASGIHandler(LeanHandlerMixin, ASGIHandler):
+    pass
+
+
+class WSGIDispatcher:
+    def __init__(self):
+        self.full = WSGIHandler()
+        self.lean = LeanWSGIHandler()
+
+    def __call__(self, environ, start_response):
+        path = environ.get("PATH_INFO", "")
+        if is_lean_request(
+            path, environ.get("REQUEST_METHOD", ""), environ.get("QUERY_STRING", "")
+        ):
+            return self.lean(environ, start_response)
+        return self.full(environ, start_response)
+
+
+async def run_until_disconnect(app, scope, receive, send):
+    """Run ``app``, cancelling it when the client disconnects
+
+    Django 4.2's ASGIHandler stops calling ``receive()`` once the request
+    body is read, so it never sees ``http.disconnect``, and uvicorn drops
+    writes to a closed connection without raising. A streaming response
+    would run until the process exits. Here ``receive()`` is read for the
+    whole request and its messages are handed on to ``app``.
+    """
+    messages = asyncio.Queue()
+    task = asyncio.ensure_future(app(scope, messages.get, send))
+
+    async def watch():
+        while True:
+            message = await receive()
+            messages.put_nowait(message)
+            if message["type"] == "http.disconnect":
+                task.cancel()
+                return
+
+    watcher = asyncio.ensure_future(watch())
+    try:
+        await task
+    except asyncio.CancelledError:
+        # Cancelled by the watcher: the client is gone, nothing to report
+        if not (watcher.done() and not watcher.cancelled()):
+            raise
+    finally:
+        watcher.cancel()
+
+
+class ASGIDispatcher:
+    def __init__(self):
+        self.full = ASGIHandler()
+        self.lean = LeanASGIHandler()
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http" and is_lean_request(
+            scope.get("path", ""),
+            scope.get("method", ""),
+            scope.get("query_string", b"").decode("latin-1"),
+        ):
+            handler = self.lean
+        else:
+            handler = self.full
+        if scope["type"] == "http" and scope.get("path") in settings.STREAMING_PATHS:
+            return await run_until_disconnect(handler, scope, receive, send)
+        return await handler(scope, receive, send)
+
+
+def get_wsgi_application():
+    django.setup(set_prefix=False)
+    return WSGIDispatcher()
+
+
+def get_asgi_application():
+    django.setup(set_prefix=False)
+    return ASGIDispatcher()
@@ -2,6 +2,7 @@
 Base settings for admsc project.
 """
 
+import sys
 from pathlib import Path
 
 from decouple import config
@@ -25,11 +26,12 @@ DJANGO_APPS = [
     "django.contrib.sessions",
     "django.contrib.messages",
     "django.contrib.staticfiles",
+    "django.contrib.postgres",
 ]
 
-THIRD_PARTY_APPS = [
-    "storages",
-]
+# Optional apps are added below only when their feature is enabled, so
+# workers do not import them otherwise (e.g. "storages" with USE_S3_MEDIA)
+THIRD_PARTY_APPS = []
 
 LOCAL_APPS = [
     "apps.website",
@@ -38,13 +40,35 @@ LOCAL_APPS = [
 INSTALLED_APPS = DJANGO_APPS + THIRD_PARTY_APPS + LOCAL_APPS
 
 MIDDLEWARE = [
+    "apps.website.middleware.AdmissionControlMiddleware",
     "django.middleware.security.SecurityMiddleware",
+    "apps.website.middleware.ReplicaReadMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
     "django.contrib.auth.middleware.AuthenticationMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
+    "apps.website.middleware.ProfilingMiddleware",
+]
+
+# Shorter chain for read-only public API requests (see config/handlers.py);
+# sessions, auth, messages, CSRF and clickjacking are not needed there
+LEAN_MIDDLEWARE = [
+    "apps.website.middleware.AdmissionControlMiddleware",
+    "django.middleware.security.SecurityMiddleware",
+    "apps.website.middleware.ReplicaReadMiddleware",
+    "django.middleware.common.CommonMiddleware",
+    "apps.website.middleware.ProfilingMiddleware",
+]
+LEAN_PATH_PREFIXES = ["/api/"]
+# API paths that still need the full stack (writes reachable over GET,
+# staff-only endpoints)
+LEAN_EXCLUDED_PREFIXES = [
+    "/api/update-redis/",
+    "/api/profiles/",
+    "/api/memory/",
+    "/api/admission/",
 ]
 
 ROOT_URLCONF = "config.urls"
@@ -80,6 +104,23 @@ DATABASES = {
     }
 }
 
+# Optional read replica: content reads made while serving requests go here
+# (see apps.website.routers). Leave DB_REPLICA_HOST empty to read from the
+# primary only.
+DB_REPLICA_HOST = config("DB_REPLICA_HOST", default="")
+if DB_REPLICA_HOST:
+    DATABASES["replica"] = {
+        **DATABASES["default"],
+        "HOST": DB_REPLICA_HOST,
+        "PORT": config("DB_REPLICA_PORT", default=DATABASES["default"]["PORT"]),
+        "TEST": {"MIRROR": "default"},
+    }
+
+DATABASE_ROUTERS = ["apps.website.routers.ReplicaRouter"]
+
+# Seconds a client keeps reading from the primary after a write
+DB_PRIMARY_PIN_SECONDS = config("DB_PRIMARY_PIN_SECONDS", default=5, cast=int)
+
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
 AUTH_PASSWORD_VALIDATORS = [
@@ -113,6 +154,7 @@ USE_S3_MEDIA = config("USE_S3_MEDIA", default=False, cast=bool)
 
 if USE_S3_MEDIA:
     # S3 Media Storage
+    INSTALLED_APPS += ["storages"]
     DEFAULT_FILE_STORAGE = "storages.backends.s3boto3.S3Boto3Storage"
     AWS_ACCESS_KEY_ID = config("AWS_ACCESS_KEY_ID")
     AWS_SECRET_ACCESS_KEY = config("AWS_SECRET_ACCESS_KEY")
@@ -123,24 +165,124 @@ else:
     MEDIA_URL = "/media/"
     MEDIA_ROOT = BASE_DIR / "media"
 
+# Responsive image variants generated for Hero and Partners images
+IMAGE_VARIANT_WIDTHS = (320, 640, 1280)
+IMAGE_VARIANT_FORMATS = ("webp", "avif")
+IMAGE_VARIANT_WORKERS = config("IMAGE_VARIANT_WORKERS", default=2, cast=int)
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/4.2/ref/settings/#default-auto-field
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
 # Redis Configuration
+REDIS_CACHE_URL = config("REDIS_URL", default="redis://127.0.0.1:6379/1")
 CACHES = {
     "default": {
         "BACKEND": "django_redis.cache.RedisCache",
-        "LOCATION": config("REDIS_URL", default="redis://127.0.0.1:6379/1"),
+        "LOCATION": REDIS_CACHE_URL,
         "OPTIONS": {
             "CLIENT_CLASS": "django_redis.client.DefaultClient",
         },
-    }
+    },
+    # Cached copies of sessions; may point at a separate instance
+    "sessions": {
+        "BACKEND": "django_redis.cache.RedisCache",
+        "LOCATION": config("REDIS_SESSIONS_URL", default=REDIS_CACHE_URL),
+        "OPTIONS": {
+            "CLIENT_CLASS": "django_redis.client.DefaultClient",
+        },
+    },
 }
 
-# Session configuration
-SESSION_ENGINE = "django.contrib.sessions.backends.cache"
-SESSION_CACHE_ALIAS = "default"
+# "memory" keeps RedisClient data and the cache inside the process instead
+# of on a Redis server; only for tests, benchmarks and single-process
+# deployments (each process would otherwise see different data). It is the
+# default under pytest: pytest-django imports these settings before any
+# conftest.py runs, so the choice cannot be left to the test setup
+REDIS_BACKEND = config(
+    "REDIS_BACKEND", default="memory" if "pytest" in sys.modules else "redis"
+)
+if REDIS_BACKEND == "memory":
+    CACHES = {
+        alias: {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+            "LOCATION": alias,
+        }
+        for alias in CACHES
+    }
+
+# Session configuration: sessions are stored in the database and cached in
+# Redis, so a Redis eviction or restart costs a query instead of a logout
+SESSION_ENGINE = "django.contrib.sessions.backends.cached_db"
+SESSION_CACHE_ALIAS = "sessions"
+
+# Internal nginx listener used to refresh cached API responses on publish
+# (e.g. http://nginx:8081); empty disables purging
+NGINX_CACHE_PURGE_URL = config("NGINX_CACHE_PURGE_URL", default="")
+NGINX_CACHE_PURGE_HOST = config("NGINX_CACHE_PURGE_HOST", default="")
+
+# Redis-backed rate limits on write endpoints (apps.website.utils.rate_limit)
+RATE_LIMIT_ENABLED = config("RATE_LIMIT_ENABLED", default=True, cast=bool)
+
+# Request profiling (apps.website.utils.profiling): requests carrying a
+# signed X-Profile header (manage.py profiling_token), staff requests with
+# ?profile=1 and a random PROFILING_SAMPLE_RATE share of requests are
+# profiled and kept for PROFILING_TTL seconds under /api/profiles/
+PROFILING_SAMPLE_RATE = config("PROFILING_SAMPLE_RATE", default=0.0, cast=float)
+PROFILING_TTL = config("PROFILING_TTL", default=86400, cast=int)
+PROFILING_TOKEN_MAX_AGE = config("PROFILING_TOKEN_MAX_AGE", default=3600, cast=int)
+
+# Per-worker memory samples (apps.website.utils.memory), taken after a
+# request at most every MEMORY_SAMPLE_INTERVAL seconds (0 disables) and
+# kept for MEMORY_SAMPLE_RETENTION seconds; see /api/memory/
+MEMORY_SAMPLE_INTERVAL = config("MEMORY_SAMPLE_INTERVAL", default=60, cast=int)
+MEMORY_SAMPLE_RETENTION = config("MEMORY_SAMPLE_RETENTION", default=86400, cast=int)
+
+# Content change events (/api/events/, apps.website.utils.events): idle
+# streams get a heartbeat every SSE_HEARTBEAT_SECONDS; a client more than
+# SSE_CLIENT_BUFFER events behind is disconnected and resumes from the log
+SSE_HEARTBEAT_SECONDS = config("SSE_HEARTBEAT_SECONDS", default=15, cast=int)
+SSE_CLIENT_BUFFER = config("SSE_CLIENT_BUFFER", default=100, cast=int)
+# Long-lived ASGI responses, cancelled when their client disconnects
+# (see config/handlers.py)
+STREAMING_PATHS = ["/api/events/"]
+
+# Admission control (apps.website.middleware.AdmissionControlMiddleware):
+# per worker, low-priority requests are shed with 503 at the LOW_PRIORITY
+# limits and all others at the MAX limits. Latency is a moving average
+# including the wait in nginx's queue (X-Request-Start). Probes and the
+# nginx-cached reads are always admitted.
+ADMISSION_CONTROL_ENABLED = config("ADMISSION_CONTROL_ENABLED", default=True, cast=bool)
+ADMISSION_LOW_PRIORITY_MAX_IN_FLIGHT = config(
+    "ADMISSION_LOW_PRIORITY_MAX_IN_FLIGHT", default=4, cast=int
+)
+ADMISSION_LOW_PRIORITY_LATENCY_MS = config(
+    "ADMISSION_LOW_PRIORITY_LATENCY_MS", default=1000, cast=int
+)
+ADMISSION_MAX_IN_FLIGHT = config("ADMISSION_MAX_IN_FLIGHT", default=16, cast=int)
+ADMISSION_MAX_LATENCY_MS = config("ADMISSION_MAX_LATENCY_MS", default=5000, cast=int)
+ADMISSION_RETRY_AFTER = config("ADMISSION_RETRY_AFTER", default=5, cast=int)
+# Seconds between each worker's report to /api/admission/ (0 disables)
+ADMISSION_STATS_INTERVAL = config("ADMISSION_STATS_INTERVAL", default=10, cast=int)
+ADMISSION_PROBE_PATHS = ["/"]
+ADMISSION_CACHED_PREFIXES = [
+    "/api/website-data/",
+    "/api/home/",
+    "/api/explore/",
+    "/api/seo/",
+    "/api/menu-items/",
+    "/api/heroes/",
+    "/api/partners/",
+    "/api/footer-links/",
+]
+ADMISSION_LOW_PRIORITY_PREFIXES = [
+    "/api/batch/",
+    "/api/search/",
+    "/api/health/",
+    "/api/profiles/",
+    "/api/memory/",
+    "/api/admission/",
+]
 
 # Webhook Configuration
 WEBHOOK_SECRET = config("WEBHOOK_SECRET", default="")
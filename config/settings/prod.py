@@ -34,6 +34,15 @@ else:
     STATIC_ROOT = BASE_DIR / "staticfiles"
     MEDIA_ROOT = BASE_DIR / "media"
 
+    # Fingerprint static files by content hash and write .gz/.br copies at
+    # collectstatic time; WhiteNoise serves hashed names as immutable and
+    # keeps its short default max-age for the rest, which change in place
+    STATICFILES_STORAGE = "whitenoise.storage.CompressedManifestStaticFilesStorage"
+    MIDDLEWARE.insert(
+        MIDDLEWARE.index("django.middleware.security.SecurityMiddleware") + 1,
+        "whitenoise.middleware.WhiteNoiseMiddleware",
+    )
+
 # Logging configuration for production
 LOGGING = {
     "version": 1,
@@ -2,6 +2,8 @@
 WSGI config for admsc project.
 
 It exposes the WSGI callable as a module-level variable named ``application``.
+Public API reads are dispatched to a handler with a shorter middleware chain
+(see config/handlers.py).
 
 For more information on this file, see
 https://docs.djangoproject.com/en/4.2/howto/deployment/wsgi/
@@ -9,7 +11,7 @@ https://docs.djangoproject.com/en/4.2/howto/deployment/wsgi/
 
 import os
 
-from django.core.wsgi import get_wsgi_application
+from config.handlers import get_wsgi_application
 
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings.prod")
 
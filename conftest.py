@@ -2,13 +2,41 @@
 Pytest configuration and fixtures.
 """
 
+import json
+import math
+from contextlib import ExitStack
+from pathlib import Path
+
 from django.contrib.auth import get_user_model
+from django.db import connections
 from django.test import Client
+from django.test.utils import CaptureQueriesContext
 
 import pytest
 
 User = get_user_model()
 
+PERF_BUDGETS_FILE = Path(__file__).parent / "apps" / "website" / "perf_budgets.json"
+# Headroom recorded on top of measured response sizes (ids and other
+# values vary slightly between databases)
+RESPONSE_BYTES_MARGIN = 0.1
+
+
+def pytest_configure(config):
+    config.addinivalue_line(
+        "markers",
+        "perf_budget: checks query, Redis and response size budgets "
+        "(see apps/website/perf_budgets.json)",
+    )
+
+
+def pytest_addoption(parser):
+    parser.addoption(
+        "--update-perf-budgets",
+        action="store_true",
+        help="Record the measured costs of perf_budget tests as the new budgets",
+    )
+
 
 @pytest.fixture
 def client():
@@ -30,3 +58,177 @@ def admin_user():
     return User.objects.create_superuser(
         username="admin", email="admin@example.com", password="adminpass123"
     )
+
+
+@pytest.fixture(autouse=True)
+def test_keyspace(monkeypatch):
+    """Declare ``test:*`` for scratch keys; the app's KEYSPACE never has it."""
+    from apps.website.utils import keyspace
+
+    scratch = keyspace.Namespace("test:*", 60, "any", "tests")
+    monkeypatch.setattr(keyspace, "KEYSPACE", keyspace.KEYSPACE + (scratch,))
+
+
+@pytest.fixture(autouse=True)
+def disable_rate_limits(settings):
+    """Turn rate limits off unless a test enables them explicitly."""
+    settings.RATE_LIMIT_ENABLED = False
+
+
+class _CountingPipeline:
+    """Pipeline wrapper that counts one round trip per ``execute()``"""
+
+    def __init__(self, pipeline, commands):
+        self._pipeline = pipeline
+        self._commands = commands
+        self._queued = []
+
+    def __getattr__(self, name):
+        attribute = getattr(self._pipeline, name)
+        if name == "execute":
+
+            def execute(*args, **kwargs):
+                self._commands.append(f"pipeline({', '.join(self._queued)})")
+                self._queued = []
+                return attribute(*args, **kwargs)
+
+            return execute
+        if not callable(attribute):
+            return attribute
+
+        def queue(*args, **kwargs):
+            self._queued.append(name)
+            attribute(*args, **kwargs)
+            return self
+
+        return queue
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return self._pipeline.__exit__(*exc)
+
+
+class _CountingClient:
+    """Redis client wrapper that records every command (round trip) sent"""
+
+    def __init__(self, client, commands):
+        self._client = client
+        self._commands = commands
+
+    def __getattr__(self, name):
+        attribute = getattr(self._client, name)
+        if name == "pipeline":
+            return lambda *args, **kwargs: _CountingPipeline(
+                attribute(*args, **kwargs), self._commands
+            )
+        if not callable(attribute):
+            return attribute
+
+        def command(*args, **kwargs):
+            self._commands.append(name)
+            return attribute(*args, **kwargs)
+
+        return command
+
+
+@pytest.fixture
+def request_cost(client, monkeypatch, settings):
+    """Return ``measure(path, **headers)`` -> cost of one GET request
+
+    The cost holds the status, the number of SQL queries, the Redis round
+    trips (a pipeline counts once) with the commands sent, and the size of
+    the response body. Periodic per-worker reporting is turned off so every
+    request costs the same.
+    """
+    from apps.website.views import redis_client
+
+    settings.MEMORY_SAMPLE_INTERVAL = 0
+    settings.ADMISSION_STATS_INTERVAL = 0
+    commands = []
+    for name in ("client", "replica"):
+        counting = _CountingClient(getattr(redis_client, name), commands)
+        monkeypatch.setattr(redis_client, name, counting)
+    monkeypatch.setattr(
+        redis_client,
+        "_raw",
+        tuple(_CountingClient(raw, commands) for raw in redis_client._raw),
+    )
+
+    def measure(path, **headers):
+        commands.clear()
+        # Aliases that mirror another one share its connection
+        unique = {id(connection): connection for connection in connections.all()}
+        with ExitStack() as stack:
+            captures = [
+                stack.enter_context(CaptureQueriesContext(connection))
+                for connection in unique.values()
+            ]
+            response = client.get(path, **headers)
+            # Streamed bodies run their queries while being read
+            if response.streaming:
+                body = b"".join(response.streaming_content)
+            else:
+                body = response.content
+        return {
+            "status": response.status_code,
+            "queries": sum(len(capture) for capture in captures),
+            "redis_commands": len(commands),
+            "response_bytes": len(body),
+            "redis_log": list(commands),
+        }
+
+    return measure
+
+
+class PerfBudgets:
+    """Budgets recorded in ``apps/website/perf_budgets.json``
+
+    Query and Redis counts must match their budget exactly, so improvements
+    are recorded as well as regressions; response sizes must stay within
+    theirs. ``pytest --update-perf-budgets`` records the measured values
+    instead, for review in the diff.
+    """
+
+    def __init__(self, budgets: dict, update: bool):
+        self.budgets = budgets
+        self.update = update
+
+    def check(self, name: str, cost: dict) -> None:
+        measured = {
+            "queries": cost["queries"],
+            "redis_commands": cost["redis_commands"],
+            "response_bytes": math.ceil(
+                cost["response_bytes"] * (1 + RESPONSE_BYTES_MARGIN)
+            ),
+        }
+        if self.update:
+            self.budgets[name] = measured
+            return
+        budget = self.budgets.get(name)
+        hint = "run pytest --update-perf-budgets and review perf_budgets.json"
+        assert budget is not None, f"No budget for {name}; {hint}"
+        for key in ("queries", "redis_commands"):
+            assert cost[key] == budget[key], (
+                f"{name}: {cost[key]} {key}, budget {budget[key]} "
+                f"(Redis: {cost['redis_log']}); if intended, {hint}"
+            )
+        assert cost["response_bytes"] <= budget["response_bytes"], (
+            f"{name}: {cost['response_bytes']} bytes, budget "
+            f"{budget['response_bytes']}; if intended, {hint}"
+        )
+
+
+@pytest.fixture(scope="session")
+def perf_budgets(request):
+    """Session-wide budgets; written back at the end when updating"""
+    budgets = {}
+    if PERF_BUDGETS_FILE.exists():
+        budgets = json.loads(PERF_BUDGETS_FILE.read_text(encoding="utf-8"))
+    checker = PerfBudgets(budgets, request.config.getoption("--update-perf-budgets"))
+    yield checker
+    if checker.update:
+        PERF_BUDGETS_FILE.write_text(
+            json.dumps(budgets, indent=2, sort_keys=True) + "\n", encoding="utf-8"
+        )
@@ -0,0 +1,89 @@
+#!/usr/bin/env python
+"""
+Measure the per-request cost of the full vs. lean middleware chains.
+
+Both handlers serve the same trivial JSON view, so the difference between
+the two timings is the middleware overhead that public API reads avoid.
+
+Usage:
+    python scripts/bench_middleware.py [--requests 20000]
+"""
+
+import argparse
+import io
+import os
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings.dev")
+os.environ.setdefault("REDIS_BACKEND", "memory")
+
+from django.http import JsonResponse  # noqa: E402
+from django.urls import path  # noqa: E402
+
+
+def ping(request):
+    return JsonResponse({"status": "ok"})
+
+
+urlpatterns = [path("api/ping/", ping)]
+
+
+def run(handler, count):
+    environ = {
+        "REQUEST_METHOD": "GET",
+        "PATH_INFO": "/api/ping/",
+        "QUERY_STRING": "",
+        "SERVER_NAME": "localhost",
+        "SERVER_PORT": "8000",
+        "HTTP_HOST": "localhost",
+        "wsgi.url_scheme": "http",
+        "wsgi.input": io.BytesIO(),
+        "wsgi.errors": sys.stderr,
+    }
+
+    def start_response(status, headers):
+        assert status.startswith("200"), status
+
+    start = time.perf_counter()
+    for _ in range(count):
+        for _chunk in handler(dict(environ), start_response):
+            pass
+    return (time.perf_counter() - start) / count * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=20000)
+    args = parser.parse_args()
+
+    import django
+    from django.conf import settings
+
+    django.setup()
+    settings.ROOT_URLCONF = __name__
+    settings.ALLOWED_HOSTS = ["localhost"]
+
+    from django.core.handlers.wsgi import WSGIHandler
+
+    from config.handlers import LeanWSGIHandler
+
+    full, lean = WSGIHandler(), LeanWSGIHandler()
+    run(full, 200), run(lean, 200)  # warm up
+    full_us = run(full, args.requests)
+    lean_us = run(lean, args.requests)
+
+    print(f"Full middleware ({len(settings.MIDDLEWARE)}): {full_us:8.1f} us/request")
+    print(
+        f"Lean middleware ({len(settings.LEAN_MIDDLEWARE)}): {lean_us:8.1f} us/request"
+    )
+    print(
+        f"Saved: {full_us - lean_us:.1f} us/request "
+        f"({(full_us - lean_us) / full_us:.0%})"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,38 @@
+#!/bin/bash
+
+# Script to set the health status of many PRs in a single request
+# Usage: ./scripts/set-health-status-batch.sh <PR_NUMBER>:<STATUS> [<PR_NUMBER>:<STATUS> ...]
+# STATUS can be "GOOD" or "BAD"
+
+set -e
+
+if [ "$#" -eq 0 ]; then
+    echo "Usage: ./scripts/set-health-status-batch.sh <PR_NUMBER>:<STATUS> [<PR_NUMBER>:<STATUS> ...]"
+    echo "STATUS can be 'GOOD' or 'BAD'"
+    exit 1
+fi
+
+ENTRIES=""
+for ARG in "$@"; do
+    PR_NUMBER="${ARG%%:*}"
+    STATUS="${ARG#*:}"
+
+    if [ -z "$PR_NUMBER" ] || ( [ "$STATUS" != "GOOD" ] && [ "$STATUS" != "BAD" ] ); then
+        echo "Invalid entry '$ARG'. Expected <PR_NUMBER>:<GOOD|BAD>"
+        exit 1
+    fi
+
+    ENTRIES="$ENTRIES{\"status\": \"$STATUS\", \"pr_number\": \"$PR_NUMBER\"},"
+done
+
+echo "Attempting to set health status for $# PRs..."
+
+# Assuming your Django app is running on localhost:8000
+# The User-Agent header is used for basic authentication (amal-googerit only)
+curl -X POST http://localhost:8000/api/health/set-batch/ \
+  -H "Content-Type: application/json" \
+  -H "User-Agent: amal-googerit" \
+  -d "{\"statuses\": [${ENTRIES%,}]}"
+
+echo ""
+echo "Batch health status update request sent for $# PRs."